@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from autotool_system.core.recorder import Recorder
+from autotool_system.listeners import CaptureBuffer, MouseListener
+from autotool_system.utils.logger import configure_logging
+
+
+def _latencies(listener: MouseListener, count: int) -> list[int]:
+    samples: list[int] = []
+    on_move = listener._on_move
+    clock = time.perf_counter_ns
+    for idx in range(count):
+        started = clock()
+        on_move(idx % 1920, idx % 1080)
+        samples.append(clock() - started)
+    return samples
+
+
+def _report(name: str, samples: list[int]) -> None:
+    ordered = sorted(samples)
+    p50 = ordered[len(ordered) // 2]
+    p99 = ordered[int(len(ordered) * 0.99)]
+    mean = statistics.fmean(ordered)
+    print(f"{name:<20} mean {mean / 1000:>8.2f}us  p50 {p50 / 1000:>8.2f}us  p99 {p99 / 1000:>8.2f}us  max {ordered[-1] / 1000:>9.2f}us")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Measure listener callback latency with and without the capture buffer")
+    parser.add_argument("--count", type=int, default=100000)
+    parser.add_argument("--capacity", type=int, default=65536)
+    args = parser.parse_args()
+
+    configure_logging(level="WARNING", force=True)
+
+    direct = Recorder()
+    direct.start()
+    _report("direct", _latencies(MouseListener(direct.record_event), args.count))
+
+    buffered = Recorder()
+    buffered.start()
+    capture = CaptureBuffer(buffered.record_event, capacity=args.capacity)
+    listener = MouseListener(buffer=capture)
+    capture.start()
+    _report("ring buffer", _latencies(listener, args.count))
+    capture.stop()
+    stats = capture.stats()
+    print(f"delivered {stats['delivered']} dropped {stats['dropped']} max lag {stats['max_lag_ms']:.2f}ms")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import argparse
+import gc
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable
+from uuid import uuid4
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from autotool_system.listeners.event import Event, EventSession, PointerPayload
+
+
+@dataclass(frozen=True)
+class LegacyEvent:
+    id: str
+    ts: float
+    type: str
+    action: str
+    payload: dict[str, Any]
+
+    @classmethod
+    def create(cls, event_type: str, action: str, payload: dict[str, Any]) -> "LegacyEvent":
+        return cls(id=str(uuid4()), ts=time.time(), type=event_type, action=action, payload=dict(payload))
+
+
+def _legacy(count: int) -> list[object]:
+    return [LegacyEvent.create("mouse", "move", {"x": idx, "y": idx}) for idx in range(count)]
+
+
+def _slotted(count: int) -> list[object]:
+    session = EventSession()
+    return [Event.create("mouse", "move", PointerPayload(idx, idx), session=session) for idx in range(count)]
+
+
+def _measure(name: str, factory: Callable[[int], list[object]], count: int) -> None:
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    events = factory(count)
+    elapsed = time.perf_counter() - started
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    per_event = current / count
+    print(f"{name:<10} {count:>8} events {elapsed:>8.3f}s {per_event:>8.1f} B/event (peak {peak / 1024:.0f} KiB)")
+    del events
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compare per-event allocation of legacy and slotted events")
+    parser.add_argument("--count", type=int, default=200000)
+    args = parser.parse_args()
+    _measure("legacy", _legacy, args.count)
+    _measure("slotted", _slotted, args.count)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+import yaml
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from autotool_system.core.recording_export import YamlDumper, export_events
+
+
+def _events(count: int) -> list[dict[str, Any]]:
+    return [
+        {
+            "id": f"bench-{idx}",
+            "ts": 1700000000.0 + idx * 0.008,
+            "type": "mouse",
+            "action": "move",
+            "payload": {"x": idx % 1920, "y": idx % 1080},
+            "delta": 0.008,
+        }
+        for idx in range(count)
+    ]
+
+
+def _legacy(events: list[dict[str, Any]], path: Path) -> None:
+    payload = {"version": 1, "recorded_at": time.time(), "events": events}
+    if path.suffix == ".json":
+        path.write_text(json.dumps(payload, indent=2, ensure_ascii=True), encoding="utf-8")
+    else:
+        path.write_text(yaml.safe_dump(payload, sort_keys=False), encoding="utf-8")
+
+
+def _report(name: str, count: int, seconds: float, size: int) -> None:
+    rate = count / seconds if seconds > 0 else 0.0
+    print(f"{name:<16} {count:>8} events {seconds:>8.2f}s {rate:>11.0f} events/s {size / 1_000_000:>8.1f} MB")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Measure recording export throughput")
+    parser.add_argument("--count", type=int, default=200000)
+    parser.add_argument("--formats", default="json,yaml,jsonl,jsonl.gz")
+    parser.add_argument("--legacy", action="store_true", help="Also time the whole-payload dumpers")
+    args = parser.parse_args()
+
+    events = _events(args.count)
+    print(f"YAML dumper: {YamlDumper.__name__}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for fmt in [item.strip() for item in args.formats.split(",") if item.strip()]:
+            path = Path(tmp) / f"recording.{fmt}"
+            report = export_events(events, path)
+            _report(f"stream {fmt}", report.events, report.seconds, report.bytes)
+            if args.legacy and fmt in {"json", "yaml"}:
+                legacy_path = Path(tmp) / f"legacy.{fmt}"
+                started = time.perf_counter()
+                _legacy(events, legacy_path)
+                _report(f"legacy {fmt}", len(events), time.perf_counter() - started, legacy_path.stat().st_size)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
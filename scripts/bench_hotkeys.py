@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from autotool_system.listeners.hotkeys import HotkeyIndex, combo_tokens
+
+
+class LegacyHotKey:
+    def __init__(self, keys: list[str], callback) -> None:
+        self._keys = set(keys)
+        self._state: set[str] = set()
+        self._callback = callback
+
+    def press(self, key: str) -> None:
+        if key in self._keys and key not in self._state:
+            self._state.add(key)
+            if self._state == self._keys:
+                self._callback()
+
+    def release(self, key: str) -> None:
+        self._state.discard(key)
+
+
+def _combos(count: int) -> list[str]:
+    names = ["ctrl", "alt", "shift", "cmd"]
+    modifiers = ["+".join(name for bit, name in enumerate(names) if mask & (1 << bit)) for mask in range(1, 16)]
+    keys = [chr(code) for code in range(ord("a"), ord("z") + 1)]
+    keys += [str(digit) for digit in range(10)] + [f"f{idx}" for idx in range(1, 13)]
+    keys += ["esc", "tab", "enter", "space", "home", "end", "page_up", "page_down", "up", "down", "left", "right"]
+    keys += ["insert", "delete", "backspace", ",", ".", "/", ";", "'", "[", "]", "-", "=", "`"]
+    combos = [f"{modifier}+{key}" for modifier in modifiers for key in keys]
+    return combos[:count]
+
+
+def _stream(length: int) -> list[tuple[bool, str]]:
+    keys = "the quick brown fox jumps over the lazy dog"
+    events: list[tuple[bool, str]] = []
+    while len(events) < length:
+        for char in keys:
+            token = "space" if char == " " else char
+            events.append((True, token))
+            events.append((False, token))
+        events.extend([(True, "ctrl"), (True, "s"), (False, "s"), (False, "ctrl")])
+    return events[:length]
+
+
+def _bench_legacy(combos: list[str], events: list[tuple[bool, str]]) -> tuple[float, int]:
+    fired = [0]
+    hotkeys = [LegacyHotKey(combo_tokens(combo), lambda: fired.__setitem__(0, fired[0] + 1)) for combo in combos]
+    started = time.perf_counter()
+    for pressed, key in events:
+        for hotkey in hotkeys:
+            if pressed:
+                hotkey.press(key)
+            else:
+                hotkey.release(key)
+    return time.perf_counter() - started, fired[0]
+
+
+def _bench_index(combos: list[str], events: list[tuple[bool, str]]) -> tuple[float, int]:
+    index = HotkeyIndex(dispatch=lambda callback: None)
+    for combo in combos:
+        index.register(combo, lambda: None)
+    started = time.perf_counter()
+    for pressed, key in events:
+        if pressed:
+            index.press(key)
+        else:
+            index.release(key)
+    return time.perf_counter() - started, index.fired
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compare per-hotkey matching with the indexed matcher")
+    parser.add_argument("--events", type=int, default=20000)
+    parser.add_argument("--sizes", default="1,10,100,1000")
+    args = parser.parse_args()
+    events = _stream(args.events)
+    print(f"{'combos':>7} {'legacy us/evt':>14} {'index us/evt':>13} {'fired':>7}")
+    for size in [int(item) for item in args.sizes.split(",") if item.strip()]:
+        combos = _combos(size)
+        legacy, legacy_fired = _bench_legacy(combos, events)
+        indexed, index_fired = _bench_index(combos, events)
+        if legacy_fired != index_fired:
+            print(f"warning: fired mismatch legacy={legacy_fired} index={index_fired}")
+        print(
+            f"{len(combos):>7} {legacy / len(events) * 1e6:>14.2f} {indexed / len(events) * 1e6:>13.2f} {index_fired:>7}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from autotool_system.automation import AutomationEngine, Capability, PyAutoGUIBackend, RecordingBackend
+from autotool_system.utils.logger import configure_logging
+
+
+class PausingModule:
+    FAILSAFE = True
+
+    def __init__(self, pause: float) -> None:
+        self.PAUSE = pause
+        self.calls = 0
+
+    def _call(self) -> None:
+        self.calls += 1
+        if self.PAUSE > 0:
+            time.sleep(self.PAUSE)
+
+    def moveTo(self, x: int, y: int, duration: float = 0.0) -> None:
+        self._call()
+
+    def mouseDown(self, **kwargs: object) -> None:
+        self._call()
+
+    def mouseUp(self, **kwargs: object) -> None:
+        self._call()
+
+    def keyDown(self, key: str) -> None:
+        self._call()
+
+    def keyUp(self, key: str) -> None:
+        self._call()
+
+
+def _actions(count: int) -> list[dict[str, object]]:
+    actions: list[dict[str, object]] = []
+    for idx in range(count):
+        kind = idx % 4
+        if kind == 0:
+            actions.append({"id": f"a{idx}", "type": "move", "params": {"x": idx % 800, "y": idx % 600}})
+        elif kind == 1:
+            actions.append({"id": f"a{idx}", "type": "mouse_down", "params": {"button": "left"}})
+        elif kind == 2:
+            actions.append({"id": f"a{idx}", "type": "key_down", "params": {"key": "a"}})
+        else:
+            actions.append({"id": f"a{idx}", "type": "key_up", "params": {"key": "a"}})
+    return actions
+
+
+def _measure(name: str, engine: AutomationEngine, actions: list[dict[str, object]]) -> None:
+    started = time.perf_counter()
+    results = engine.execute_sequence(actions)
+    elapsed = time.perf_counter() - started
+    rate = len(results) / elapsed if elapsed > 0 else float("inf")
+    print(f"{name:<28} {len(results):>8} actions {elapsed:>9.4f}s {rate:>12.0f} actions/s")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compare action throughput across input backends")
+    parser.add_argument("--count", type=int, default=20000)
+    parser.add_argument("--pause", type=float, default=0.0, help="Simulated pyautogui PAUSE per call")
+    parser.add_argument("--batch", type=int, default=256)
+    args = parser.parse_args()
+
+    configure_logging(level="WARNING", force=True)
+    actions = _actions(args.count)
+
+    _measure("legacy pyautogui-style", AutomationEngine(backend=PausingModule(args.pause), pause=args.pause), actions)
+    adapter = PyAutoGUIBackend(PausingModule(0.0), pause=args.pause)
+    _measure("pyautogui adapter batched", AutomationEngine(input_backend=adapter, max_batch=args.batch), actions)
+    unbatched = RecordingBackend(Capability.POINTER | Capability.KEYBOARD)
+    _measure("recording unbatched", AutomationEngine(input_backend=unbatched), actions)
+    _measure("recording batched", AutomationEngine(input_backend=RecordingBackend(), max_batch=args.batch), actions)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from autotool_system.core.rule_batch import _try_numpy, evaluate_batch
+from autotool_system.core.rule_engine import RuleEngine
+
+
+def _engine(count: int) -> RuleEngine:
+    engine = RuleEngine()
+    for idx in range(count):
+        kind = idx % 4
+        if kind == 0:
+            condition: Any = {"status": ["success", "failed", "stopped"][idx % 3], "workflow": f"wf-{idx % 20}"}
+        elif kind == 1:
+            condition = {"key": "duration", "op": "gt", "value": (idx % 50) * 0.5}
+        elif kind == 2:
+            condition = {"any": [{"key": "steps", "op": "in", "value": [idx % 10, idx % 10 + 1]}, {"key": "duration", "op": "lt", "value": 0.5}]}
+        else:
+            condition = {"key": "message", "op": "contains", "value": f"err-{idx % 30}"}
+        engine.add_rule({"id": f"r{idx}", "condition": condition, "priority": idx % 5})
+    return engine
+
+
+def _columns(rows: int, rng: random.Random) -> dict[str, list[Any]]:
+    return {
+        "status": [rng.choice(["success", "failed", "stopped"]) for _ in range(rows)],
+        "workflow": [f"wf-{rng.randrange(20)}" for _ in range(rows)],
+        "duration": [round(rng.uniform(0, 30), 2) for _ in range(rows)],
+        "steps": [rng.randrange(12) for _ in range(rows)],
+        "message": [f"err-{rng.randrange(40)} in step" for _ in range(rows)],
+    }
+
+
+def _timed(label: str, rows: int, func: Any) -> Any:
+    started = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - started
+    rate = rows / elapsed if elapsed > 0 else 0.0
+    print(f"{label:<10} {rows:>8} rows {elapsed:>7.2f}s {rate:>12.0f} rows/s")
+    return result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compare batch rule evaluation with the per-context loop")
+    parser.add_argument("--rules", type=int, default=200)
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--loop-rows", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=11)
+    args = parser.parse_args()
+    engine = _engine(args.rules)
+    columns = _columns(args.rows, random.Random(args.seed))
+
+    loop_rows = min(args.loop_rows, args.rows)
+    keys = list(columns)
+    contexts = [dict(zip(keys, values)) for values in zip(*(columns[key][:loop_rows] for key in keys))]
+    _timed("loop", loop_rows, lambda: [engine.evaluate(context) for context in contexts])
+    backends = ["python"] + (["numpy"] if _try_numpy() is not None else [])
+    for backend in backends:
+        result = _timed(backend, args.rows, lambda: evaluate_batch(engine, columns, backend=backend))
+    print(f"matches    {sum(result.counts().values()):>8} over {len(result.rule_ids)} rules")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
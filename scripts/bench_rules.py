@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from autotool_system.core.rule_engine import RuleEngine
+
+
+def _rules(count: int, rng: random.Random) -> list[dict[str, Any]]:
+    rules: list[dict[str, Any]] = []
+    for idx in range(count):
+        kind = idx % 4
+        if kind == 0:
+            condition: Any = {"window": f"app-{idx % 500}", "event": "click"}
+        elif kind == 1:
+            condition = {"all": [{"key": "event", "op": "eq", "value": f"key-{idx % 200}"}, {"key": "count", "op": "gt", "value": idx % 10}]}
+        elif kind == 2:
+            condition = {"any": [{"key": f"flag-{idx % 300}", "op": "eq", "value": True}, {"key": "score", "op": "gte", "value": 99.5}]}
+        else:
+            condition = {"key": "title", "op": "contains", "value": f"doc-{idx % 1000}"}
+        rules.append({"id": f"r{idx}", "condition": condition, "priority": rng.randint(0, 9)})
+    return rules
+
+
+def _contexts(count: int, rng: random.Random) -> list[dict[str, Any]]:
+    contexts: list[dict[str, Any]] = []
+    for _ in range(count):
+        context: dict[str, Any] = {"window": f"app-{rng.randrange(500)}", "event": rng.choice(["click", f"key-{rng.randrange(200)}"])}
+        context["count"] = rng.randrange(12)
+        if rng.random() < 0.2:
+            context[f"flag-{rng.randrange(300)}"] = True
+        if rng.random() < 0.3:
+            context["title"] = f"doc-{rng.randrange(1000)} - editor"
+        contexts.append(context)
+    return contexts
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Measure rule evaluation throughput")
+    parser.add_argument("--rules", type=int, default=10000)
+    parser.add_argument("--evaluations", type=int, default=5000)
+    parser.add_argument("--patches", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    engine = RuleEngine()
+    started = time.perf_counter()
+    for rule in _rules(args.rules, rng):
+        engine.add_rule(rule)
+    added = time.perf_counter() - started
+
+    contexts = _contexts(args.evaluations, rng)
+    matched = 0
+    started = time.perf_counter()
+    for context in contexts:
+        matched += len(engine.evaluate(context))
+    elapsed = time.perf_counter() - started
+    rate = len(contexts) / elapsed if elapsed > 0 else 0.0
+    print(f"rules      {args.rules:>8} added in {added:.2f}s")
+    print(f"evaluate   {len(contexts):>8} contexts {elapsed:.2f}s {rate:>10.0f} evals/s avg {matched / len(contexts):.1f} matches")
+
+    session = engine.session(contexts[0])
+    baseline = session.evaluated
+    transitions = 0
+    started = time.perf_counter()
+    for _ in range(args.patches):
+        key = rng.choice(["window", "event", "count"])
+        transitions += len(session.apply({key: contexts[rng.randrange(len(contexts))][key]}))
+    elapsed = time.perf_counter() - started
+    rate = args.patches / elapsed if elapsed > 0 else 0.0
+    checked = (session.evaluated - baseline) / args.patches if args.patches else 0.0
+    print(f"session    {args.patches:>8} patches  {elapsed:.2f}s {rate:>10.0f} patches/s avg {checked:.1f} rules checked {transitions} transitions")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from autotool_system.core.workflow_builder import WorkflowBuilder
+
+
+def _workflow(size: int, fanout: int, rng: random.Random) -> dict[str, Any]:
+    nodes: list[dict[str, Any]] = [{"id": "start", "type": "start"}]
+    edges: list[dict[str, Any]] = []
+    for idx in range(size):
+        node_id = f"n{idx:06d}"
+        nodes.append({"id": node_id, "type": "action", "data": {"type": "wait", "params": {"seconds": 0}}})
+        edges.append({"sourceNodeID": "start" if idx == 0 else f"n{idx - 1:06d}", "targetNodeID": node_id})
+        for _ in range(fanout if idx > 1 else 0):
+            edges.append({"sourceNodeID": f"n{rng.randrange(idx - 1):06d}", "targetNodeID": node_id})
+    rng.shuffle(nodes)
+    rng.shuffle(edges)
+    return {"id": f"bench-{size}", "name": "Bench", "graph": {"nodes": nodes, "edges": edges}}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Measure workflow graph validation and compilation")
+    parser.add_argument("--sizes", default="10,100,1000,10000,100000")
+    parser.add_argument("--fanout", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=3)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+    builder = WorkflowBuilder()
+    for size in [int(item) for item in args.sizes.split(",") if item]:
+        workflow = _workflow(size, args.fanout, rng)
+        started = time.perf_counter()
+        errors = builder.validate(workflow)
+        validated = time.perf_counter() - started
+        started = time.perf_counter()
+        actions = builder.compile(workflow)
+        compiled = time.perf_counter() - started
+        edges = len(workflow["graph"]["edges"])
+        status = "ok" if not errors and len(actions) == size else "error"
+        print(f"nodes {size:>7} edges {edges:>7} validate {validated * 1000:>9.1f}ms compile {compiled * 1000:>9.1f}ms {status}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Any, Mapping
+from typing import Any, Iterator, Mapping
 import base64
 import io
 import json
@@ -44,16 +44,26 @@ def _set_windows_dpi_awareness() -> None:
 _set_windows_dpi_awareness()
 
 from fastapi import Body, FastAPI, Request, UploadFile, File, Form
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 
+from ..automation import create_input_backend
+from ..core.compile_cache import CompileCache
+from ..core.fingerprint import ReadinessOptions
+from ..core.recording_compiler import CompileOptions, CompileReport, RecordingCompileError, compile_recording
+from ..core.recording_store import RecordingHandle, RecordingStore
+from ..core.replay_plan import ReplayPlanCache
+from ..core.replay_timing import ReplayTiming
+from ..core.trajectory import SimplifyOptions
 from ..core.workflow_builder import WorkflowBuilder, WorkflowError
+from ..listeners.motion_sampler import MotionSamplerOptions
 from ..plugins import PluginManager
+from ..utils.audit import create_audit_sink
 from ..utils.config_manager import ConfigManager, ConfigError
 from ..utils.database import Database, DatabaseError
 from ..utils.logger import configure_logging, get_logger
 from ..version import __version__
-from .state import ApiError, ApiState, RecorderSession, ReplaySession, RunManager, AutoClickerSession
+from .state import ApiError, ApiState, RecorderSession, ReplaySession, RunManager, AutoClickerSession, TriggerSession
 from .state import _load_node_registry
 
 
@@ -363,6 +373,29 @@ def _locate_image(
     return None
 
 
+def _sse_events(
+    batches: Iterator[tuple[int, list[dict[str, Any]]]],
+    *,
+    recording_id: str | None,
+    heartbeat: float = 15.0,
+) -> Iterator[str]:
+    last_sent = time.monotonic()
+    cursor = 0
+    for cursor, events in batches:
+        now = time.monotonic()
+        if not events:
+            if now - last_sent >= heartbeat:
+                last_sent = now
+                yield ": keep-alive\n\n"
+            continue
+        last_sent = now
+        for offset, event in enumerate(events, start=cursor + 1):
+            yield f"id: {offset}\ndata: {json.dumps(event, ensure_ascii=True, separators=(',', ':'))}\n\n"
+        cursor += len(events)
+    done = json.dumps({"recording_id": recording_id, "count": cursor})
+    yield f"event: end\ndata: {done}\n\n"
+
+
 def _ensure_config(config_path: Path) -> dict[str, Any]:
     manager = ConfigManager()
     if not config_path.exists():
@@ -381,14 +414,26 @@ def _load_state(
 ) -> ApiState:
     config = _ensure_config(config_path)
     logging_cfg = config.get("logging", {})
+    audit = None
     if isinstance(logging_cfg, Mapping):
         configure_logging(
             level=str(logging_cfg.get("level", "INFO")),
             log_file=logging_cfg.get("file"),
         )
+        audit = create_audit_sink(logging_cfg.get("audit"))
+
+    automation_cfg = config.get("automation", {})
+    if not isinstance(automation_cfg, Mapping):
+        automation_cfg = {}
+    input_backend = create_input_backend(
+        automation_cfg.get("input_backend"),
+        pause=float(automation_cfg.get("pause_interval", 0.1)),
+        failsafe=bool(automation_cfg.get("failsafe", True)),
+    )
 
+    storage_cfg = config.get("storage", {})
     db = Database()
-    path = db_path or Path(config.get("storage", {}).get("db_path", "data/automation.db"))
+    path = db_path or Path(storage_cfg.get("db_path", "data/automation.db"))
     db.connect(str(path))
     db.migrate()
 
@@ -397,18 +442,32 @@ def _load_state(
 
     node_registry = _load_node_registry(Path("config/flowgram_nodes.json"))
 
+    recording_store = RecordingStore(storage_cfg.get("recordings_dir", "data/recordings"))
+    recording_store.recover()
+
+    workflow_builder = WorkflowBuilder()
+    compile_cache = CompileCache(workflow_builder, db=db)
+    run_manager = RunManager(db, audit=audit, input_backend=input_backend)
     state = ApiState(
         config_path=config_path,
         config=config,
         config_manager=ConfigManager(),
         db=db,
-        workflow_builder=WorkflowBuilder(),
+        workflow_builder=workflow_builder,
         plugin_manager=plugin_manager,
-        run_manager=RunManager(db),
-        recorder=RecorderSession(),
-        replay=ReplaySession(),
+        run_manager=run_manager,
+        recorder=RecorderSession(store=recording_store),
+        replay=ReplaySession(
+            audit=audit,
+            input_backend=input_backend,
+            plan_cache=ReplayPlanCache(storage_cfg.get("replay_cache_dir", "data/replay_cache")),
+            db=db,
+        ),
         autoclicker=AutoClickerSession(),
         node_registry=node_registry,
+        compile_cache=compile_cache,
+        triggers=TriggerSession(compile_cache, run_manager),
+        audit=audit,
     )
     return state
 
@@ -440,6 +499,15 @@ def create_app(
     app.state.api = state
     logger = get_logger("autotool.api")
 
+    @app.on_event("shutdown")
+    def close_audit() -> None:
+        if state.audit is not None:
+            state.audit.close()
+
+    @app.on_event("shutdown")
+    def close_triggers() -> None:
+        state.triggers.stop()
+
     @app.exception_handler(ApiError)
     async def api_error_handler(_: Request, exc: ApiError) -> JSONResponse:
         return _error_response(exc)
@@ -456,6 +524,12 @@ def create_app(
     def health() -> dict[str, Any]:
         return _ok({"status": "ok", "version": __version__})
 
+    @app.get("/api/v1/audit/stats")
+    def audit_stats() -> dict[str, Any]:
+        if state.audit is None:
+            return _ok({"enabled": False})
+        return _ok({"enabled": True, **state.audit.stats()})
+
     @app.get("/api/v1/config")
     def get_config() -> dict[str, Any]:
         return _ok(state.config)
@@ -497,36 +571,43 @@ def create_app(
         errors = state.workflow_builder.validate(payload)
         return _ok({"errors": errors})
 
+    @app.get("/api/v1/compile/cache")
+    def compile_cache_stats() -> dict[str, Any]:
+        return _ok(state.compile_cache.stats())
+
     @app.post("/api/v1/workflows/{workflow_id}/compile")
     def compile_workflow(workflow_id: str) -> dict[str, Any]:
-        workflow = state.db.get_workflow(workflow_id)
-        if workflow is None:
-            raise ApiError("Workflow not found", code="NOT_FOUND", status_code=404)
         try:
-            actions = state.workflow_builder.compile(workflow)
+            plan = state.compile_cache.plan(workflow_id)
         except WorkflowError as exc:
             raise ApiError(str(exc), code="VALIDATION_ERROR")
-        return _ok([action.to_dict() for action in actions])
+        if plan is None:
+            raise ApiError("Workflow not found", code="NOT_FOUND", status_code=404)
+        return _ok(plan.action_dicts())
 
     @app.post("/api/v1/workflows/{workflow_id}/run")
     def run_workflow(
         workflow_id: str,
         payload: dict[str, Any] = Body(default_factory=dict),
     ) -> dict[str, Any]:
-        workflow = state.db.get_workflow(workflow_id)
-        if workflow is None:
-            raise ApiError("Workflow not found", code="NOT_FOUND", status_code=404)
         try:
-            actions = state.workflow_builder.compile(workflow)
+            plan = state.compile_cache.plan(workflow_id)
         except WorkflowError as exc:
             raise ApiError(str(exc), code="VALIDATION_ERROR")
+        if plan is None:
+            raise ApiError("Workflow not found", code="NOT_FOUND", status_code=404)
         speed = float(payload.get("speed", 1.0))
         stop_on_error = bool(payload.get("stop_on_error", False))
+        variables = payload.get("variables") or {}
+        if not isinstance(variables, Mapping):
+            raise ApiError("variables must be an object", code="BAD_REQUEST")
         entry = state.run_manager.start_workflow(
             workflow_id,
-            [action.to_dict() for action in actions],
+            plan.action_dicts(),
             speed=speed,
             stop_on_error=stop_on_error,
+            program=plan.program,
+            variables=variables,
         )
         logger.info("Run started: %s", entry.run_id)
         return _ok(
@@ -560,17 +641,151 @@ def create_app(
     def start_recording(payload: dict[str, Any] = Body(default_factory=dict)) -> dict[str, Any]:
         record_moves = bool(payload.get("record_moves", True))
         min_move_interval = float(payload.get("min_move_interval", 0.0))
-        state.recorder.start(record_moves=record_moves, min_move_interval=min_move_interval)
+        fingerprint = bool(payload.get("fingerprint", False))
+        try:
+            motion = MotionSamplerOptions.from_obj(payload.get("motion"))
+        except ValueError as exc:
+            raise ApiError(str(exc), code="BAD_REQUEST")
+        state.recorder.start(
+            record_moves=record_moves,
+            min_move_interval=min_move_interval,
+            fingerprint=fingerprint,
+            motion=motion,
+        )
         return _ok({"status": state.recorder.status()})
 
     @app.post("/api/v1/recording/stop")
     def stop_recording() -> dict[str, Any]:
-        events = state.recorder.stop()
-        return _ok({"status": state.recorder.status(), "events": events})
+        recording = state.recorder.stop()
+        if isinstance(recording, RecordingHandle):
+            return _ok(
+                {
+                    "status": state.recorder.status(),
+                    "recording_id": recording.id,
+                    "count": recording.count,
+                    "segments": len(recording.segments),
+                    "motion": state.recorder.motion_stats(),
+                }
+            )
+        return _ok(
+            {
+                "status": state.recorder.status(),
+                "count": len(recording),
+                "motion": state.recorder.motion_stats(),
+                "events": recording,
+            }
+        )
+
+    @app.get("/api/v1/recording/live")
+    def recording_live(request: Request, cursor: int = 0) -> StreamingResponse:
+        if cursor < 0:
+            raise ApiError("cursor must be >= 0", code="BAD_REQUEST")
+        last_event_id = request.headers.get("last-event-id")
+        if last_event_id and last_event_id.isdigit():
+            cursor = int(last_event_id)
+        batches = state.recorder.follow(cursor)
+        return StreamingResponse(
+            _sse_events(batches, recording_id=state.recorder.recording_id()),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
 
     @app.get("/api/v1/recording/status")
     def recording_status() -> dict[str, Any]:
-        return _ok({"status": state.recorder.status()})
+        return _ok(
+            {
+                "status": state.recorder.status(),
+                "recording_id": state.recorder.recording_id(),
+                "capture": state.recorder.capture_stats(),
+                "motion": state.recorder.motion_stats(),
+            }
+        )
+
+    @app.get("/api/v1/recordings")
+    def list_recordings() -> dict[str, Any]:
+        store = state.recorder.store
+        return _ok([handle.to_dict() for handle in store.list()] if store is not None else [])
+
+    @app.get("/api/v1/recordings/{recording_id}")
+    def get_recording(recording_id: str) -> dict[str, Any]:
+        return _ok(state.recorder.open(recording_id).to_dict())
+
+    @app.get("/api/v1/recordings/{recording_id}/events")
+    def recording_events(recording_id: str, cursor: int = 0, limit: int = 500) -> dict[str, Any]:
+        if cursor < 0 or not (0 < limit <= 5000):
+            raise ApiError("cursor must be >= 0 and limit between 1 and 5000", code="BAD_REQUEST")
+        handle = state.recorder.open(recording_id)
+        events, next_cursor = handle.page(cursor, limit)
+        return _ok(
+            {
+                "recording_id": handle.id,
+                "status": handle.status,
+                "count": handle.count,
+                "cursor": cursor,
+                "next_cursor": next_cursor,
+                "events": events,
+            }
+        )
+
+    @app.post("/api/v1/recordings/{recording_id}/compile")
+    def compile_recording_workflow(
+        recording_id: str,
+        payload: dict[str, Any] = Body(default_factory=dict),
+    ) -> dict[str, Any]:
+        try:
+            options = CompileOptions.from_obj(payload.get("options"))
+        except ValueError as exc:
+            raise ApiError(str(exc), code="BAD_REQUEST")
+        handle = state.recorder.open(recording_id)
+        report = CompileReport()
+        try:
+            workflow = compile_recording(
+                handle.iter_events(),
+                workflow_id=str(payload.get("workflow_id") or f"rec-{handle.id}"),
+                name=str(payload.get("name") or f"Recording {handle.id}"),
+                options=options,
+                report=report,
+            )
+        except RecordingCompileError as exc:
+            raise ApiError(str(exc), code="BAD_REQUEST")
+        if payload.get("save"):
+            errors = state.workflow_builder.validate(workflow)
+            if errors:
+                raise ApiError("Validation failed", code="VALIDATION_ERROR", details=errors)
+            state.db.save_workflow(workflow)
+        return _ok({"workflow": workflow, "report": report.to_dict()})
+
+    @app.get("/api/v1/recordings/{recording_id}/events.ndjson")
+    def recording_events_ndjson(recording_id: str) -> StreamingResponse:
+        handle = state.recorder.open(recording_id)
+        return StreamingResponse(
+            handle.iter_lines(),
+            media_type="application/x-ndjson",
+            headers={"Content-Disposition": f'attachment; filename="{handle.id}.ndjson"'},
+        )
+
+    @app.get("/api/v1/triggers")
+    def list_triggers() -> dict[str, Any]:
+        return _ok(state.triggers.status())
+
+    @app.post("/api/v1/triggers")
+    def add_trigger(payload: dict[str, Any] = Body(...)) -> dict[str, Any]:
+        return _ok(state.triggers.add(payload).to_dict())
+
+    @app.delete("/api/v1/triggers/{trigger_id}")
+    def delete_trigger(trigger_id: str) -> dict[str, Any]:
+        state.triggers.remove(trigger_id)
+        return _ok({"id": trigger_id, "deleted": True})
+
+    @app.post("/api/v1/triggers/start")
+    def start_triggers() -> dict[str, Any]:
+        state.triggers.start()
+        return _ok(state.triggers.status())
+
+    @app.post("/api/v1/triggers/stop")
+    def stop_triggers() -> dict[str, Any]:
+        state.triggers.stop()
+        return _ok(state.triggers.status())
 
     @app.post("/api/v1/autoclicker/start")
     def start_autoclicker(payload: dict[str, Any] = Body(default_factory=dict)) -> dict[str, Any]:
@@ -762,15 +977,77 @@ def create_app(
     def start_replay(payload: dict[str, Any] = Body(...)) -> dict[str, Any]:
         items = payload.get("items")
         path = payload.get("path")
-        if path:
-            data = json.loads(Path(path).read_text(encoding="utf-8"))
-            items = data.get("events", data)
-        if not isinstance(items, list):
+        if not path and not isinstance(items, list):
             raise ApiError("Replay items are required", code="BAD_REQUEST")
         speed = float(payload.get("speed", 1.0))
         stop_on_error = bool(payload.get("stop_on_error", False))
-        state.replay.start(items, speed=speed, stop_on_error=stop_on_error)
-        return _ok({"status": state.replay.status()})
+        try:
+            simplify = SimplifyOptions.from_obj(payload.get("simplify"))
+            timing = ReplayTiming.from_obj(payload.get("timing"))
+            readiness = ReadinessOptions.from_obj(payload.get("readiness"))
+        except ValueError as exc:
+            raise ApiError(str(exc), code="BAD_REQUEST")
+        start_index = int(payload.get("start_index", 0))
+        start_ts = payload.get("start_ts")
+        if start_index < 0:
+            raise ApiError("start_index must be >= 0", code="BAD_REQUEST")
+        start_ts = float(start_ts) if start_ts is not None else None
+        if path:
+            run_id = state.replay.start_path(
+                path,
+                speed=speed,
+                stop_on_error=stop_on_error,
+                simplify=simplify,
+                start_index=start_index,
+                start_ts=start_ts,
+                timing=timing,
+                readiness=readiness,
+            )
+        else:
+            run_id = state.replay.start(
+                items,
+                speed=speed,
+                stop_on_error=stop_on_error,
+                simplify=simplify,
+                start_index=start_index,
+                start_ts=start_ts,
+                timing=timing,
+                readiness=readiness,
+            )
+        return _ok({"status": state.replay.status(), "run_id": run_id})
+
+    @app.post("/api/v1/replay/resume")
+    def resume_replay(payload: dict[str, Any] = Body(...)) -> dict[str, Any]:
+        run_id = payload.get("run_id")
+        if not run_id:
+            raise ApiError("run_id is required", code="BAD_REQUEST")
+        speed = payload.get("speed")
+        new_run_id = state.replay.resume(
+            str(run_id),
+            speed=float(speed) if speed is not None else None,
+            stop_on_error=bool(payload.get("stop_on_error", False)),
+        )
+        return _ok({"status": state.replay.status(), "run_id": new_run_id, "resumed_from": run_id})
+
+    @app.get("/api/v1/replay/status")
+    def replay_status() -> dict[str, Any]:
+        return _ok(
+            {
+                "status": state.replay.status(),
+                "run_id": state.replay.run_id(),
+                "summary": state.replay.last_summary(),
+                "checkpoint": state.replay.last_checkpoint(),
+                "timing": state.replay.last_timing(),
+                "readiness": state.replay.last_readiness(),
+            }
+        )
+
+    @app.get("/api/v1/replay/cache")
+    def replay_cache_stats() -> dict[str, Any]:
+        stats = state.replay.plan_cache_stats()
+        if stats is None:
+            return _ok({"enabled": False})
+        return _ok({"enabled": True, **stats})
 
     @app.post("/api/v1/replay/stop")
     def stop_replay() -> dict[str, Any]:
@@ -2,19 +2,34 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Mapping
+from typing import Any, Callable, Iterable, Iterator, Mapping
 from uuid import uuid4
 import random
 import threading
 import time
 import json
 
-from ..automation import AutomationEngine
+from ..automation import AutomationEngine, InputBackend
 from ..core import Replayer, WorkflowBuilder
+from ..core.compile_cache import CompileCache
+from ..core.fingerprint import FingerprintProbe, ReadinessOptions
 from ..core.recorder import Recorder
+from ..core.recording_store import RecordingHandle, RecordingStore, RecordingStoreError
+from ..core.replay_checkpoint import ReplayCheckpoint
+from ..core.replay_plan import ReplayPlanCache, source_digest
+from ..core.replay_timing import ReplayTiming
+from ..core.replayer import ReplayerError
+from ..core.stream_triggers import StreamTriggerEngine, TriggerFire, TriggerSpec
+from ..core.trajectory import SimplifyOptions
+from ..core.workflow_builder import WorkflowError
+from ..core.workflow_vm import VMResult, WorkflowProgram, WorkflowVM
+from ..listeners.capture_buffer import CaptureBuffer
+from ..listeners.event_dispatcher import EventDispatcher
 from ..listeners.keyboard_listener import KeyboardListener
+from ..listeners.motion_sampler import MotionSampler, MotionSamplerOptions
 from ..listeners.mouse_listener import MouseListener
 from ..plugins import PluginManager
+from ..utils.audit import AuditSink
 from ..utils.config_manager import ConfigManager
 from ..utils.database import Database
 from ..utils.logger import get_logger
@@ -62,8 +77,20 @@ class RunEntry:
 
 
 class RunManager:
-    def __init__(self, db: Database) -> None:
+    def __init__(
+        self,
+        db: Database,
+        *,
+        audit: AuditSink | None = None,
+        input_backend: InputBackend | None = None,
+        max_steps: int = 1_000_000,
+        result_tail: int = 1000,
+    ) -> None:
         self._db = db
+        self._audit = audit
+        self._input_backend = input_backend
+        self._max_steps = max_steps
+        self._result_tail = result_tail
         self._runs: dict[str, RunEntry] = {}
         self._lock = threading.Lock()
         self._logger = get_logger("autotool.api.run")
@@ -75,10 +102,12 @@ class RunManager:
         *,
         speed: float = 1.0,
         stop_on_error: bool = False,
+        program: WorkflowProgram | None = None,
+        variables: Mapping[str, Any] | None = None,
     ) -> RunEntry:
         run_id = str(uuid4())
         started_at = _now_iso()
-        engine = AutomationEngine()
+        engine = AutomationEngine(audit=self._audit, input_backend=self._input_backend)
         entry = RunEntry(
             run_id=run_id,
             workflow_id=workflow_id,
@@ -101,11 +130,18 @@ class RunManager:
             }
         )
 
-        thread = threading.Thread(
-            target=self._run_actions,
-            args=(entry, actions, speed, stop_on_error),
-            daemon=True,
-        )
+        if program is not None:
+            thread = threading.Thread(
+                target=self._run_program,
+                args=(entry, program, speed, stop_on_error, dict(variables or {})),
+                daemon=True,
+            )
+        else:
+            thread = threading.Thread(
+                target=self._run_actions,
+                args=(entry, actions, speed, stop_on_error),
+                daemon=True,
+            )
         entry.thread = thread
         thread.start()
         return entry
@@ -155,31 +191,97 @@ class RunManager:
         )
         self._logger.info("Run %s finished with status %s", entry.run_id, status)
 
+    def _run_program(
+        self,
+        entry: RunEntry,
+        program: WorkflowProgram,
+        speed: float,
+        stop_on_error: bool,
+        variables: dict[str, Any],
+    ) -> None:
+        engine = entry.engine
+        if engine is None:
+            return
+        try:
+            outcome = WorkflowVM(program, max_steps=self._max_steps).run(
+                lambda action: engine.execute(action, speed=speed),
+                variables=variables,
+                should_stop=lambda: entry.stop_requested,
+                stop_on_error=stop_on_error,
+                max_results=self._result_tail,
+            )
+        except Exception as exc:
+            self._logger.error("Run %s failed: %s", entry.run_id, exc)
+            outcome = VMResult(status="failed", results=[], counts={}, steps=0, error=str(exc))
+        results = outcome.results
+        status = "stopped" if entry.stop_requested else outcome.status
+        summary = f"{outcome.succeeded}/{outcome.total} succeeded"
+        if outcome.error:
+            summary = f"{summary} ({outcome.error})"
+        ended_at = _now_iso()
+
+        entry.status = status
+        entry.summary = summary
+        entry.ended_at = ended_at
+        entry.data = {"results": [result.to_dict() for result in results], "counts": outcome.counts, "steps": outcome.steps}
+        if outcome.error:
+            entry.data["error"] = outcome.error
+
+        self._db.update_run(
+            entry.run_id,
+            status=status,
+            ended_at=ended_at,
+            summary=summary,
+            data=entry.data,
+        )
+        self._logger.info("Run %s finished with status %s", entry.run_id, status)
+
 
 class RecorderSession:
-    def __init__(self) -> None:
+    def __init__(self, store: RecordingStore | None = None) -> None:
+        self._store = store
         self._recorder: Recorder | None = None
         self._keyboard: KeyboardListener | None = None
         self._mouse: MouseListener | None = None
+        self._capture: CaptureBuffer | None = None
+        self._capture_stats: dict[str, Any] | None = None
+        self._sampler: MotionSampler | None = None
         self._lock = threading.Lock()
         self._logger = get_logger("autotool.api.recording")
 
-    def start(self, *, record_moves: bool = True, min_move_interval: float = 0.0) -> None:
+    def start(
+        self,
+        *,
+        record_moves: bool = True,
+        min_move_interval: float = 0.0,
+        fingerprint: bool = False,
+        motion: MotionSamplerOptions | None = None,
+    ) -> None:
         with self._lock:
             if self._recorder is not None:
                 raise ApiError("Recording already running", code="CONFLICT", status_code=409)
-            recorder = Recorder(record_moves=record_moves, min_move_interval=min_move_interval)
+            sampler = MotionSampler(motion) if motion is not None and record_moves else None
+            recorder = Recorder(
+                record_moves=record_moves,
+                min_move_interval=min_move_interval,
+                fingerprint=FingerprintProbe() if fingerprint else None,
+                store=self._store,
+            )
             recorder.start()
-            keyboard = KeyboardListener(recorder.record_event)
-            mouse = MouseListener(recorder.record_event)
+            capture = CaptureBuffer(recorder.record_event)
+            keyboard = KeyboardListener(buffer=capture)
+            mouse = MouseListener(buffer=capture, sampler=sampler)
             keyboard.start()
             mouse.start()
+            capture.start()
+            self._capture = capture
             self._recorder = recorder
             self._keyboard = keyboard
             self._mouse = mouse
+            self._sampler = sampler
         self._logger.info("Recording started")
 
-    def stop(self) -> list[dict[str, Any]]:
+    def stop(self) -> RecordingHandle | list[dict[str, Any]]:
         with self._lock:
             if self._recorder is None:
                 raise ApiError("No active recording", code="BAD_REQUEST", status_code=400)
@@ -187,44 +289,254 @@ class RecorderSession:
                 self._keyboard.stop()
             if self._mouse is not None:
                 self._mouse.stop()
-            events = self._recorder.stop()
+            if self._capture is not None:
+                self._capture.stop()
+                self._capture_stats = self._capture.stats()
+                self._capture = None
+            recorder = self._recorder
+            events = recorder.finish() if recorder.recording_id is not None else recorder.stop()
             self._recorder = None
             self._keyboard = None
             self._mouse = None
         self._logger.info("Recording stopped (%s events)", len(events))
         return events
 
+    def recording_id(self) -> str | None:
+        recorder = self._recorder
+        return recorder.recording_id if recorder is not None else None
+
+    def open(self, recording_id: str) -> RecordingHandle:
+        recorder = self._recorder
+        if recorder is not None and recorder.recording_id == recording_id:
+            handle = recorder.handle()
+            if handle is not None:
+                return handle
+        if self._store is None:
+            raise ApiError("Recording storage is not configured", code="BAD_REQUEST", status_code=400)
+        try:
+            return self._store.open(recording_id)
+        except RecordingStoreError as exc:
+            raise ApiError(str(exc), code="NOT_FOUND", status_code=404) from exc
+
+    def follow(
+        self,
+        cursor: int = 0,
+        *,
+        batch_size: int = 500,
+        poll_interval: float = 0.25,
+        should_stop: Callable[[], bool] | None = None,
+    ) -> Iterator[tuple[int, list[dict[str, Any]]]]:
+        recorder = self._recorder
+        if recorder is None:
+            raise ApiError("No active recording", code="BAD_REQUEST", status_code=400)
+        return self._follow(recorder, cursor, batch_size, poll_interval, should_stop)
+
+    def _follow(
+        self,
+        recorder: Recorder,
+        cursor: int,
+        batch_size: int,
+        poll_interval: float,
+        should_stop: Callable[[], bool] | None,
+    ) -> Iterator[tuple[int, list[dict[str, Any]]]]:
+        while should_stop is None or not should_stop():
+            running = recorder.is_recording
+            events = recorder.events_since(cursor, batch_size)
+            if events:
+                yield cursor, events
+                cursor += len(events)
+                continue
+            if not running:
+                return
+            yield cursor, []
+            time.sleep(poll_interval)
+
+    @property
+    def store(self) -> RecordingStore | None:
+        return self._store
+
     def status(self) -> str:
         return "running" if self._recorder is not None else "idle"
 
+    def motion_stats(self) -> dict[str, Any] | None:
+        sampler = self._sampler
+        return sampler.report() if sampler is not None else None
+
+    def capture_stats(self) -> dict[str, Any] | None:
+        capture = self._capture
+        if capture is not None:
+            return capture.stats()
+        return self._capture_stats
+
 
 class ReplaySession:
-    def __init__(self) -> None:
-        self._replayer = Replayer()
+    def __init__(
+        self,
+        *,
+        audit: AuditSink | None = None,
+        input_backend: InputBackend | None = None,
+        plan_cache: ReplayPlanCache | None = None,
+        db: Database | None = None,
+        checkpoint_every: int = 500,
+        result_tail: int = 1000,
+    ) -> None:
+        self._replayer = Replayer(
+            AutomationEngine(audit=audit, input_backend=input_backend),
+            plan_cache=plan_cache,
+            on_checkpoint=self._record_checkpoint,
+        )
+        self._plan_cache = plan_cache
+        self._db = db
+        self._checkpoint_every = checkpoint_every
+        self._result_tail = result_tail
         self._lock = threading.Lock()
         self._thread: threading.Thread | None = None
         self._status = "idle"
+        self._run_id: str | None = None
+        self._run_data: dict[str, Any] = {}
         self._last_results: list[dict[str, Any]] | None = None
         self._logger = get_logger("autotool.api.replay")
 
     def start(
         self,
-        items: list[Mapping[str, Any]],
+        items: Iterable[Mapping[str, Any]],
         *,
         speed: float = 1.0,
         stop_on_error: bool = False,
-    ) -> None:
+        collect_results: bool = True,
+        max_results: int | None = None,
+        simplify: SimplifyOptions | None = None,
+        start_index: int = 0,
+        start_ts: float | None = None,
+        resume_from: ReplayCheckpoint | None = None,
+        timing: ReplayTiming | None = None,
+        readiness: ReadinessOptions | None = None,
+        source: str | None = None,
+        source_digest: str | None = None,
+        applied_simplify: SimplifyOptions | None = None,
+    ) -> str:
+        recorded_simplify = simplify if simplify is not None else applied_simplify
+        options = {
+            "speed": speed,
+            "stop_on_error": stop_on_error,
+            "collect_results": collect_results,
+            "max_results": max_results,
+            "simplify": simplify,
+            "start_index": start_index,
+            "start_ts": start_ts,
+            "resume_from": resume_from,
+            "checkpoint_every": self._checkpoint_every,
+            "timing": timing,
+            "readiness": readiness,
+        }
         with self._lock:
             if self._thread is not None and self._thread.is_alive():
                 raise ApiError("Replay already running", code="CONFLICT", status_code=409)
             self._status = "running"
-            self._thread = threading.Thread(
-                target=self._run,
-                args=(items, speed, stop_on_error),
-                daemon=True,
-            )
+            self._run_id = str(uuid4())
+            self._run_data = {
+                "type": "replay",
+                "source": source,
+                "digest": source_digest,
+                "speed": speed,
+                "simplify": recorded_simplify.to_dict() if recorded_simplify is not None else None,
+                "timing": timing.to_dict() if timing is not None else None,
+                "readiness": readiness.to_dict() if readiness is not None else None,
+                "checkpoint": None,
+            }
+            if self._db is not None:
+                self._db.log_run(
+                    {
+                        "id": self._run_id,
+                        "workflow_id": None,
+                        "status": "running",
+                        "started_at": _now_iso(),
+                        "ended_at": None,
+                        "summary": None,
+                        "data": self._run_data,
+                    }
+                )
+            self._thread = threading.Thread(target=self._run, args=(items, options), daemon=True)
             self._thread.start()
-        self._logger.info("Replay started")
+        self._logger.info("Replay started (run %s)", self._run_id)
+        return self._run_id
+
+    def start_path(
+        self,
+        path: str | Path,
+        *,
+        speed: float = 1.0,
+        stop_on_error: bool = False,
+        simplify: SimplifyOptions | None = None,
+        start_index: int = 0,
+        start_ts: float | None = None,
+        resume_from: ReplayCheckpoint | None = None,
+        timing: ReplayTiming | None = None,
+        readiness: ReadinessOptions | None = None,
+    ) -> str:
+        try:
+            steps = self._replayer.compile(path, simplify=simplify)
+            digest = self._source_digest(path)
+        except ReplayerError as exc:
+            raise ApiError(str(exc), code="NOT_FOUND", status_code=404)
+        except OSError as exc:
+            raise ApiError(f"Replay source unreadable: {exc}", code="NOT_FOUND", status_code=404)
+        return self.start(
+            steps,
+            speed=speed,
+            stop_on_error=stop_on_error,
+            max_results=self._result_tail,
+            start_index=start_index,
+            start_ts=start_ts,
+            resume_from=resume_from,
+            timing=timing,
+            readiness=readiness,
+            source=str(path),
+            source_digest=digest,
+            applied_simplify=simplify,
+        )
+
+    def resume(self, run_id: str, *, speed: float | None = None, stop_on_error: bool = False) -> str:
+        record = self._db.get_run(run_id) if self._db is not None else None
+        data = _replay_run_data(record) if record is not None else None
+        if record is None or data is None:
+            raise ApiError("Replay run not found", code="NOT_FOUND", status_code=404)
+        if record.get("status") == "success":
+            raise ApiError("Replay run already completed", code="CONFLICT", status_code=409)
+        source = data.get("source")
+        checkpoint = data.get("checkpoint")
+        if not source:
+            raise ApiError("Replay run is not resumable", code="CONFLICT", status_code=409)
+        expected = data.get("digest")
+        if expected is None:
+            self._logger.warning("Replay run %s has no source digest; resuming unchecked", run_id)
+        else:
+            try:
+                current = self._source_digest(source)
+            except OSError as exc:
+                raise ApiError(f"Replay source unreadable: {exc}", code="NOT_FOUND", status_code=404)
+            if current != expected:
+                raise ApiError("Replay source changed since the run failed", code="CONFLICT", status_code=409)
+        self._logger.info("Resuming replay run %s from %s", run_id, checkpoint)
+        return self.start_path(
+            source,
+            speed=float(speed if speed is not None else data.get("speed", 1.0)),
+            stop_on_error=stop_on_error,
+            simplify=SimplifyOptions.from_obj(data.get("simplify")),
+            resume_from=ReplayCheckpoint.from_dict(checkpoint) if checkpoint else None,
+            timing=ReplayTiming.from_obj(data.get("timing")),
+            readiness=ReadinessOptions.from_obj(data.get("readiness")),
+        )
+
+    def _source_digest(self, path: str | Path) -> str:
+        if self._plan_cache is not None:
+            return self._plan_cache.digest(path)
+        return source_digest(path)
+
+    def plan_cache_stats(self) -> dict[str, Any] | None:
+        if self._plan_cache is None:
+            return None
+        return self._plan_cache.stats()
 
     def stop(self) -> None:
         with self._lock:
@@ -235,14 +547,69 @@ class ReplaySession:
     def status(self) -> str:
         return self._status
 
+    def run_id(self) -> str | None:
+        return self._run_id
+
     def last_results(self) -> list[dict[str, Any]] | None:
         return self._last_results
 
-    def _run(self, items: list[Mapping[str, Any]], speed: float, stop_on_error: bool) -> None:
-        results = self._replayer.play(items, speed=speed, stop_on_error=stop_on_error)
+    def last_summary(self) -> dict[str, int]:
+        return self._replayer.last_summary
+
+    def last_checkpoint(self) -> dict[str, Any] | None:
+        checkpoint = self._replayer.last_checkpoint
+        return checkpoint.to_dict() if checkpoint is not None else None
+
+    def last_timing(self) -> dict[str, Any] | None:
+        report = self._replayer.last_timing_report
+        return report.to_dict() if report is not None else None
+
+    def last_readiness(self) -> dict[str, Any] | None:
+        report = self._replayer.last_readiness_report
+        return report.to_dict() if report is not None else None
+
+    def _record_checkpoint(self, checkpoint: ReplayCheckpoint) -> None:
+        self._run_data["checkpoint"] = checkpoint.to_dict()
+        if self._db is not None and self._run_id is not None:
+            self._db.update_run(self._run_id, data=self._run_data)
+
+    def _run(self, items: Iterable[Mapping[str, Any]], options: dict[str, Any]) -> None:
+        try:
+            results = self._replayer.play(items, **options)
+        except ReplayerError as exc:
+            self._status = "error"
+            self._logger.error("Replay failed: %s", exc)
+            self._finish_run("error", str(exc))
+            return
         self._last_results = [result.to_dict() for result in results]
         self._status = "idle"
-        self._logger.info("Replay finished (%s results)", len(results))
+        summary = self._replayer.last_summary
+        if summary["failed"]:
+            status = "failed"
+        else:
+            status = "stopped" if self._replayer.state == "stopped" else "success"
+        timing_report = self._replayer.last_timing_report
+        if timing_report is not None:
+            self._run_data["timing_report"] = timing_report.to_dict()
+        readiness_report = self._replayer.last_readiness_report
+        if readiness_report is not None:
+            self._run_data["readiness_report"] = readiness_report.to_dict()
+        self._finish_run(status, f"{summary['succeeded']}/{summary['total']} succeeded")
+        self._logger.info("Replay finished (%s results)", summary["total"])
+
+    def _finish_run(self, status: str, summary: str) -> None:
+        if self._db is None or self._run_id is None:
+            return
+        self._db.update_run(self._run_id, status=status, ended_at=_now_iso(), summary=summary, data=self._run_data)
+
+
+def _replay_run_data(record: Mapping[str, Any]) -> Mapping[str, Any] | None:
+    if record.get("type") == "replay":
+        return record
+    nested = record.get("data")
+    if isinstance(nested, Mapping) and nested.get("type") == "replay":
+        return nested
+    return None
 
 
 class AutoClickerSession:
@@ -384,6 +751,106 @@ class AutoClickerSession:
                 self._stop_event.clear()
 
 
+class TriggerSession:
+    def __init__(self, compile_cache: CompileCache, run_manager: RunManager) -> None:
+        self._plans = compile_cache
+        self._runs = run_manager
+        self._engine = StreamTriggerEngine(on_fire=self._launch)
+        self._dispatcher: EventDispatcher | None = None
+        self._capture: CaptureBuffer | None = None
+        self._keyboard: KeyboardListener | None = None
+        self._mouse: MouseListener | None = None
+        self._fires: list[dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._logger = get_logger("autotool.api.triggers")
+
+    @property
+    def engine(self) -> StreamTriggerEngine:
+        return self._engine
+
+    def add(self, spec: Mapping[str, Any]) -> TriggerSpec:
+        try:
+            return self._engine.add(spec)
+        except ValueError as exc:
+            raise ApiError(str(exc), code="BAD_REQUEST")
+
+    def remove(self, trigger_id: str) -> None:
+        if not self._engine.remove(trigger_id):
+            raise ApiError("Trigger not found", code="NOT_FOUND", status_code=404)
+
+    def list(self) -> list[dict[str, Any]]:
+        return [spec.to_dict() for spec in self._engine.triggers()]
+
+    def start(self) -> None:
+        with self._lock:
+            if self._dispatcher is not None:
+                raise ApiError("Triggers already running", code="CONFLICT", status_code=409)
+            dispatcher = EventDispatcher()
+            self._engine.reset()
+            self._engine.attach(dispatcher)
+            capture = CaptureBuffer(dispatcher.dispatch)
+            keyboard = KeyboardListener(buffer=capture)
+            mouse = MouseListener(buffer=capture)
+            try:
+                keyboard.start()
+                mouse.start()
+            except RuntimeError as exc:
+                keyboard.stop()
+                self._engine.detach(dispatcher)
+                raise ApiError(str(exc), code="INTERNAL_ERROR", status_code=500)
+            capture.start()
+            self._dispatcher = dispatcher
+            self._capture = capture
+            self._keyboard = keyboard
+            self._mouse = mouse
+        self._logger.info("Stream triggers started")
+
+    def stop(self) -> None:
+        with self._lock:
+            if self._dispatcher is None:
+                return
+            if self._keyboard is not None:
+                self._keyboard.stop()
+            if self._mouse is not None:
+                self._mouse.stop()
+            if self._capture is not None:
+                self._capture.stop()
+            self._engine.detach(self._dispatcher)
+            self._dispatcher.close()
+            self._dispatcher = None
+            self._capture = None
+            self._keyboard = None
+            self._mouse = None
+        self._logger.info("Stream triggers stopped")
+
+    def status(self) -> dict[str, Any]:
+        return {
+            "running": self._dispatcher is not None,
+            "triggers": self.list(),
+            "stats": self._engine.stats(),
+            "recent": list(self._fires),
+        }
+
+    def _launch(self, fire: TriggerFire) -> None:
+        record = fire.to_dict()
+        if fire.workflow_id is not None:
+            try:
+                plan = self._plans.plan(fire.workflow_id)
+            except WorkflowError as exc:
+                record["error"] = str(exc)
+            else:
+                if plan is None:
+                    record["error"] = "Workflow not found"
+                else:
+                    entry = self._runs.start_workflow(fire.workflow_id, plan.action_dicts(), program=plan.program)
+                    record["run_id"] = entry.run_id
+        if "error" in record:
+            self._logger.error("Trigger %s could not start %s: %s", fire.trigger_id, fire.workflow_id, record["error"])
+        else:
+            self._logger.info("Trigger fired: %s", fire.trigger_id)
+        self._fires = (self._fires + [record])[-50:]
+
+
 @dataclass
 class ApiState:
     config_path: Path
@@ -397,3 +864,6 @@ class ApiState:
     replay: ReplaySession
     autoclicker: AutoClickerSession
     node_registry: list[dict[str, Any]]
+    compile_cache: CompileCache
+    triggers: TriggerSession
+    audit: AuditSink | None = None
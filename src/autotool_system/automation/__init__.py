@@ -1,5 +1,14 @@
 from .action import Action, ActionError, ExecutionResult
 from .automation_engine import AutomationEngine
+from .input_backend import (
+    Capability,
+    InputBackend,
+    InputBackendError,
+    InputEvent,
+    PyAutoGUIBackend,
+    RecordingBackend,
+    create_input_backend,
+)
 from .screen_control import ScreenControl
 from .window_manager import WindowManager
 
@@ -8,6 +17,13 @@ __all__ = [
     "ActionError",
     "ExecutionResult",
     "AutomationEngine",
+    "Capability",
+    "InputBackend",
+    "InputBackendError",
+    "InputEvent",
+    "PyAutoGUIBackend",
+    "RecordingBackend",
     "ScreenControl",
     "WindowManager",
+    "create_input_backend",
 ]
@@ -4,6 +4,15 @@ from typing import Any, Iterable, Mapping
 import time
 
 from .action import Action, ActionError, ExecutionResult
+from .input_backend import (
+    INPUT_KINDS,
+    Capability,
+    InputBackend,
+    InputBackendError,
+    InputEvent,
+    required_capability,
+)
+from ..utils.audit import AuditSink
 from ..utils.logger import get_logger
 
 try:
@@ -36,6 +45,18 @@ def _get_backend() -> Any:
     return pyautogui
 
 
+def _hotkey_keys(params: Mapping[str, Any]) -> list[str]:
+    keys = params.get("keys")
+    combo = params.get("combo")
+    if keys is None and combo is None:
+        raise ActionError("Hotkey action requires keys or combo")
+    if combo is not None:
+        keys = [item.strip() for item in str(combo).split("+") if item.strip()]
+    if isinstance(keys, str):
+        keys = [item.strip() for item in keys.split("+") if item.strip()]
+    return list(keys)
+
+
 def _scale(value: float, speed: float) -> float:
     if speed <= 0:
         raise ActionError("Speed must be greater than 0")
@@ -49,18 +70,43 @@ class AutomationEngine:
         *,
         failsafe: bool = True,
         pause: float = 0.1,
+        audit: AuditSink | None = None,
+        input_backend: InputBackend | None = None,
+        max_batch: int = 256,
     ) -> None:
-        self._backend = backend or _get_backend()
+        if backend is None:
+            if input_backend is None:
+                backend = _get_backend()
+            else:
+                backend = getattr(input_backend, "module", None)
+        self._backend = backend
+        self._input = input_backend
+        self._max_batch = max(1, max_batch)
         self._logger = get_logger("autotool.automation")
         self._audit = get_logger("autotool.audit")
-        if hasattr(self._backend, "FAILSAFE"):
-            self._backend.FAILSAFE = failsafe
-        if hasattr(self._backend, "PAUSE"):
-            self._backend.PAUSE = pause
+        self._audit_sink = audit
+        if backend is not None and hasattr(backend, "FAILSAFE"):
+            backend.FAILSAFE = failsafe
+        if input_backend is None and backend is not None and hasattr(backend, "PAUSE"):
+            backend.PAUSE = pause
         self._paused = False
         self._stopped = False
 
+    @property
+    def input_backend(self) -> InputBackend | None:
+        return self._input
+
+    @property
+    def supports_batching(self) -> bool:
+        return self._input is not None and bool(self._input.capabilities & Capability.BATCH)
+
     def execute(self, action: Action | Mapping[str, Any], *, speed: float = 1.0) -> ExecutionResult:
+        action_obj = self._prepare(action)
+        if isinstance(action_obj, ExecutionResult):
+            return action_obj
+        return self._execute_prepared(action_obj, speed=speed)
+
+    def _prepare(self, action: Action | Mapping[str, Any]) -> Action | ExecutionResult:
         try:
             action_obj = Action.from_obj(action)
         except ActionError as exc:
@@ -79,43 +125,142 @@ class AutomationEngine:
                 success=False,
                 message=f"Unsupported action type: {action_obj.type}",
             )
+        return action_obj
+
+    def _execute_prepared(self, action_obj: Action, *, speed: float) -> ExecutionResult:
         if self._stopped:
             self._logger.warning("Execution stopped before action %s", action_obj.id)
             return ExecutionResult(action_id=action_obj.id, success=False, message="Execution stopped")
-        try:
+        sink = self._audit_sink
+        if sink is not None:
+            sink.emit("action_start", id=action_obj.id, type=action_obj.type)
+        else:
             self._audit.info("action_start id=%s type=%s", action_obj.id, action_obj.type)
-            result = self._execute_action(action_obj, speed=speed)
+        attempts = max(0, action_obj.retry) + 1
+        for attempt in range(1, attempts + 1):
+            try:
+                result = self._execute_action(action_obj, speed=speed)
+            except Exception as exc:
+                result = self._failure(action_obj, exc)
+                if self._is_failsafe(exc):
+                    break
+            if result.success or self._stopped:
+                break
+            if attempt < attempts:
+                self._logger.warning("Retrying action %s (%s/%s)", action_obj.id, attempt, action_obj.retry)
+        if sink is not None:
+            sink.emit("action_end", id=action_obj.id, success=result.success)
+        else:
             self._audit.info("action_end id=%s success=%s", action_obj.id, result.success)
-            return result
-        except Exception as exc:
-            failsafe_exc = getattr(self._backend, "FailSafeException", None)
-            if failsafe_exc is not None and isinstance(exc, failsafe_exc):
-                self._logger.warning("Failsafe triggered for action %s", action_obj.id)
-                return ExecutionResult(
-                    action_id=action_obj.id,
-                    success=False,
-                    message="Failsafe triggered",
-                    data={"error": exc.__class__.__name__},
-                )
-            self._logger.error("Action %s failed: %s", action_obj.id, exc)
+        return result
+
+    def _is_failsafe(self, exc: Exception) -> bool:
+        if isinstance(exc, InputBackendError):
+            exc = exc.error
+        failsafe_exc = getattr(self._backend, "FailSafeException", None)
+        if failsafe_exc is None and self._input is not None:
+            failsafe_exc = getattr(getattr(self._input, "module", None), "FailSafeException", None)
+        return failsafe_exc is not None and isinstance(exc, failsafe_exc)
+
+    def _failure(self, action_obj: Action, exc: Exception) -> ExecutionResult:
+        if isinstance(exc, InputBackendError):
+            exc = exc.error
+        if self._is_failsafe(exc):
+            self._logger.warning("Failsafe triggered for action %s", action_obj.id)
             return ExecutionResult(
                 action_id=action_obj.id,
                 success=False,
-                message=str(exc),
+                message="Failsafe triggered",
                 data={"error": exc.__class__.__name__},
             )
+        self._logger.error("Action %s failed: %s", action_obj.id, exc)
+        return ExecutionResult(
+            action_id=action_obj.id,
+            success=False,
+            message=str(exc),
+            data={"error": exc.__class__.__name__},
+        )
 
     def execute_sequence(
         self, actions: Iterable[Action | Mapping[str, Any]], *, speed: float = 1.0
     ) -> list[ExecutionResult]:
         results: list[ExecutionResult] = []
         self._stopped = False
+        batching = self.supports_batching
+        pending: list[tuple[Action, InputEvent, dict[str, Any] | None]] = []
         for action in actions:
-            while self._paused and not self._stopped:
-                time.sleep(0.05)
+            if not pending:
+                while self._paused and not self._stopped:
+                    time.sleep(0.05)
             if self._stopped:
                 break
-            results.append(self.execute(action, speed=speed))
+            if not batching:
+                results.append(self.execute(action, speed=speed))
+                continue
+            action_obj = self._prepare(action)
+            if isinstance(action_obj, ExecutionResult):
+                results.extend(self._send_batch(pending))
+                pending = []
+                results.append(action_obj)
+                continue
+            converted = None
+            if action_obj.retry <= 0 and action_obj.timeout is None:
+                try:
+                    converted = self._to_input_event(action_obj, speed=speed)
+                except ActionError:
+                    converted = None
+            if converted is None:
+                results.extend(self._send_batch(pending))
+                pending = []
+                results.append(self._execute_prepared(action_obj, speed=speed))
+                continue
+            pending.append((action_obj, *converted))
+            if len(pending) >= self._max_batch:
+                results.extend(self._send_batch(pending))
+                pending = []
+        if not self._stopped:
+            results.extend(self._send_batch(pending))
+        return results
+
+    def _send_batch(self, pending: list[tuple[Action, InputEvent, dict[str, Any] | None]]) -> list[ExecutionResult]:
+        if not pending:
+            return []
+        if self._stopped:
+            return [
+                ExecutionResult(action_id=action.id, success=False, message="Execution stopped")
+                for action, _, _ in pending
+            ]
+        sink = self._audit_sink
+        for action, _, _ in pending:
+            if sink is not None:
+                sink.emit("action_start", id=action.id, type=action.type)
+            else:
+                self._audit.info("action_start id=%s type=%s", action.id, action.type)
+        try:
+            self._input.send([event for _, event, _ in pending])
+        except InputBackendError as exc:
+            sent = min(max(0, exc.sent), len(pending) - 1)
+            results = [
+                ExecutionResult(action_id=action.id, success=True, data=data)
+                for action, _, data in pending[:sent]
+            ]
+            results.append(self._failure(pending[sent][0], exc))
+            results.extend(
+                ExecutionResult(action_id=action.id, success=False, message="Not sent: batch aborted")
+                for action, _, _ in pending[sent + 1 :]
+            )
+        except Exception as exc:
+            results = [self._failure(action, exc) for action, _, _ in pending]
+        else:
+            results = [
+                ExecutionResult(action_id=action.id, success=True, data=data)
+                for action, _, data in pending
+            ]
+        for result in results:
+            if sink is not None:
+                sink.emit("action_end", id=result.action_id, success=result.success)
+            else:
+                self._audit.info("action_end id=%s success=%s", result.action_id, result.success)
         return results
 
     def pause(self) -> None:
@@ -129,9 +274,83 @@ class AutomationEngine:
         self._paused = False
         self._logger.warning("Automation engine stopped")
 
+    def _to_input_event(
+        self, action: Action, *, speed: float
+    ) -> tuple[InputEvent, dict[str, Any] | None] | None:
+        action_type = action.type
+        if self._input is None or action_type not in INPUT_KINDS:
+            return None
+        if not self._input.capabilities & required_capability(action_type):
+            return None
+        params = action.params
+
+        if action_type == "click":
+            x = params.get("x")
+            y = params.get("y")
+            event_params: dict[str, Any] = {
+                "clicks": int(params.get("clicks", 1)),
+                "interval": _scale(float(params.get("interval", 0.0)), speed),
+                "button": params.get("button", "left"),
+            }
+            if x is not None and y is not None:
+                event_params["x"] = x
+                event_params["y"] = y
+            return InputEvent("click", event_params), {"x": x, "y": y}
+
+        if action_type == "move":
+            x = params.get("x")
+            y = params.get("y")
+            if x is None or y is None:
+                raise ActionError("Move action requires x and y")
+            duration = _scale(float(params.get("duration", 0.0)), speed)
+            return InputEvent("move", {"x": x, "y": y, "duration": duration}), {"x": x, "y": y}
+
+        if action_type == "type":
+            text = params.get("text")
+            if text is None:
+                raise ActionError("Type action requires text")
+            interval = _scale(float(params.get("interval", 0.0)), speed)
+            return InputEvent("type", {"text": str(text), "interval": interval}), None
+
+        if action_type == "hotkey":
+            return InputEvent("hotkey", {"keys": _hotkey_keys(params)}), None
+
+        if action_type in {"key_down", "key_up"}:
+            key = params.get("key")
+            if not key:
+                label = "Key down" if action_type == "key_down" else "Key up"
+                raise ActionError(f"{label} action requires key")
+            return InputEvent(action_type, {"key": str(key)}), None
+
+        if action_type in {"mouse_down", "mouse_up"}:
+            x = params.get("x")
+            y = params.get("y")
+            event_params = {"button": params.get("button", "left")}
+            if x is not None and y is not None:
+                event_params["x"] = x
+                event_params["y"] = y
+            return InputEvent(action_type, event_params), None
+
+        if action_type == "scroll":
+            x = params.get("x")
+            y = params.get("y")
+            dx = int(params.get("dx", 0))
+            dy = int(params.get("dy", 0))
+            event = InputEvent("scroll", {"x": x, "y": y, "dx": dx, "dy": dy})
+            return event, {"x": x, "y": y, "dx": dx, "dy": dy}
+
+        return None
+
     def _execute_action(self, action: Action, *, speed: float) -> ExecutionResult:
+        converted = self._to_input_event(action, speed=speed)
+        if converted is not None:
+            event, data = converted
+            self._input.send([event])
+            return ExecutionResult(action_id=action.id, success=True, data=data)
         params = dict(action.params)
         action_type = action.type
+        if self._backend is None and action_type != "wait":
+            raise ActionError(f"No backend available for action type: {action_type}")
 
         if action_type == "click":
             x = params.get("x")
@@ -169,15 +388,7 @@ class AutomationEngine:
             return ExecutionResult(action_id=action.id, success=True)
 
         if action_type == "hotkey":
-            keys = params.get("keys")
-            combo = params.get("combo")
-            if keys is None and combo is None:
-                raise ActionError("Hotkey action requires keys or combo")
-            if combo is not None:
-                keys = [item.strip() for item in str(combo).split("+") if item.strip()]
-            if isinstance(keys, str):
-                keys = [item.strip() for item in keys.split("+") if item.strip()]
-            self._backend.hotkey(*list(keys))
+            self._backend.hotkey(*_hotkey_keys(params))
             return ExecutionResult(action_id=action.id, success=True)
 
         if action_type == "wait":
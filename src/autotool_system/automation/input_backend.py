@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from enum import IntFlag
+from typing import Any, Protocol, Sequence, runtime_checkable
+import time
+
+
+class Capability(IntFlag):
+    NONE = 0
+    POINTER = 1
+    KEYBOARD = 2
+    SCROLL = 4
+    TEXT = 8
+    BATCH = 16
+
+
+ALL_CAPABILITIES = Capability.POINTER | Capability.KEYBOARD | Capability.SCROLL | Capability.TEXT | Capability.BATCH
+
+INPUT_KINDS = {
+    "click",
+    "move",
+    "type",
+    "hotkey",
+    "key_down",
+    "key_up",
+    "mouse_down",
+    "mouse_up",
+    "scroll",
+}
+
+INPUT_BACKENDS = {"legacy", "pyautogui"}
+
+
+class InputBackendError(RuntimeError):
+    def __init__(self, sent: int, error: Exception) -> None:
+        super().__init__(str(error))
+        self.sent = sent
+        self.error = error
+
+
+@dataclass(frozen=True)
+class InputEvent:
+    kind: str
+    params: dict[str, Any] = field(default_factory=dict)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {"kind": self.kind, "params": dict(self.params)}
+
+
+@runtime_checkable
+class InputBackend(Protocol):
+    capabilities: Capability
+
+    def send(self, events: Sequence[InputEvent]) -> None: ...
+
+
+def required_capability(kind: str) -> Capability:
+    if kind in {"type"}:
+        return Capability.TEXT
+    if kind in {"hotkey", "key_down", "key_up"}:
+        return Capability.KEYBOARD
+    if kind == "scroll":
+        return Capability.SCROLL
+    return Capability.POINTER
+
+
+class PyAutoGUIBackend:
+    capabilities = ALL_CAPABILITIES
+
+    def __init__(self, module: Any | None = None, *, pause: float = 0.0, failsafe: bool = True) -> None:
+        if module is None:
+            from .automation_engine import _get_backend
+
+            module = _get_backend()
+        self._module = module
+        self._pause = max(0.0, float(pause))
+        if hasattr(module, "FAILSAFE"):
+            module.FAILSAFE = failsafe
+        if hasattr(module, "PAUSE"):
+            module.PAUSE = 0
+
+    @property
+    def module(self) -> Any:
+        return self._module
+
+    def send(self, events: Sequence[InputEvent]) -> None:
+        for index, event in enumerate(events):
+            try:
+                self._send_one(event)
+            except Exception as exc:
+                raise InputBackendError(index, exc) from exc
+        if self._pause > 0 and events:
+            time.sleep(self._pause)
+
+    def _send_one(self, event: InputEvent) -> None:
+        module = self._module
+        params = event.params
+        kind = event.kind
+        if kind == "move":
+            module.moveTo(params["x"], params["y"], duration=params.get("duration", 0.0))
+        elif kind == "click":
+            module.click(**params)
+        elif kind == "mouse_down":
+            module.mouseDown(**params)
+        elif kind == "mouse_up":
+            module.mouseUp(**params)
+        elif kind == "key_down":
+            module.keyDown(params["key"])
+        elif kind == "key_up":
+            module.keyUp(params["key"])
+        elif kind == "hotkey":
+            module.hotkey(*params["keys"])
+        elif kind == "type":
+            writer = getattr(module, "write", None) or getattr(module, "typewrite")
+            writer(params["text"], interval=params.get("interval", 0.0))
+        elif kind == "scroll":
+            dx = params.get("dx", 0)
+            dy = params.get("dy", 0)
+            if dy != 0:
+                module.scroll(dy, x=params.get("x"), y=params.get("y"))
+            if dx != 0 and hasattr(module, "hscroll"):
+                module.hscroll(dx, x=params.get("x"), y=params.get("y"))
+        else:
+            raise ValueError(f"Unsupported input event: {kind}")
+
+
+def create_input_backend(
+    name: str | None, *, pause: float = 0.0, failsafe: bool = True
+) -> InputBackend | None:
+    if name is None or name == "legacy":
+        return None
+    if name == "pyautogui":
+        return PyAutoGUIBackend(pause=pause, failsafe=failsafe)
+    raise ValueError(f"Unknown input backend: {name}")
+
+
+class RecordingBackend:
+    def __init__(self, capabilities: Capability = ALL_CAPABILITIES) -> None:
+        self.capabilities = capabilities
+        self.events: list[InputEvent] = []
+        self.batches: list[list[InputEvent]] = []
+
+    def send(self, events: Sequence[InputEvent]) -> None:
+        batch = list(events)
+        for event in batch:
+            needed = required_capability(event.kind)
+            if not self.capabilities & needed:
+                raise ValueError(f"Backend does not support {event.kind}")
+        self.batches.append(batch)
+        self.events.extend(batch)
+
+    def kinds(self) -> list[str]:
+        return [event.kind for event in self.events]
+
+    def clear(self) -> None:
+        self.events.clear()
+        self.batches.clear()
+
@@ -0,0 +1,441 @@
+from __future__ import annotations
+
+from array import array
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Mapping
+import json
+import lzma
+import struct
+import sys
+import zlib
+
+
+COLUMNAR_MAGIC = b"ATRC"
+COLUMNAR_VERSION = 2
+COLUMNAR_SUFFIXES = {".atrec"}
+
+_COMPRESSION_CODES = {None: 0, "none": 0, "zlib": 1, "lzma": 2}
+_COMPRESSION_NAMES = {0: None, 1: "zlib", 2: "lzma"}
+
+_HEADER = struct.Struct("<4sHHII")
+
+_INT_FIELDS = ("x", "y", "dx", "dy", "vk")
+_STR_FIELDS = ("button", "key", "char")
+_BOOL_FIELDS = ("pressed",)
+_EVENT_KEYS = {"id", "ts", "type", "action", "payload", "delta"}
+
+_TS_INT = 1 << 0
+_DELTA_PRESENT = 1 << 1
+_DELTA_INT = 1 << 2
+_PAYLOAD_ABSENT = 1 << 3
+_FIELD_BASE = 4
+
+
+def _present_bit(index: int) -> int:
+    return 1 << (_FIELD_BASE + index * 2)
+
+
+def _null_bit(index: int) -> int:
+    return 1 << (_FIELD_BASE + index * 2 + 1)
+
+
+_ALL_FIELDS = _INT_FIELDS + _STR_FIELDS + _BOOL_FIELDS
+_FIELD_INDEX = {name: idx for idx, name in enumerate(_ALL_FIELDS)}
+
+
+class ColumnarError(RuntimeError):
+    pass
+
+
+class StringTable:
+    def __init__(self, values: Iterable[str] = ()) -> None:
+        self._values: list[str] = []
+        self._index: dict[str, int] = {}
+        for value in values:
+            self.intern(value)
+
+    def intern(self, value: str) -> int:
+        idx = self._index.get(value)
+        if idx is None:
+            idx = len(self._values)
+            self._values.append(value)
+            self._index[value] = idx
+        return idx
+
+    def get(self, idx: int) -> str | None:
+        if idx < 0:
+            return None
+        return self._values[idx]
+
+    @property
+    def values(self) -> list[str]:
+        return list(self._values)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+
+class ColumnarRecording:
+    def __init__(self, *, recorded_at: float | None = None) -> None:
+        self.recorded_at = recorded_at
+        self.strings = StringTable()
+        self.ts = array("d")
+        self.delta = array("d")
+        self.type_code = array("i")
+        self.action_code = array("i")
+        self.event_id = array("i")
+        self.event_seq = array("q")
+        self.flags = array("Q")
+        self.x = array("q")
+        self.y = array("q")
+        self.dx = array("q")
+        self.dy = array("q")
+        self.vk = array("q")
+        self.button = array("i")
+        self.key = array("i")
+        self.char = array("i")
+        self.extra = array("i")
+
+    def _columns(self) -> dict[str, array]:
+        return {
+            "ts": self.ts,
+            "delta": self.delta,
+            "type_code": self.type_code,
+            "action_code": self.action_code,
+            "event_id": self.event_id,
+            "event_seq": self.event_seq,
+            "flags": self.flags,
+            "x": self.x,
+            "y": self.y,
+            "dx": self.dx,
+            "dy": self.dy,
+            "vk": self.vk,
+            "button": self.button,
+            "key": self.key,
+            "char": self.char,
+            "extra": self.extra,
+        }
+
+    def __len__(self) -> int:
+        return len(self.ts)
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        return self.iter_events()
+
+    @classmethod
+    def from_events(
+        cls, events: Iterable[Mapping[str, Any]], *, recorded_at: float | None = None
+    ) -> "ColumnarRecording":
+        recording = cls(recorded_at=recorded_at)
+        for event in events:
+            recording.append(event)
+        return recording
+
+    @classmethod
+    def from_export(cls, payload: Mapping[str, Any] | list[Any]) -> "ColumnarRecording":
+        if isinstance(payload, Mapping):
+            events = payload.get("events")
+            recorded_at = payload.get("recorded_at")
+        else:
+            events = payload
+            recorded_at = None
+        if not isinstance(events, list):
+            raise ColumnarError("Recording export must contain a list of events")
+        return cls.from_events(events, recorded_at=recorded_at)
+
+    def to_export(self) -> dict[str, Any]:
+        return {
+            "version": 1,
+            "recorded_at": self.recorded_at,
+            "events": self.to_events(),
+        }
+
+    def to_events(self) -> list[dict[str, Any]]:
+        return list(self.iter_events())
+
+    def append(self, event: Mapping[str, Any]) -> None:
+        strings = self.strings
+        if not _is_event(event):
+            self._append_raw(event)
+            return
+        flags = 0
+        ts = event["ts"]
+        if type(ts) is int:
+            flags |= _TS_INT
+        delta = event.get("delta")
+        delta_value = 0.0
+        if "delta" in event:
+            flags |= _DELTA_PRESENT
+            if type(delta) is int:
+                flags |= _DELTA_INT
+            delta_value = float(delta)
+        event_id = event.get("id")
+        payload = event.get("payload")
+        if "payload" not in event:
+            flags |= _PAYLOAD_ABSENT
+            payload = {}
+
+        ints = {name: 0 for name in _INT_FIELDS}
+        strs = {name: -1 for name in _STR_FIELDS}
+        leftover: dict[str, Any] = {}
+        for name, value in payload.items():
+            idx = _FIELD_INDEX.get(name)
+            if idx is None:
+                leftover[name] = value
+                continue
+            if name in ints:
+                if value is None:
+                    flags |= _present_bit(idx) | _null_bit(idx)
+                elif type(value) is int and -(2**63) <= value < 2**63:
+                    flags |= _present_bit(idx)
+                    ints[name] = value
+                else:
+                    leftover[name] = value
+            elif name in strs:
+                if value is None:
+                    flags |= _present_bit(idx)
+                elif isinstance(value, str):
+                    flags |= _present_bit(idx)
+                    strs[name] = strings.intern(value)
+                else:
+                    leftover[name] = value
+            elif type(value) is bool:
+                flags |= _present_bit(idx)
+                if value:
+                    flags |= _null_bit(idx)
+            else:
+                leftover[name] = value
+
+        rest = {key: value for key, value in event.items() if key not in _EVENT_KEYS}
+        extra = -1
+        if leftover or rest:
+            extra = strings.intern(_dumps({"payload": leftover, "event": rest}))
+
+        self.ts.append(float(ts))
+        self.delta.append(delta_value)
+        self.type_code.append(strings.intern(event["type"]))
+        self.action_code.append(strings.intern(event["action"]))
+        if isinstance(event_id, str):
+            prefix, seq = _split_id(event_id)
+            self.event_id.append(strings.intern(prefix))
+            self.event_seq.append(seq)
+        else:
+            self.event_id.append(-1)
+            self.event_seq.append(-1)
+        self.flags.append(flags)
+        for name in _INT_FIELDS:
+            getattr(self, name).append(ints[name])
+        for name in _STR_FIELDS:
+            getattr(self, name).append(strs[name])
+        self.extra.append(extra)
+
+    def _append_raw(self, item: Any) -> None:
+        self.ts.append(0.0)
+        self.delta.append(0.0)
+        self.type_code.append(-1)
+        self.action_code.append(-1)
+        self.event_id.append(-1)
+        self.event_seq.append(-1)
+        self.flags.append(0)
+        for name in _INT_FIELDS:
+            getattr(self, name).append(0)
+        for name in _STR_FIELDS:
+            getattr(self, name).append(-1)
+        self.extra.append(self.strings.intern(_dumps(item)))
+
+    def event_at(self, idx: int) -> dict[str, Any]:
+        strings = self.strings
+        type_code = self.type_code[idx]
+        if type_code < 0:
+            return json.loads(strings.get(self.extra[idx]) or "null")
+        flags = self.flags[idx]
+        extra_idx = self.extra[idx]
+        extra = json.loads(strings.get(extra_idx)) if extra_idx >= 0 else {"payload": {}, "event": {}}
+
+        payload: dict[str, Any] = {}
+        for name in _INT_FIELDS:
+            field_idx = _FIELD_INDEX[name]
+            if flags & _present_bit(field_idx):
+                if flags & _null_bit(field_idx):
+                    payload[name] = None
+                else:
+                    payload[name] = getattr(self, name)[idx]
+        for name in _STR_FIELDS:
+            field_idx = _FIELD_INDEX[name]
+            if flags & _present_bit(field_idx):
+                payload[name] = strings.get(getattr(self, name)[idx])
+        for name in _BOOL_FIELDS:
+            field_idx = _FIELD_INDEX[name]
+            if flags & _present_bit(field_idx):
+                payload[name] = bool(flags & _null_bit(field_idx))
+        payload.update(extra["payload"])
+
+        ts: float | int = self.ts[idx]
+        if flags & _TS_INT:
+            ts = int(ts)
+        event: dict[str, Any] = {}
+        event_id = self.event_id[idx]
+        if event_id >= 0:
+            seq = self.event_seq[idx]
+            event["id"] = f"{strings.get(event_id)}-{seq}" if seq >= 0 else strings.get(event_id)
+        event["ts"] = ts
+        event["type"] = strings.get(type_code)
+        event["action"] = strings.get(self.action_code[idx])
+        if not flags & _PAYLOAD_ABSENT:
+            event["payload"] = payload
+        if flags & _DELTA_PRESENT:
+            delta: float | int = self.delta[idx]
+            event["delta"] = int(delta) if flags & _DELTA_INT else delta
+        event.update(extra["event"])
+        return event
+
+    def iter_events(self) -> Iterator[dict[str, Any]]:
+        for idx in range(len(self)):
+            yield self.event_at(idx)
+
+    def nbytes(self) -> int:
+        columns = sum(column.itemsize * len(column) for column in self._columns().values())
+        return columns + sum(len(value.encode("utf-8")) for value in self.strings.values)
+
+    def to_numpy(self) -> dict[str, Any]:
+        try:
+            import numpy
+        except Exception as exc:
+            raise ColumnarError(f"numpy is not available: {exc}") from exc
+        return {name: numpy.frombuffer(column, dtype=column.typecode) for name, column in self._columns().items()}
+
+    def to_bytes(self, *, compression: str | None = "zlib") -> bytes:
+        if compression not in _COMPRESSION_CODES:
+            raise ColumnarError(f"Unsupported compression: {compression}")
+        body = bytearray()
+        values = self.strings.values
+        body += struct.pack("<I", len(values))
+        for value in values:
+            encoded = value.encode("utf-8")
+            body += struct.pack("<I", len(encoded))
+            body += encoded
+        columns = self._columns()
+        body += struct.pack("<H", len(columns))
+        for name, column in columns.items():
+            data = column
+            if sys.byteorder != "little":
+                data = array(column.typecode, column)
+                data.byteswap()
+            raw = data.tobytes()
+            encoded_name = name.encode("ascii")
+            body += struct.pack("<B", len(encoded_name)) + encoded_name
+            body += column.typecode.encode("ascii")
+            body += struct.pack("<Q", len(raw))
+            body += raw
+        code = _COMPRESSION_CODES[compression]
+        payload = bytes(body)
+        if code == 1:
+            payload = zlib.compress(payload, 6)
+        elif code == 2:
+            payload = lzma.compress(payload)
+        meta = _dumps({"recorded_at": self.recorded_at}).encode("utf-8")
+        header = _HEADER.pack(COLUMNAR_MAGIC, COLUMNAR_VERSION, code, len(self), len(meta))
+        return header + meta + payload
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "ColumnarRecording":
+        if len(data) < _HEADER.size:
+            raise ColumnarError("Columnar recording is truncated")
+        magic, version, code, count, meta_len = _HEADER.unpack_from(data, 0)
+        if magic != COLUMNAR_MAGIC:
+            raise ColumnarError("Not a columnar recording file")
+        if version > COLUMNAR_VERSION:
+            raise ColumnarError(f"Unsupported columnar recording version: {version}")
+        if code not in _COMPRESSION_NAMES:
+            raise ColumnarError(f"Unsupported compression code: {code}")
+        offset = _HEADER.size
+        try:
+            meta = json.loads(data[offset : offset + meta_len].decode("utf-8"))
+        except (UnicodeDecodeError, ValueError) as exc:
+            raise ColumnarError(f"Columnar recording metadata is corrupt: {exc}") from exc
+        if not isinstance(meta, Mapping):
+            raise ColumnarError("Columnar recording metadata must be an object")
+        body = data[offset + meta_len :]
+        try:
+            if code == 1:
+                body = zlib.decompress(body)
+            elif code == 2:
+                body = lzma.decompress(body)
+        except (zlib.error, lzma.LZMAError) as exc:
+            raise ColumnarError(f"Columnar recording is corrupt: {exc}") from exc
+
+        recording = cls(recorded_at=meta.get("recorded_at"))
+        try:
+            pos = 0
+            (n_strings,) = struct.unpack_from("<I", body, pos)
+            pos += 4
+            values: list[str] = []
+            for _ in range(n_strings):
+                (length,) = struct.unpack_from("<I", body, pos)
+                pos += 4
+                values.append(body[pos : pos + length].decode("utf-8"))
+                pos += length
+            recording.strings = StringTable(values)
+            (n_columns,) = struct.unpack_from("<H", body, pos)
+            pos += 2
+            columns = recording._columns()
+            for _ in range(n_columns):
+                (name_len,) = struct.unpack_from("<B", body, pos)
+                pos += 1
+                name = body[pos : pos + name_len].decode("ascii")
+                pos += name_len
+                typecode = chr(body[pos])
+                pos += 1
+                (byte_len,) = struct.unpack_from("<Q", body, pos)
+                pos += 8
+                column = array(typecode)
+                column.frombytes(body[pos : pos + byte_len])
+                pos += byte_len
+                if sys.byteorder != "little":
+                    column.byteswap()
+                if name in columns:
+                    setattr(recording, name, column)
+        except (struct.error, UnicodeDecodeError, ValueError) as exc:
+            raise ColumnarError(f"Columnar recording is corrupt: {exc}") from exc
+        if version < 2:
+            recording.event_seq = array("q", [-1]) * count
+        if any(len(column) != count for column in recording._columns().values()):
+            raise ColumnarError("Columnar recording columns have inconsistent lengths")
+        return recording
+
+    def save(self, path: str | Path, *, compression: str | None = "zlib") -> Path:
+        target = Path(path)
+        target.write_bytes(self.to_bytes(compression=compression))
+        return target
+
+    @classmethod
+    def load(cls, path: str | Path) -> "ColumnarRecording":
+        return cls.from_bytes(Path(path).read_bytes())
+
+
+def _is_event(item: Any) -> bool:
+    if not isinstance(item, Mapping):
+        return False
+    if not isinstance(item.get("type"), str) or not isinstance(item.get("action"), str):
+        return False
+    ts = item.get("ts")
+    if type(ts) not in (int, float):
+        return False
+    if "delta" in item and type(item.get("delta")) not in (int, float):
+        return False
+    if "id" in item and not isinstance(item.get("id"), str):
+        return False
+    if "payload" in item and not isinstance(item.get("payload"), Mapping):
+        return False
+    return True
+
+
+def _split_id(event_id: str) -> tuple[str, int]:
+    prefix, sep, suffix = event_id.rpartition("-")
+    if sep and suffix.isascii() and suffix.isdigit() and (suffix == "0" or suffix[0] != "0") and len(suffix) < 19:
+        return prefix, int(suffix)
+    return event_id, -1
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"), sort_keys=True)
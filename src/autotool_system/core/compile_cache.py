@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Mapping
+import hashlib
+import json
+import threading
+
+from ..automation import Action
+from ..utils.database import Database
+from ..utils.logger import get_logger
+from .workflow_builder import WorkflowBuilder
+from .workflow_vm import WorkflowProgram, compile_program, has_control_nodes
+
+
+_VOLATILE_FIELDS = ("created_at", "updated_at")
+
+
+def workflow_digest(workflow: Mapping[str, Any]) -> str:
+    content = {key: value for key, value in workflow.items() if key not in _VOLATILE_FIELDS}
+    payload = json.dumps(content, sort_keys=True, separators=(",", ":"), ensure_ascii=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+@dataclass(frozen=True)
+class CompiledWorkflow:
+    workflow_id: str
+    digest: str
+    actions: tuple[dict[str, Any], ...]
+    source: str
+    program: WorkflowProgram | None = None
+
+    def action_dicts(self) -> list[dict[str, Any]]:
+        return list(self.actions)
+
+    def to_actions(self) -> list[Action]:
+        return [Action.from_obj(action) for action in self.actions]
+
+
+class CompileCache:
+    def __init__(self, builder: WorkflowBuilder, *, db: Database | None = None, max_entries: int = 128) -> None:
+        self._builder = builder
+        self._db = db
+        self._max_entries = max(1, max_entries)
+        self._memory: OrderedDict[str, CompiledWorkflow] = OrderedDict()
+        self._by_id: dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._db_hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+        self._logger = get_logger("autotool.workflow.cache")
+        if db is not None:
+            db.on_workflow_change(self.invalidate)
+
+    def lookup(self, workflow_id: str) -> CompiledWorkflow | None:
+        with self._lock:
+            digest = self._by_id.get(workflow_id)
+            plan = self._memory.get(digest) if digest is not None else None
+            if plan is not None and plan.workflow_id == workflow_id:
+                self._memory.move_to_end(digest)
+                self._hits += 1
+                return plan
+        return None
+
+    def plan(self, workflow_id: str) -> CompiledWorkflow | None:
+        plan = self.lookup(workflow_id)
+        if plan is not None:
+            return plan
+        if self._db is None:
+            return None
+        workflow = self._db.get_workflow(workflow_id)
+        if workflow is None:
+            return None
+        return self.compile(workflow)
+
+    def compile(self, workflow: Mapping[str, Any]) -> CompiledWorkflow:
+        workflow_id = str(workflow.get("id") or "")
+        digest = workflow_digest(workflow)
+        with self._lock:
+            plan = self._memory.get(digest)
+            if plan is not None and plan.workflow_id == workflow_id:
+                self._memory.move_to_end(digest)
+                self._by_id[workflow_id] = digest
+                self._hits += 1
+                return plan
+        if has_control_nodes(workflow):
+            program = compile_program(workflow)
+            plan = CompiledWorkflow(workflow_id, digest, tuple(program.action_dicts()), "compiled", program)
+            with self._lock:
+                self._misses += 1
+                self._remember(plan)
+            return plan
+        rows = self._db.get_workflow_plan(workflow_id, digest) if self._db is not None and workflow_id else None
+        if rows is not None:
+            plan = CompiledWorkflow(workflow_id, digest, tuple(rows), "db")
+            with self._lock:
+                self._db_hits += 1
+                self._remember(plan)
+            return plan
+        actions = [action.to_dict() for action in self._builder.compile(workflow)]
+        plan = CompiledWorkflow(workflow_id, digest, tuple(actions), "compiled")
+        with self._lock:
+            self._misses += 1
+            self._remember(plan)
+        if self._db is not None and workflow_id:
+            try:
+                self._db.save_workflow_plan(workflow_id, digest, actions)
+            except Exception as exc:
+                self._logger.warning("Could not persist plan for %s: %s", workflow_id, exc)
+        return plan
+
+    def invalidate(self, workflow_id: str) -> None:
+        with self._lock:
+            digest = self._by_id.pop(workflow_id, None)
+            if digest is not None:
+                self._memory.pop(digest, None)
+                self._invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            self._by_id.clear()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._db_hits + self._misses
+            return {
+                "entries": len(self._memory),
+                "capacity": self._max_entries,
+                "hits": self._hits,
+                "db_hits": self._db_hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "invalidations": self._invalidations,
+                "hit_ratio": (self._hits + self._db_hits) / lookups if lookups else 0.0,
+                "persistent": self._db is not None,
+            }
+
+    def _remember(self, plan: CompiledWorkflow) -> None:
+        self._memory[plan.digest] = plan
+        self._memory.move_to_end(plan.digest)
+        self._by_id[plan.workflow_id] = plan.digest
+        while len(self._memory) > self._max_entries:
+            digest, evicted = self._memory.popitem(last=False)
+            if self._by_id.get(evicted.workflow_id) == digest:
+                del self._by_id[evicted.workflow_id]
+            self._evictions += 1
@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Callable, Mapping
+import time
+
+from ..automation.screen_control import ScreenControl
+
+
+Region = tuple[int, int, int, int]
+Grabber = Callable[[Region], Any]
+
+
+class FingerprintError(RuntimeError):
+    pass
+
+
+def average_hash(image: Any, *, hash_size: int = 8) -> int:
+    try:
+        small = image.convert("L").resize((hash_size, hash_size))
+    except AttributeError as exc:
+        raise FingerprintError("Fingerprint source must be a PIL image") from exc
+    pixels = small.tobytes()
+    mean = sum(pixels) / len(pixels)
+    value = 0
+    for pixel in pixels:
+        value = (value << 1) | (1 if pixel >= mean else 0)
+    return value
+
+
+def hamming(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+class FingerprintProbe:
+    def __init__(
+        self,
+        grab: Grabber | None = None,
+        *,
+        size: int = 32,
+        hash_size: int = 8,
+    ) -> None:
+        self._grab = grab
+        self._size = max(hash_size, size)
+        self._hash_size = hash_size
+
+    @property
+    def hash_size(self) -> int:
+        return self._hash_size
+
+    def region(self, x: int, y: int) -> Region:
+        half = self._size // 2
+        return (max(0, int(x) - half), max(0, int(y) - half), self._size, self._size)
+
+    def hash_at(self, x: int, y: int) -> int:
+        if self._grab is None:
+            self._grab = ScreenControl().screenshot
+        return average_hash(self._grab(self.region(x, y)), hash_size=self._hash_size)
+
+    def capture(self, x: int, y: int) -> str:
+        digits = (self._hash_size * self._hash_size + 3) // 4
+        return format(self.hash_at(x, y), f"0{digits}x")
+
+    def distance(self, x: int, y: int, fingerprint: str) -> int:
+        return hamming(self.hash_at(x, y), int(fingerprint, 16))
+
+
+@dataclass(frozen=True)
+class ReadinessOptions:
+    timeout: float = 10.0
+    interval: float = 0.05
+    threshold: int = 6
+    strict: bool = False
+
+    @classmethod
+    def from_obj(cls, value: "ReadinessOptions | Mapping[str, Any] | bool | None") -> "ReadinessOptions | None":
+        if value is None or value is False or isinstance(value, ReadinessOptions):
+            return value or None
+        if value is True:
+            return cls()
+        if not isinstance(value, Mapping):
+            raise ValueError("Readiness options must be a mapping or boolean")
+        options = cls(
+            timeout=float(value.get("timeout", 10.0)),
+            interval=float(value.get("interval", 0.05)),
+            threshold=int(value.get("threshold", 6)),
+            strict=bool(value.get("strict", False)),
+        )
+        if options.timeout < 0 or options.interval <= 0 or options.threshold < 0:
+            raise ValueError("Readiness timeout/interval/threshold must be positive")
+        return options
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "timeout": self.timeout,
+            "interval": self.interval,
+            "threshold": self.threshold,
+            "strict": self.strict,
+        }
+
+
+@dataclass
+class ReadinessReport:
+    checked: int = 0
+    matched: int = 0
+    timed_out: int = 0
+    errors: int = 0
+    recorded: float = 0.0
+    waited: float = 0.0
+    steps: list[dict[str, Any]] = field(default_factory=list)
+
+    @property
+    def saved(self) -> float:
+        return self.recorded - self.waited
+
+    def add(self, index: int, step_id: str, recorded: float, waited: float, matched: bool) -> None:
+        self.checked += 1
+        if matched:
+            self.matched += 1
+        else:
+            self.timed_out += 1
+        self.recorded += recorded
+        self.waited += waited
+        self.steps.append(
+            {
+                "index": index,
+                "step_id": step_id,
+                "recorded": recorded,
+                "waited": waited,
+                "saved": recorded - waited,
+                "matched": matched,
+            }
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "checked": self.checked,
+            "matched": self.matched,
+            "timed_out": self.timed_out,
+            "errors": self.errors,
+            "recorded": self.recorded,
+            "waited": self.waited,
+            "saved": self.saved,
+            "steps": list(self.steps),
+        }
+
+
+def wait_until_ready(
+    probe: FingerprintProbe,
+    x: int,
+    y: int,
+    fingerprint: str,
+    *,
+    timeout: float,
+    interval: float = 0.05,
+    threshold: int = 6,
+    should_stop: Callable[[], bool] | None = None,
+) -> tuple[bool, float]:
+    started = time.perf_counter()
+    deadline = started + timeout
+    while True:
+        if probe.distance(x, y, fingerprint) <= threshold:
+            return True, time.perf_counter() - started
+        now = time.perf_counter()
+        if now >= deadline or (should_stop is not None and should_stop()):
+            return False, now - started
+        time.sleep(min(interval, deadline - now))
@@ -1,15 +1,18 @@
 from __future__ import annotations
 
+from itertools import islice
 from pathlib import Path
 from typing import Any, Mapping
 from uuid import uuid4
-import json
 import time
 
-import yaml
-
 from ..listeners.event import Event
 from ..utils.logger import get_logger
+from .columnar import ColumnarRecording
+from .fingerprint import FingerprintProbe
+from .recording_export import COMPRESSION_SUFFIXES, ExportReport, RecordingExportError, export_events
+from .recording_store import RecordingHandle, RecordingStore, RecordingWriter
+from .trajectory import SimplifyOptions, SimplifyReport, simplify_events
 
 
 class RecorderError(RuntimeError):
@@ -17,29 +20,87 @@ class RecorderError(RuntimeError):
 
 
 class Recorder:
-    def __init__(self, *, record_moves: bool = True, min_move_interval: float = 0.0) -> None:
-        self._events: list[dict[str, Any]] = []
+    def __init__(
+        self,
+        *,
+        record_moves: bool = True,
+        min_move_interval: float = 0.0,
+        compact: bool = False,
+        fingerprint: FingerprintProbe | None = None,
+        store: RecordingStore | None = None,
+    ) -> None:
+        self._compact = compact
+        self._fingerprint = fingerprint
+        self._store = store
+        self._events: list[dict[str, Any]] | ColumnarRecording | RecordingWriter = []
         self._recording = False
         self._last_ts: float | None = None
         self._last_move_ts: float | None = None
         self._record_moves = record_moves
         self._min_move_interval = min_move_interval
         self._started_at: float | None = None
+        self._simplify_report: SimplifyReport | None = None
+        self._export_report: ExportReport | None = None
         self._logger = get_logger("autotool.recorder")
 
+    def _new_storage(self) -> list[dict[str, Any]] | ColumnarRecording | RecordingWriter:
+        if self._store is not None:
+            return self._store.create()
+        return ColumnarRecording() if self._compact else []
+
     def start(self) -> None:
-        self._events = []
+        if isinstance(self._events, RecordingWriter) and not self._events.closed:
+            self._events.close(status="abandoned")
+        self._events = self._new_storage()
         self._last_ts = None
         self._last_move_ts = None
         self._recording = True
         self._started_at = time.time()
+        if isinstance(self._events, ColumnarRecording):
+            self._events.recorded_at = self._started_at
         self._logger.info("Recorder started")
 
     def stop(self) -> list[dict[str, Any]]:
         self._recording = False
         self._logger.info("Recorder stopped (%s events)", len(self._events))
+        if isinstance(self._events, RecordingWriter):
+            return list(self._events.close())
         return list(self._events)
 
+    def finish(self) -> RecordingHandle | None:
+        self._recording = False
+        self._logger.info("Recorder stopped (%s events)", len(self._events))
+        if isinstance(self._events, RecordingWriter):
+            return self._events.close()
+        return None
+
+    def handle(self) -> RecordingHandle | None:
+        if isinstance(self._events, RecordingWriter):
+            return self._events.handle()
+        return None
+
+    @property
+    def recording_id(self) -> str | None:
+        if isinstance(self._events, RecordingWriter):
+            return self._events.id
+        return None
+
+    @property
+    def count(self) -> int:
+        return len(self._events)
+
+    def events_since(self, cursor: int = 0, limit: int = 500) -> list[dict[str, Any]]:
+        events = self._events
+        if isinstance(events, list):
+            return events[cursor : cursor + limit]
+        if isinstance(events, RecordingWriter):
+            return list(islice(events.handle().iter_events(cursor), limit))
+        return list(islice(events, cursor, cursor + limit))
+
+    @property
+    def last_simplify_report(self) -> SimplifyReport | None:
+        return self._simplify_report
+
     @property
     def is_recording(self) -> bool:
         return self._recording
@@ -58,34 +119,76 @@ class Recorder:
         self._last_ts = event_obj.ts
         if event_obj.type == "mouse" and event_obj.action == "move":
             self._last_move_ts = event_obj.ts
-        self._events.append(
-            {
-                **event_obj.to_dict(),
-                "delta": delta,
-            }
-        )
+        record = {
+            **event_obj.to_dict(),
+            "delta": delta,
+        }
+        if self._fingerprint is not None and _is_click_target(event_obj):
+            self._capture_fingerprint(record["payload"])
+        self._events.append(record)
 
-    def export(self, path: str, *, fmt: str | None = None) -> Path:
+    def _capture_fingerprint(self, payload: dict[str, Any]) -> None:
+        try:
+            payload["fingerprint"] = self._fingerprint.capture(payload["x"], payload["y"])
+        except Exception as exc:
+            self._logger.debug("Fingerprint capture failed: %s", exc)
+
+    def export(
+        self,
+        path: str,
+        *,
+        fmt: str | None = None,
+        compression: str | None = "zlib",
+        simplify: SimplifyOptions | None = None,
+    ) -> Path:
         if not self._events:
             raise RecorderError("No recorded events to export")
         target = Path(path)
         format_name = (fmt or target.suffix.lstrip(".")).lower()
         if not format_name:
             raise RecorderError("Export format is required")
-        payload = {
-            "version": 1,
-            "recorded_at": self._started_at or time.time(),
-            "events": list(self._events),
-        }
-        if format_name in {"json"}:
-            target.write_text(json.dumps(payload, indent=2, ensure_ascii=True), encoding="utf-8")
-            self._logger.info("Recorder exported JSON to %s", target)
-            return target
-        if format_name in {"yaml", "yml"}:
-            target.write_text(yaml.safe_dump(payload, sort_keys=False), encoding="utf-8")
-            self._logger.info("Recorder exported YAML to %s", target)
+        events: Any = self._events
+        self._simplify_report = None
+        self._export_report = None
+        if simplify is not None:
+            self._simplify_report = SimplifyReport()
+            events = simplify_events(self._events, simplify, report=self._simplify_report)
+        recorded_at = self._started_at or time.time()
+        if format_name in {"atrec"}:
+            recording = events
+            if not isinstance(recording, ColumnarRecording):
+                recording = ColumnarRecording.from_events(events)
+            recording.recorded_at = recorded_at
+            recording.save(target, compression=compression)
+            if self._simplify_report is not None:
+                self._logger.info("Recorder path simplification: %s", self._simplify_report.to_dict())
+            self._logger.info("Recorder exported columnar recording to %s", target)
             return target
-        raise RecorderError(f"Unsupported export format: {format_name}")
+        try:
+            report = export_events(
+                events,
+                target,
+                fmt=fmt,
+                compression=compression if compression in COMPRESSION_SUFFIXES.values() else None,
+                recorded_at=recorded_at,
+            )
+        except RecordingExportError as exc:
+            raise RecorderError(str(exc)) from exc
+        self._export_report = report
+        if self._simplify_report is not None:
+            self._logger.info("Recorder path simplification: %s", self._simplify_report.to_dict())
+        self._logger.info(
+            "Recorder exported %s events as %s to %s (%.0f events/s)",
+            report.events,
+            report.format,
+            target,
+            report.events_per_second,
+        )
+        return target
+
+    @property
+    def last_export_report(self) -> ExportReport | None:
+        return self._export_report
 
     def _should_record(self, event: Event) -> bool:
         if event.type == "mouse" and event.action == "move":
@@ -115,3 +218,9 @@ class Recorder:
             action=str(action),
             payload=dict(payload),
         )
+
+
+def _is_click_target(event: Event) -> bool:
+    if event.type != "mouse" or event.action != "click" or event.payload.get("pressed") is not True:
+        return False
+    return isinstance(event.payload.get("x"), (int, float)) and isinstance(event.payload.get("y"), (int, float))
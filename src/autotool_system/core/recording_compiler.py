@@ -0,0 +1,408 @@
+from __future__ import annotations
+
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Iterable, Mapping
+
+from ..listeners.hotkeys import key_token
+from .replay_plan import ACTION_TYPES
+
+
+COMPILE_OUTPUTS = {"steps", "graph"}
+MOVE_POLICIES = {"before_click", "all", "none"}
+
+_MODIFIER_ORDER = ("ctrl", "alt", "shift", "cmd")
+_CHORD_MODIFIERS = {"ctrl", "alt", "cmd"}
+_KEY_NAMES = {
+    "cmd": "win",
+    "page_up": "pageup",
+    "page_down": "pagedown",
+    "caps_lock": "capslock",
+    "num_lock": "numlock",
+    "scroll_lock": "scrolllock",
+    "print_screen": "printscreen",
+}
+
+
+class RecordingCompileError(RuntimeError):
+    pass
+
+
+@dataclass(frozen=True)
+class CompileOptions:
+    output: str = "steps"
+    moves: str = "before_click"
+    min_wait: float = 0.05
+    max_wait: float | None = None
+    click_tolerance: int = 3
+    double_click_interval: float = 0.4
+    type_interval: float = 0.0
+
+    def __post_init__(self) -> None:
+        if self.output not in COMPILE_OUTPUTS:
+            raise ValueError(f"output must be one of: {', '.join(sorted(COMPILE_OUTPUTS))}")
+        if self.moves not in MOVE_POLICIES:
+            raise ValueError(f"moves must be one of: {', '.join(sorted(MOVE_POLICIES))}")
+        if self.min_wait < 0 or (self.max_wait is not None and self.max_wait < self.min_wait):
+            raise ValueError("min_wait must be >= 0 and max_wait >= min_wait")
+        if self.click_tolerance < 0 or self.double_click_interval < 0 or self.type_interval < 0:
+            raise ValueError("click_tolerance, double_click_interval and type_interval must be >= 0")
+
+    @classmethod
+    def from_obj(cls, value: "CompileOptions | Mapping[str, Any] | None") -> "CompileOptions":
+        if value is None:
+            return cls()
+        if isinstance(value, CompileOptions):
+            return value
+        if not isinstance(value, Mapping):
+            raise ValueError("Compile options must be a mapping")
+        max_wait = value.get("max_wait")
+        return cls(
+            output=str(value.get("output", "steps")),
+            moves=str(value.get("moves", "before_click")),
+            min_wait=float(value.get("min_wait", 0.05)),
+            max_wait=float(max_wait) if max_wait is not None else None,
+            click_tolerance=int(value.get("click_tolerance", 3)),
+            double_click_interval=float(value.get("double_click_interval", 0.4)),
+            type_interval=float(value.get("type_interval", 0.0)),
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "output": self.output,
+            "moves": self.moves,
+            "min_wait": self.min_wait,
+            "max_wait": self.max_wait,
+            "click_tolerance": self.click_tolerance,
+            "double_click_interval": self.double_click_interval,
+            "type_interval": self.type_interval,
+        }
+
+
+@dataclass
+class CompileReport:
+    events: int = 0
+    primitives: int = 0
+    steps: int = 0
+    recorded_seconds: float = 0.0
+    projected_seconds: float = 0.0
+    dropped_moves: int = 0
+    by_type: Counter[str] = field(default_factory=Counter)
+
+    @property
+    def step_reduction(self) -> float:
+        return 1.0 - self.steps / self.primitives if self.primitives else 0.0
+
+    @property
+    def time_reduction(self) -> float:
+        return 1.0 - self.projected_seconds / self.recorded_seconds if self.recorded_seconds > 0 else 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "events": self.events,
+            "primitives": self.primitives,
+            "steps": self.steps,
+            "step_reduction": self.step_reduction,
+            "recorded_seconds": self.recorded_seconds,
+            "projected_seconds": self.projected_seconds,
+            "time_reduction": self.time_reduction,
+            "dropped_moves": self.dropped_moves,
+            "by_type": dict(self.by_type),
+        }
+
+
+class _Compiler:
+    def __init__(self, options: CompileOptions, report: CompileReport) -> None:
+        self.options = options
+        self.report = report
+        self.actions: list[dict[str, Any]] = []
+        self.gap = 0.0
+        self.pending: tuple[str, dict[str, Any], float] | None = None
+        self.held: set[str] = set()
+        self.chorded: set[str] = set()
+        self.pointer: tuple[Any, Any] | None = None
+        self.pointer_moved = False
+        self.press: dict[str, Any] | None = None
+        self.since_click = 0.0
+
+    def feed(self, item: Mapping[str, Any]) -> None:
+        report = self.report
+        report.events += 1
+        delta = max(0.0, float(item.get("delta", 0.0) or 0.0))
+        report.recorded_seconds += delta
+        self.gap += delta
+        self.since_click += delta
+        event_type = item.get("type")
+        action = item.get("action")
+        payload = item.get("payload") or {}
+        if event_type == "mouse":
+            report.primitives += 1
+            if action == "move":
+                self._move(payload)
+            elif action == "click":
+                self._click(payload)
+            elif action == "scroll":
+                self._scroll(payload)
+            return
+        if event_type == "keyboard":
+            report.primitives += 1
+            if action == "press":
+                self._key_press(payload)
+            elif action == "release":
+                self._key_release(payload)
+            return
+        if event_type in ACTION_TYPES:
+            report.primitives += 1
+            self._flush()
+            self._emit(str(event_type), dict(item.get("params") or {}), item.get("timeout"), item.get("retry"))
+
+    def finish(self) -> list[dict[str, Any]]:
+        self._flush()
+        return self.actions
+
+    def _emit(
+        self,
+        action_type: str,
+        params: dict[str, Any],
+        timeout: Any = None,
+        retry: Any = None,
+        *,
+        wait: float | None = None,
+    ) -> None:
+        seconds = self.gap if wait is None else wait
+        if wait is None:
+            self.gap = 0.0
+        if seconds >= self.options.min_wait and self.actions:
+            if self.options.max_wait is not None:
+                seconds = min(seconds, self.options.max_wait)
+            self._append("wait", {"seconds": round(seconds, 4)})
+            self.report.projected_seconds += seconds
+        self._append(action_type, params, timeout, retry)
+
+    def _append(self, action_type: str, params: dict[str, Any], timeout: Any = None, retry: Any = None) -> None:
+        action: dict[str, Any] = {"id": f"s{len(self.actions) + 1}", "type": action_type, "params": params}
+        if timeout is not None:
+            action["timeout"] = timeout
+        if retry:
+            action["retry"] = retry
+        self.actions.append(action)
+        self.report.by_type[action_type] += 1
+        if action_type == "move":
+            self.report.projected_seconds += float(params.get("duration", 0.0))
+        elif action_type == "type":
+            self.report.projected_seconds += self.options.type_interval * len(params.get("text", ""))
+
+    def _hold(self, kind: str, params: dict[str, Any]) -> None:
+        self._flush()
+        self.pending = (kind, params, self.gap)
+        self.gap = 0.0
+
+    def _flush(self) -> None:
+        pending = self.pending
+        if pending is None:
+            return
+        self.pending = None
+        kind, params, wait = pending
+        if kind == "type":
+            params = {"text": "".join(params["chars"]), "interval": self.options.type_interval}
+        self._emit(kind, params, wait=wait)
+
+    def _pending(self, kind: str) -> dict[str, Any] | None:
+        pending = self.pending
+        return pending[1] if pending is not None and pending[0] == kind else None
+
+    def _flush_pointer(self, x: Any, y: Any) -> None:
+        pointer = self.pointer
+        moved = self.pointer_moved
+        self.pointer_moved = False
+        if pointer is None or not moved or self.options.moves != "before_click" or self._near(pointer, (x, y)):
+            return
+        self.report.dropped_moves -= 1
+        self._emit("move", {"x": pointer[0], "y": pointer[1], "duration": 0.0})
+
+    def _move(self, payload: Mapping[str, Any]) -> None:
+        x, y = payload.get("x"), payload.get("y")
+        if self.press is None and self.options.moves == "all":
+            self._flush()
+            self._emit("move", {"x": x, "y": y, "duration": 0.0})
+        else:
+            self.report.dropped_moves += 1
+        if self.press is None:
+            self.pointer = (x, y)
+            self.pointer_moved = True
+
+    def _click(self, payload: Mapping[str, Any]) -> None:
+        x, y = payload.get("x"), payload.get("y")
+        button = payload.get("button", "left")
+        pressed = payload.get("pressed")
+        if pressed is True:
+            last = self._pending("click")
+            double = (
+                last is not None
+                and last["button"] == button
+                and self.since_click <= self.options.double_click_interval
+                and self._near((last["x"], last["y"]), (x, y))
+            )
+            if not double:
+                self._flush()
+                self._flush_pointer(x, y)
+            self.press = {"x": x, "y": y, "button": button, "double": double, "interval": self.since_click}
+            if not double:
+                self.press["wait"] = self.gap
+            self.gap = 0.0
+            self.since_click = 0.0
+            return
+        if pressed is not False:
+            return
+        press = self.press
+        self.press = None
+        if press is None or press["button"] != button:
+            self._flush()
+            self._emit("mouse_up", {"x": x, "y": y, "button": button})
+            return
+        hold = self.since_click
+        self.since_click = 0.0
+        self.pointer = (x, y)
+        self.pointer_moved = False
+        if self._near((press["x"], press["y"]), (x, y)):
+            last = self._pending("click")
+            if press["double"] and last is not None:
+                last["clicks"] += 1
+                last["interval"] = round(press["interval"], 4)
+            else:
+                self._flush()
+                self.pending = (
+                    "click",
+                    {"x": press["x"], "y": press["y"], "button": button, "clicks": 1, "interval": 0.0},
+                    press.get("wait", 0.0),
+                )
+            self.gap = 0.0
+            return
+        self._flush()
+        self._emit("mouse_down", {"x": press["x"], "y": press["y"], "button": button}, wait=press.get("wait", 0.0))
+        self._append("move", {"x": x, "y": y, "duration": round(hold, 4)})
+        self._append("mouse_up", {"x": x, "y": y, "button": button})
+        self.gap = 0.0
+
+    def _scroll(self, payload: Mapping[str, Any]) -> None:
+        x, y = payload.get("x"), payload.get("y")
+        dx, dy = int(payload.get("dx", 0) or 0), int(payload.get("dy", 0) or 0)
+        scroll = self._pending("scroll")
+        if scroll is not None and self._near((scroll["x"], scroll["y"]), (x, y)):
+            scroll["dx"] += dx
+            scroll["dy"] += dy
+            self.gap = 0.0
+            return
+        self._flush()
+        self._flush_pointer(x, y)
+        self._hold("scroll", {"x": x, "y": y, "dx": dx, "dy": dy})
+
+    def _key_press(self, payload: Mapping[str, Any]) -> None:
+        raw = str(payload.get("key") or payload.get("char") or "")
+        if not raw:
+            return
+        token = key_token(raw)
+        if token in _MODIFIER_ORDER:
+            self.held.add(token)
+            return
+        chord = [name for name in _MODIFIER_ORDER if name in self.held]
+        if any(name in _CHORD_MODIFIERS for name in chord):
+            self.chorded.update(chord)
+            self._flush()
+            self._emit("hotkey", {"keys": [_key_name(name) for name in chord] + [_key_name(token)]})
+            return
+        text = _printable(payload.get("char"), raw, token)
+        if text is not None:
+            typing = self._pending("type")
+            if typing is None:
+                self._hold("type", {"chars": [text]})
+            else:
+                typing["chars"].append(text)
+                self.gap = 0.0
+            return
+        self._flush()
+        self._emit("hotkey", {"keys": [_key_name(name) for name in chord] + [_key_name(token)]})
+
+    def _key_release(self, payload: Mapping[str, Any]) -> None:
+        raw = str(payload.get("key") or payload.get("char") or "")
+        token = key_token(raw) if raw else ""
+        if token not in self.held:
+            return
+        self.held.discard(token)
+        if token in self.chorded:
+            self.chorded.discard(token)
+            return
+        if token == "cmd" and not self.held:
+            self._flush()
+            self._emit("hotkey", {"keys": ["win"]})
+
+    def _near(self, a: tuple[Any, Any], b: tuple[Any, Any]) -> bool:
+        if None in a or None in b:
+            return a == b
+        tolerance = self.options.click_tolerance
+        return abs(a[0] - b[0]) <= tolerance and abs(a[1] - b[1]) <= tolerance
+
+
+def _printable(char: Any, raw: str, token: str) -> str | None:
+    if isinstance(char, str) and len(char) == 1 and char.isprintable():
+        return char
+    if token == "space":
+        return " "
+    if len(raw) == 1 and raw.isprintable():
+        return raw
+    return None
+
+
+def _key_name(token: str) -> str:
+    return _KEY_NAMES.get(token, token)
+
+
+def compile_recording(
+    events: Iterable[Mapping[str, Any]],
+    *,
+    workflow_id: str,
+    name: str,
+    options: CompileOptions | None = None,
+    report: CompileReport | None = None,
+) -> dict[str, Any]:
+    options = options or CompileOptions()
+    report = report if report is not None else CompileReport()
+    compiler = _Compiler(options, report)
+    for item in events:
+        if not isinstance(item, Mapping):
+            raise RecordingCompileError("Recording entries must be mappings")
+        compiler.feed(item)
+    steps = compiler.finish()
+    if not steps:
+        raise RecordingCompileError("Recording contains no compilable events")
+    report.steps = len(steps)
+    if options.output == "graph":
+        return {"id": workflow_id, "name": name, "graph": steps_to_graph(steps)}
+    return {"id": workflow_id, "name": name, "steps": steps}
+
+
+def steps_to_graph(steps: list[dict[str, Any]], *, spacing: int = 120) -> dict[str, Any]:
+    nodes: list[dict[str, Any]] = [
+        {
+            "id": "start",
+            "type": "trigger.manual",
+            "data": {"title": "Start"},
+            "meta": {"position": {"x": 100, "y": 0}},
+        }
+    ]
+    edges: list[dict[str, Any]] = []
+    previous = "start"
+    for index, step in enumerate(steps, start=1):
+        node_id = step["id"]
+        action = {key: value for key, value in step.items() if key != "id"}
+        nodes.append(
+            {
+                "id": node_id,
+                "type": f"action.{step['type']}",
+                "data": {"title": step["type"], "action": action},
+                "meta": {"position": {"x": 100, "y": index * spacing}},
+            }
+        )
+        edges.append({"id": f"e{index}", "sourceNodeID": previous, "targetNodeID": node_id})
+        previous = node_id
+    return {"nodes": nodes, "edges": edges}
@@ -0,0 +1,210 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from itertools import islice
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Mapping, TextIO
+import gzip
+import io
+import json
+import time
+
+import yaml
+
+
+STREAM_FORMATS = {"json", "jsonl", "yaml"}
+JSON_LINES_FORMATS = {"jsonl", "ndjson"}
+YAML_FORMATS = {"yaml", "yml"}
+COMPRESSION_SUFFIXES = {".gz": "gzip", ".zst": "zstd"}
+
+YamlDumper: Any = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+
+class RecordingExportError(RuntimeError):
+    pass
+
+
+@dataclass
+class ExportReport:
+    path: str
+    format: str
+    compression: str | None
+    events: int
+    raw_bytes: int
+    bytes: int
+    seconds: float
+
+    @property
+    def events_per_second(self) -> float:
+        return self.events / self.seconds if self.seconds > 0 else 0.0
+
+    @property
+    def megabytes_per_second(self) -> float:
+        return self.raw_bytes / 1_000_000 / self.seconds if self.seconds > 0 else 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "path": self.path,
+            "format": self.format,
+            "compression": self.compression,
+            "events": self.events,
+            "raw_bytes": self.raw_bytes,
+            "bytes": self.bytes,
+            "seconds": self.seconds,
+            "events_per_second": self.events_per_second,
+            "megabytes_per_second": self.megabytes_per_second,
+        }
+
+
+def resolve_format(path: str | Path, fmt: str | None = None, compression: str | None = None) -> tuple[str, str | None]:
+    target = Path(path)
+    suffix = target.suffix.lower()
+    detected = COMPRESSION_SUFFIXES.get(suffix)
+    if detected is not None:
+        compression = compression or detected
+        suffix = Path(target.stem).suffix.lower()
+    name = (fmt or suffix.lstrip(".")).lower()
+    if not name:
+        raise RecordingExportError("Export format is required")
+    for candidate, codec in COMPRESSION_SUFFIXES.items():
+        if name.endswith(candidate):
+            name = name[: -len(candidate)]
+            compression = compression or codec
+    if name in JSON_LINES_FORMATS:
+        name = "jsonl"
+    elif name in YAML_FORMATS:
+        name = "yaml"
+    if compression is not None and compression not in COMPRESSION_SUFFIXES.values():
+        raise RecordingExportError(f"Unsupported export compression: {compression}")
+    if compression is not None and name != "jsonl":
+        raise RecordingExportError("Compression is only supported for JSON Lines exports")
+    return name, compression
+
+
+def open_text(path: str | Path, mode: str = "r", compression: str | None = None) -> TextIO:
+    target = Path(path)
+    if compression is None:
+        compression = COMPRESSION_SUFFIXES.get(target.suffix.lower())
+    if compression is None:
+        return target.open(mode, encoding="utf-8", newline="\n" if mode == "w" else None)
+    if compression == "gzip":
+        return gzip.open(target, f"{mode}t", encoding="utf-8", compresslevel=6)
+    if compression == "zstd":
+        try:
+            import zstandard
+        except Exception as exc:
+            raise RecordingExportError(f"zstandard is not available: {exc}") from exc
+        if mode == "w":
+            stream = zstandard.ZstdCompressor(level=3).stream_writer(target.open("wb"))
+        else:
+            stream = zstandard.ZstdDecompressor().stream_reader(target.open("rb"))
+        return io.TextIOWrapper(stream, encoding="utf-8")
+    raise RecordingExportError(f"Unsupported export compression: {compression}")
+
+
+def export_events(
+    events: Iterable[Mapping[str, Any]],
+    path: str | Path,
+    *,
+    fmt: str | None = None,
+    compression: str | None = None,
+    recorded_at: float | None = None,
+    batch_size: int = 1024,
+) -> ExportReport:
+    target = Path(path)
+    name, compression = resolve_format(target, fmt, compression)
+    if name not in STREAM_FORMATS:
+        raise RecordingExportError(f"Unsupported export format: {name}")
+    header = {"version": 1, "recorded_at": recorded_at if recorded_at is not None else time.time()}
+    batches = _batched(events, max(1, batch_size))
+    started = time.perf_counter()
+    with open_text(target, "w", compression) as handle:
+        if name == "jsonl":
+            count, raw = _write_json_lines(handle, batches)
+        elif name == "yaml":
+            count, raw = _write_yaml(handle, batches, header)
+        else:
+            count, raw = _write_json(handle, batches, header)
+    elapsed = time.perf_counter() - started
+    return ExportReport(
+        path=str(target),
+        format=name,
+        compression=compression,
+        events=count,
+        raw_bytes=raw,
+        bytes=target.stat().st_size,
+        seconds=elapsed,
+    )
+
+
+def _batched(events: Iterable[Mapping[str, Any]], size: int) -> Iterator[list[Mapping[str, Any]]]:
+    iterator = iter(events)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _write_json_lines(handle: TextIO, batches: Iterator[list[Mapping[str, Any]]]) -> tuple[int, int]:
+    encode = json.JSONEncoder(ensure_ascii=True, separators=(",", ":")).encode
+    count = 0
+    raw = 0
+    for batch in batches:
+        chunk = "".join([encode(event) + "\n" for event in batch])
+        handle.write(chunk)
+        count += len(batch)
+        raw += len(chunk)
+    return count, raw
+
+
+def _write_json(
+    handle: TextIO,
+    batches: Iterator[list[Mapping[str, Any]]],
+    header: Mapping[str, Any],
+) -> tuple[int, int]:
+    encode = json.JSONEncoder(ensure_ascii=True, separators=(",", ":")).encode
+    opening = "{" + ",".join(f"{json.dumps(key)}:{encode(value)}" for key, value in header.items()) + ',"events":['
+    handle.write(opening)
+    raw = len(opening)
+    count = 0
+    for batch in batches:
+        chunk = ",".join([encode(event) for event in batch])
+        if count:
+            chunk = "," + chunk
+        handle.write("\n" + chunk)
+        count += len(batch)
+        raw += len(chunk) + 1
+    handle.write("\n]}\n")
+    return count, raw + 4
+
+
+def _write_yaml(
+    handle: TextIO,
+    batches: Iterator[list[Mapping[str, Any]]],
+    header: Mapping[str, Any],
+) -> tuple[int, int]:
+    opening = yaml.dump(dict(header), Dumper=YamlDumper, sort_keys=False)
+    handle.write(opening)
+    raw = len(opening)
+    count = 0
+    for batch in batches:
+        if not count:
+            handle.write("events:\n")
+            raw += 8
+        chunk = yaml.dump([_plain(event) for event in batch], Dumper=YamlDumper, sort_keys=False)
+        handle.write(chunk)
+        count += len(batch)
+        raw += len(chunk)
+    if not count:
+        handle.write("events: []\n")
+        raw += 11
+    return count, raw
+
+
+def _plain(event: Mapping[str, Any]) -> dict[str, Any]:
+    record = dict(event)
+    payload = record.get("payload")
+    if isinstance(payload, Mapping) and not isinstance(payload, dict):
+        record["payload"] = dict(payload)
+    return record
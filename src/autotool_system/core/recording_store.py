@@ -0,0 +1,349 @@
+from __future__ import annotations
+
+from pathlib import Path
+from itertools import islice
+from typing import Any, Iterator, Mapping
+from uuid import uuid4
+import json
+import os
+import threading
+import time
+
+from ..utils.logger import get_logger
+
+
+INDEX_NAME = "index.json"
+SEGMENT_PREFIX = "seg-"
+SEGMENT_SUFFIX = ".jsonl"
+
+
+class RecordingStoreError(RuntimeError):
+    pass
+
+
+def _segment_name(number: int) -> str:
+    return f"{SEGMENT_PREFIX}{number:06d}{SEGMENT_SUFFIX}"
+
+
+def _write_index(directory: Path, index: Mapping[str, Any]) -> None:
+    target = directory / INDEX_NAME
+    temp = directory / f"{INDEX_NAME}.tmp"
+    temp.write_text(json.dumps(index, ensure_ascii=True, separators=(",", ":")), encoding="utf-8")
+    temp.replace(target)
+
+
+def _read_index(directory: Path) -> dict[str, Any]:
+    path = directory / INDEX_NAME
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError) as exc:
+        raise RecordingStoreError(f"Recording index unreadable: {path}: {exc}") from exc
+    if not isinstance(data, dict) or not isinstance(data.get("segments"), list):
+        raise RecordingStoreError(f"Recording index invalid: {path}")
+    return data
+
+
+class RecordingHandle:
+    def __init__(self, directory: Path, index: Mapping[str, Any]) -> None:
+        self._directory = directory
+        self._index = dict(index)
+
+    @classmethod
+    def load(cls, directory: str | Path) -> "RecordingHandle":
+        path = Path(directory)
+        return cls(path, _read_index(path))
+
+    @property
+    def id(self) -> str:
+        return str(self._index["id"])
+
+    @property
+    def path(self) -> Path:
+        return self._directory
+
+    @property
+    def status(self) -> str:
+        return str(self._index.get("status", "unknown"))
+
+    @property
+    def count(self) -> int:
+        return int(self._index.get("count", 0))
+
+    @property
+    def segments(self) -> list[dict[str, Any]]:
+        return [dict(segment) for segment in self._index.get("segments", [])]
+
+    def __len__(self) -> int:
+        return self.count
+
+    def iter_lines(self, start: int = 0) -> Iterator[str]:
+        offset = 0
+        for segment in self._index.get("segments", []):
+            size = int(segment.get("count", 0))
+            if start >= offset + size:
+                offset += size
+                continue
+            skip = max(0, start - offset)
+            remaining = size - skip
+            with (self._directory / segment["name"]).open("r", encoding="utf-8") as handle:
+                for line in handle:
+                    if not remaining or not line.endswith("\n"):
+                        break
+                    if skip:
+                        skip -= 1
+                        continue
+                    remaining -= 1
+                    yield line
+            offset += size
+
+    def iter_events(self, start: int = 0) -> Iterator[dict[str, Any]]:
+        for line in self.iter_lines(start):
+            yield json.loads(line)
+
+    def page(self, cursor: int = 0, limit: int = 500) -> tuple[list[dict[str, Any]], int | None]:
+        if cursor < 0 or limit <= 0:
+            raise ValueError("cursor must be >= 0 and limit > 0")
+        events = list(islice(self.iter_events(cursor), limit))
+        next_cursor = cursor + len(events)
+        return events, next_cursor if next_cursor < self.count else None
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        return self.iter_events()
+
+    def refresh(self) -> "RecordingHandle":
+        self._index = _read_index(self._directory)
+        return self
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "id": self.id,
+            "status": self.status,
+            "count": self.count,
+            "created_at": self._index.get("created_at"),
+            "closed_at": self._index.get("closed_at"),
+            "segments": len(self._index.get("segments", [])),
+            "path": str(self._directory),
+        }
+
+
+class RecordingWriter:
+    def __init__(
+        self,
+        directory: Path,
+        index: dict[str, Any],
+        *,
+        segment_events: int,
+        fsync_interval: float,
+    ) -> None:
+        self._directory = directory
+        self._index = index
+        self._segment_events = max(1, segment_events)
+        self._fsync_interval = max(0.0, fsync_interval)
+        self._handle: Any | None = None
+        self._segment: dict[str, Any] | None = None
+        self._last_sync = time.monotonic()
+        self._lock = threading.Lock()
+        self._closed = False
+
+    @property
+    def id(self) -> str:
+        return str(self._index["id"])
+
+    @property
+    def count(self) -> int:
+        return int(self._index["count"])
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        with self._lock:
+            if self._handle is not None:
+                self._handle.flush()
+            handle = RecordingHandle(self._directory, self._index)
+        return handle.iter_events()
+
+    def append(self, event: Mapping[str, Any]) -> None:
+        line = json.dumps(event, ensure_ascii=True, separators=(",", ":")) + "\n"
+        with self._lock:
+            if self._closed:
+                raise RecordingStoreError("Recording writer is closed")
+            if self._handle is None or self._segment["count"] >= self._segment_events:
+                self._roll()
+            self._handle.write(line)
+            segment = self._segment
+            segment["count"] += 1
+            segment["bytes"] += len(line)
+            ts = event.get("ts")
+            if segment["first_ts"] is None:
+                segment["first_ts"] = ts
+            segment["last_ts"] = ts
+            self._index["count"] += 1
+            if time.monotonic() - self._last_sync >= self._fsync_interval:
+                self._sync()
+
+    def flush(self) -> None:
+        with self._lock:
+            if not self._closed:
+                self._sync()
+
+    def close(self, status: str = "complete") -> RecordingHandle:
+        with self._lock:
+            if not self._closed:
+                self._closed = True
+                self._close_segment()
+                self._index["status"] = status
+                self._index["closed_at"] = time.time()
+                _write_index(self._directory, self._index)
+            return RecordingHandle(self._directory, self._index)
+
+    def handle(self) -> RecordingHandle:
+        with self._lock:
+            if self._handle is not None:
+                self._handle.flush()
+            return RecordingHandle(self._directory, self._index)
+
+    def _roll(self) -> None:
+        self._close_segment()
+        number = len(self._index["segments"]) + 1
+        segment = {"name": _segment_name(number), "count": 0, "bytes": 0, "first_ts": None, "last_ts": None}
+        self._index["segments"].append(segment)
+        self._segment = segment
+        self._handle = (self._directory / segment["name"]).open("a", encoding="utf-8")
+        _write_index(self._directory, self._index)
+
+    def _close_segment(self) -> None:
+        if self._handle is None:
+            return
+        self._sync()
+        self._handle.close()
+        self._handle = None
+
+    def _sync(self) -> None:
+        if self._handle is not None:
+            self._handle.flush()
+            os.fsync(self._handle.fileno())
+        _write_index(self._directory, self._index)
+        self._last_sync = time.monotonic()
+
+
+class RecordingStore:
+    def __init__(
+        self,
+        root: str | Path,
+        *,
+        segment_events: int = 5000,
+        fsync_interval: float = 1.0,
+    ) -> None:
+        self._root = Path(root)
+        self._segment_events = segment_events
+        self._fsync_interval = fsync_interval
+        self._logger = get_logger("autotool.recording.store")
+
+    @property
+    def root(self) -> Path:
+        return self._root
+
+    def create(self, recording_id: str | None = None) -> RecordingWriter:
+        recording_id = recording_id or uuid4().hex
+        directory = self._root / recording_id
+        directory.mkdir(parents=True, exist_ok=False)
+        index = {
+            "version": 1,
+            "id": recording_id,
+            "status": "recording",
+            "created_at": time.time(),
+            "closed_at": None,
+            "count": 0,
+            "segments": [],
+        }
+        _write_index(directory, index)
+        self._logger.info("Recording %s opened at %s", recording_id, directory)
+        return RecordingWriter(
+            directory,
+            index,
+            segment_events=self._segment_events,
+            fsync_interval=self._fsync_interval,
+        )
+
+    def open(self, recording_id: str) -> RecordingHandle:
+        directory = self._root / recording_id
+        if not (directory / INDEX_NAME).exists():
+            raise RecordingStoreError(f"Recording not found: {recording_id}")
+        return RecordingHandle.load(directory)
+
+    def list(self) -> list[RecordingHandle]:
+        if not self._root.exists():
+            return []
+        handles: list[RecordingHandle] = []
+        for index_path in sorted(self._root.glob(f"*/{INDEX_NAME}")):
+            try:
+                handles.append(RecordingHandle(index_path.parent, _read_index(index_path.parent)))
+            except RecordingStoreError as exc:
+                self._logger.warning("%s", exc)
+        return handles
+
+    def delete(self, recording_id: str) -> bool:
+        directory = self._root / recording_id
+        if not (directory / INDEX_NAME).exists():
+            return False
+        for path in directory.iterdir():
+            path.unlink()
+        directory.rmdir()
+        return True
+
+    def recover(self, active: set[str] | None = None) -> list[RecordingHandle]:
+        recovered: list[RecordingHandle] = []
+        for handle in self.list():
+            if handle.status != "recording" or (active and handle.id in active):
+                continue
+            try:
+                recovered.append(self._recover(handle.path))
+            except OSError as exc:
+                self._logger.error("Failed to recover recording %s: %s", handle.id, exc)
+        return recovered
+
+    def _recover(self, directory: Path) -> RecordingHandle:
+        index = _read_index(directory)
+        known = {segment["name"]: segment for segment in index["segments"]}
+        segments: list[dict[str, Any]] = []
+        total = 0
+        for path in sorted(directory.glob(f"{SEGMENT_PREFIX}*{SEGMENT_SUFFIX}")):
+            segment = dict(known.get(path.name, {"name": path.name}))
+            count, size, first_ts, last_ts = _repair_segment(path)
+            segment.update({"count": count, "bytes": size, "first_ts": first_ts, "last_ts": last_ts})
+            segments.append(segment)
+            total += count
+        index.update({"segments": segments, "count": total, "status": "recovered", "closed_at": time.time()})
+        _write_index(directory, index)
+        self._logger.warning("Recovered interrupted recording %s (%s events)", index["id"], total)
+        return RecordingHandle(directory, index)
+
+
+def _repair_segment(path: Path) -> tuple[int, int, Any, Any]:
+    count = 0
+    valid = 0
+    first_ts: Any = None
+    last_ts: Any = None
+    with path.open("rb") as handle:
+        for raw in handle:
+            if not raw.endswith(b"\n"):
+                break
+            try:
+                event = json.loads(raw)
+            except ValueError:
+                break
+            count += 1
+            valid += len(raw)
+            ts = event.get("ts") if isinstance(event, dict) else None
+            if first_ts is None:
+                first_ts = ts
+            last_ts = ts
+    if valid != path.stat().st_size:
+        with path.open("r+b") as handle:
+            handle.truncate(valid)
+    return count, valid, first_ts, last_ts
@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Iterable, Iterator, Mapping
+
+from ..automation import Action
+from .replay_plan import PlanStep, ReplayPlan, compile_item
+
+
+@dataclass
+class InputState:
+    held_keys: list[str] = field(default_factory=list)
+    held_buttons: list[str] = field(default_factory=list)
+    pointer: tuple[int, int] | None = None
+
+    def observe(self, action: Action) -> None:
+        params = action.params
+        kind = action.type
+        if kind in {"move", "click", "mouse_down", "mouse_up", "scroll"}:
+            x = params.get("x")
+            y = params.get("y")
+            if isinstance(x, (int, float)) and isinstance(y, (int, float)):
+                self.pointer = (int(x), int(y))
+        if kind == "key_down":
+            key = str(params.get("key"))
+            if key not in self.held_keys:
+                self.held_keys.append(key)
+        elif kind == "key_up":
+            key = str(params.get("key"))
+            if key in self.held_keys:
+                self.held_keys.remove(key)
+        elif kind == "mouse_down":
+            button = str(params.get("button", "left"))
+            if button not in self.held_buttons:
+                self.held_buttons.append(button)
+        elif kind == "mouse_up":
+            button = str(params.get("button", "left"))
+            if button in self.held_buttons:
+                self.held_buttons.remove(button)
+
+    def restore_actions(self) -> list[Action]:
+        actions: list[Action] = []
+        if self.pointer is not None:
+            actions.append(Action.create("move", {"x": self.pointer[0], "y": self.pointer[1]}, action_id="restore-pointer"))
+        for key in self.held_keys:
+            actions.append(Action.create("key_down", {"key": key}, action_id=f"restore-key-{key}"))
+        for button in self.held_buttons:
+            params: dict[str, Any] = {"button": button}
+            if self.pointer is not None:
+                params.update({"x": self.pointer[0], "y": self.pointer[1]})
+            actions.append(Action.create("mouse_down", params, action_id=f"restore-button-{button}"))
+        return actions
+
+    def copy(self) -> "InputState":
+        return InputState(list(self.held_keys), list(self.held_buttons), self.pointer)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "held_keys": list(self.held_keys),
+            "held_buttons": list(self.held_buttons),
+            "pointer": list(self.pointer) if self.pointer is not None else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any] | None) -> "InputState":
+        if not data:
+            return cls()
+        pointer = data.get("pointer")
+        return cls(
+            held_keys=[str(key) for key in data.get("held_keys", [])],
+            held_buttons=[str(button) for button in data.get("held_buttons", [])],
+            pointer=(int(pointer[0]), int(pointer[1])) if pointer else None,
+        )
+
+
+@dataclass(frozen=True)
+class ReplayCheckpoint:
+    index: int
+    ts: float
+    state: InputState
+
+    def to_dict(self) -> dict[str, Any]:
+        return {"index": self.index, "ts": self.ts, **self.state.to_dict()}
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "ReplayCheckpoint":
+        return cls(index=int(data.get("index", 0)), ts=float(data.get("ts", 0.0)), state=InputState.from_dict(data))
+
+
+def seek(
+    items: Iterable[Action | Mapping[str, Any] | PlanStep],
+    *,
+    start_index: int = 0,
+    start_ts: float | None = None,
+) -> tuple[Iterator[tuple[int, PlanStep]], float]:
+    if isinstance(items, ReplayPlan):
+        if start_ts is not None:
+            start_index = max(start_index, items.index_at(start_ts))
+        begin = min(start_index, len(items))
+        elapsed = items.elapsed_before(begin)
+        steps = items.steps
+        return ((idx, steps[idx]) for idx in range(begin, len(steps))), elapsed
+
+    iterator = iter(items)
+    elapsed = 0.0
+    index = 0
+    pending: PlanStep | None = None
+    for item in iterator:
+        step = item if isinstance(item, PlanStep) else compile_item(index, item)
+        if index >= start_index and (start_ts is None or elapsed + step.delay >= start_ts):
+            pending = step
+            break
+        elapsed += step.delay
+        index += 1
+
+    def remaining() -> Iterator[tuple[int, PlanStep]]:
+        if pending is None:
+            return
+        yield index, pending
+        for offset, item in enumerate(iterator, start=index + 1):
+            yield offset, item if isinstance(item, PlanStep) else compile_item(offset, item)
+
+    return remaining(), elapsed
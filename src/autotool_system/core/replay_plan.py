@@ -0,0 +1,344 @@
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, Mapping
+import hashlib
+import json
+import os
+import threading
+
+from ..automation import Action, ActionError
+from ..utils.logger import get_logger
+from .recording_store import INDEX_NAME
+
+
+PLAN_VERSION = 2
+
+ACTION_TYPES = {
+    "click",
+    "move",
+    "type",
+    "hotkey",
+    "wait",
+    "screenshot",
+    "key_down",
+    "key_up",
+    "mouse_down",
+    "mouse_up",
+    "scroll",
+}
+
+
+class ReplayPlanError(RuntimeError):
+    pass
+
+
+@dataclass(frozen=True)
+class PlanStep:
+    index: int
+    delay: float
+    action: Action | None
+    step_id: str
+    error: str | None = None
+    fingerprint: str | None = None
+
+    def to_row(self) -> list[Any]:
+        if self.action is None:
+            return [self.delay, None, self.error, self.step_id]
+        action = self.action
+        row = [self.delay, action.type, action.params, action.id, action.timeout, action.retry]
+        if self.fingerprint:
+            row.append(self.fingerprint)
+        return row
+
+    @classmethod
+    def from_row(cls, index: int, row: list[Any]) -> "PlanStep":
+        delay = float(row[0])
+        if row[1] is None:
+            return cls(index=index, delay=delay, action=None, step_id=str(row[3]), error=str(row[2]))
+        action = Action(id=str(row[3]), type=str(row[1]), params=dict(row[2]), timeout=row[4], retry=int(row[5]))
+        fingerprint = str(row[6]) if len(row) > 6 and row[6] else None
+        return cls(index=index, delay=delay, action=action, step_id=action.id, fingerprint=fingerprint)
+
+
+class ReplayPlan:
+    def __init__(self, steps: list[PlanStep], *, digest: str | None = None, source: str | None = None) -> None:
+        self._steps = steps
+        self._prefix: list[float] | None = None
+        self.digest = digest
+        self.source = source
+
+    @property
+    def steps(self) -> list[PlanStep]:
+        return self._steps
+
+    def __len__(self) -> int:
+        return len(self._steps)
+
+    def __iter__(self) -> Iterator[PlanStep]:
+        return iter(self._steps)
+
+    def __getitem__(self, index: int) -> PlanStep:
+        return self._steps[index]
+
+    def total_delay(self) -> float:
+        return self._offsets()[-1]
+
+    def elapsed_before(self, index: int) -> float:
+        prefix = self._offsets()
+        return prefix[max(0, min(index, len(self._steps)))]
+
+    def index_at(self, ts: float) -> int:
+        return bisect_left(self._offsets(), ts, 1) - 1
+
+    def _offsets(self) -> list[float]:
+        if self._prefix is None:
+            prefix = [0.0]
+            for step in self._steps:
+                prefix.append(prefix[-1] + step.delay)
+            self._prefix = prefix
+        return self._prefix
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "version": PLAN_VERSION,
+            "digest": self.digest,
+            "source": self.source,
+            "steps": [step.to_row() for step in self._steps],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "ReplayPlan":
+        if int(data.get("version", 0)) != PLAN_VERSION:
+            raise ReplayPlanError("Unsupported replay plan version")
+        rows = data.get("steps")
+        if not isinstance(rows, list):
+            raise ReplayPlanError("Replay plan requires steps")
+        steps = [PlanStep.from_row(idx, row) for idx, row in enumerate(rows)]
+        return cls(steps, digest=data.get("digest"), source=data.get("source"))
+
+
+def compile_item(index: int, item: Action | Mapping[str, Any]) -> PlanStep:
+    default_id = f"step-{index}"
+    if isinstance(item, Action):
+        return PlanStep(index=index, delay=0.0, action=item, step_id=item.id)
+    if not isinstance(item, Mapping):
+        return PlanStep(index=index, delay=0.0, action=None, step_id="unknown", error="Invalid replay item")
+
+    item_id = item.get("id")
+    step_id = str(item_id) if item_id else default_id
+    if "params" in item or "type" in item and item.get("type") in ACTION_TYPES:
+        delay = _delta(item) if "delta" in item else 0.0
+        try:
+            action = Action.from_obj({**item, "id": step_id})
+        except ActionError as exc:
+            return PlanStep(index=index, delay=delay, action=None, step_id=step_id, error=str(exc))
+        return PlanStep(index=index, delay=delay, action=action, step_id=step_id, fingerprint=item.get("fingerprint"))
+
+    if "type" in item and "action" in item:
+        delay = _delta(item)
+        action = event_to_action(item, action_id=step_id)
+        if action is None:
+            return PlanStep(index=index, delay=delay, action=None, step_id=step_id, error="Unsupported event")
+        payload = item.get("payload")
+        fingerprint = payload.get("fingerprint") if isinstance(payload, Mapping) else None
+        return PlanStep(index=index, delay=delay, action=action, step_id=step_id, fingerprint=fingerprint)
+
+    return PlanStep(index=index, delay=0.0, action=None, step_id=str(item.get("id", "unknown")), error="Unknown replay item")
+
+
+def compile_items(items: Iterable[Action | Mapping[str, Any]], *, digest: str | None = None) -> ReplayPlan:
+    return ReplayPlan([compile_item(idx, item) for idx, item in enumerate(items)], digest=digest)
+
+
+def compile_stream(
+    items: Iterable[Action | Mapping[str, Any]],
+    on_complete: Callable[[ReplayPlan], None] | None = None,
+    *,
+    digest: str | None = None,
+) -> Iterator[PlanStep]:
+    steps: list[PlanStep] = []
+    for idx, item in enumerate(items):
+        step = compile_item(idx, item)
+        steps.append(step)
+        yield step
+    if on_complete is not None:
+        on_complete(ReplayPlan(steps, digest=digest))
+
+
+def event_to_action(item: Mapping[str, Any], *, action_id: str | None = None) -> Action | None:
+    event_type = item.get("type")
+    action = item.get("action")
+    payload = item.get("payload", {})
+    if action_id is None:
+        action_id = item.get("id")
+
+    if event_type == "mouse":
+        if action == "move":
+            return Action.create("move", {"x": payload.get("x"), "y": payload.get("y")}, action_id=action_id)
+        if action == "scroll":
+            return Action.create(
+                "scroll",
+                {"x": payload.get("x"), "y": payload.get("y"), "dx": payload.get("dx", 0), "dy": payload.get("dy", 0)},
+                action_id=action_id,
+            )
+        if action == "click":
+            button = payload.get("button", "left")
+            if payload.get("pressed") is True:
+                return Action.create(
+                    "mouse_down",
+                    {"x": payload.get("x"), "y": payload.get("y"), "button": button},
+                    action_id=action_id,
+                )
+            if payload.get("pressed") is False:
+                return Action.create(
+                    "mouse_up",
+                    {"x": payload.get("x"), "y": payload.get("y"), "button": button},
+                    action_id=action_id,
+                )
+            return None
+
+    if event_type == "keyboard":
+        key = payload.get("key") or payload.get("char")
+        if not key:
+            return None
+        if action == "press":
+            return Action.create("key_down", {"key": key}, action_id=action_id)
+        if action == "release":
+            return Action.create("key_up", {"key": key}, action_id=action_id)
+
+    return None
+
+
+def _delta(item: Mapping[str, Any]) -> float:
+    return float(item.get("delta", 0.0))
+
+
+def file_digest(path: str | Path, *, chunk_size: int = 1024 * 1024) -> str:
+    hasher = hashlib.sha256()
+    with Path(path).open("rb") as handle:
+        while True:
+            chunk = handle.read(chunk_size)
+            if not chunk:
+                break
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def _digest_target(path: str | Path) -> Path:
+    target = Path(path)
+    if target.is_dir():
+        target = target / INDEX_NAME
+    return target
+
+
+def source_digest(path: str | Path) -> str:
+    return file_digest(_digest_target(path))
+
+
+class ReplayPlanCache:
+    def __init__(self, cache_dir: str | Path | None = None, *, max_entries: int = 32) -> None:
+        self._cache_dir = Path(cache_dir) if cache_dir else None
+        self._max_entries = max(1, max_entries)
+        self._memory: OrderedDict[str, ReplayPlan] = OrderedDict()
+        self._stat_memo: dict[str, tuple[int, int, str]] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+        self._logger = get_logger("autotool.replay.cache")
+
+    def digest(self, path: str | Path) -> str:
+        target = _digest_target(path)
+        stat = target.stat()
+        key = str(target.resolve())
+        with self._lock:
+            memo = self._stat_memo.get(key)
+        if memo is not None and memo[0] == stat.st_mtime_ns and memo[1] == stat.st_size:
+            return memo[2]
+        digest = file_digest(target)
+        with self._lock:
+            self._stat_memo[key] = (stat.st_mtime_ns, stat.st_size, digest)
+        return digest
+
+    def cache_key(self, path: str | Path, variant: str = "") -> str:
+        digest = self.digest(path)
+        if not variant:
+            return digest
+        return hashlib.sha256(f"{digest}:{variant}".encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> ReplayPlan | None:
+        with self._lock:
+            plan = self._memory.get(key)
+            if plan is not None:
+                self._memory.move_to_end(key)
+                self._hits += 1
+                return plan
+        plan = self._load_from_disk(key)
+        with self._lock:
+            if plan is None:
+                self._misses += 1
+                return None
+            self._disk_hits += 1
+            self._remember(key, plan)
+        return plan
+
+    def put(self, key: str, plan: ReplayPlan) -> None:
+        plan.digest = key
+        with self._lock:
+            self._remember(key, plan)
+        self._save_to_disk(key, plan)
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            self._memory.pop(key, None)
+        path = self._plan_path(key)
+        if path is not None:
+            path.unlink(missing_ok=True)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._memory),
+                "hits": self._hits,
+                "disk_hits": self._disk_hits,
+                "misses": self._misses,
+                "cache_dir": str(self._cache_dir) if self._cache_dir else None,
+            }
+
+    def _remember(self, key: str, plan: ReplayPlan) -> None:
+        self._memory[key] = plan
+        self._memory.move_to_end(key)
+        while len(self._memory) > self._max_entries:
+            self._memory.popitem(last=False)
+
+    def _plan_path(self, key: str) -> Path | None:
+        if self._cache_dir is None:
+            return None
+        return self._cache_dir / f"{key}.plan.json"
+
+    def _load_from_disk(self, key: str) -> ReplayPlan | None:
+        path = self._plan_path(key)
+        if path is None or not path.exists():
+            return None
+        try:
+            return ReplayPlan.from_dict(json.loads(path.read_text(encoding="utf-8")))
+        except (OSError, ValueError, ReplayPlanError) as exc:
+            self._logger.warning("Discarding unreadable replay plan %s: %s", path, exc)
+            path.unlink(missing_ok=True)
+            return None
+
+    def _save_to_disk(self, key: str, plan: ReplayPlan) -> None:
+        path = self._plan_path(key)
+        if path is None:
+            return
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            temp = path.with_suffix(f".tmp{os.getpid()}")
+            temp.write_text(json.dumps(plan.to_dict(), ensure_ascii=True, separators=(",", ":")), encoding="utf-8")
+            temp.replace(path)
+        except OSError as exc:
+            self._logger.warning("Failed to persist replay plan %s: %s", path, exc)
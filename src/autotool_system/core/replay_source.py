@@ -0,0 +1,230 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Iterator, Mapping, TextIO
+import json
+
+import yaml
+
+from .columnar import COLUMNAR_SUFFIXES, ColumnarError, ColumnarRecording
+from .recording_export import COMPRESSION_SUFFIXES, RecordingExportError, open_text
+from .recording_store import INDEX_NAME, RecordingHandle, RecordingStoreError
+
+
+JSON_LINES_SUFFIXES = {".jsonl", ".ndjson"}
+YAML_SUFFIXES = {".yaml", ".yml"}
+
+_WHITESPACE = " \t\r\n"
+_MAX_VALUE_SIZE = 16 * 1024 * 1024
+_TOKEN_SLACK = 64
+
+
+class ReplaySourceError(RuntimeError):
+    pass
+
+
+class ReplaySource:
+    def __init__(
+        self,
+        path: str | Path,
+        *,
+        chunk_size: int = 64 * 1024,
+        max_value_size: int = _MAX_VALUE_SIZE,
+    ) -> None:
+        self._path = Path(path)
+        if not self._path.exists():
+            raise ReplaySourceError(f"Replay file not found: {self._path}")
+        self._chunk_size = max(1024, chunk_size)
+        self._max_value_size = max(self._chunk_size, max_value_size)
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    @property
+    def format(self) -> str:
+        if self._path.is_dir():
+            return "segments"
+        suffix = self._path.suffix.lower()
+        if suffix in COMPRESSION_SUFFIXES:
+            suffix = Path(self._path.stem).suffix.lower()
+        if suffix in JSON_LINES_SUFFIXES:
+            return "jsonl"
+        if suffix in YAML_SUFFIXES:
+            return "yaml"
+        if suffix in COLUMNAR_SUFFIXES:
+            return "atrec"
+        return "json"
+
+    def __iter__(self) -> Iterator[Mapping[str, Any]]:
+        fmt = self.format
+        if fmt == "jsonl":
+            return iter_json_lines(self._path)
+        if fmt == "yaml":
+            return _iter_yaml(self._path)
+        if fmt == "atrec":
+            return _iter_columnar(self._path)
+        if fmt == "segments":
+            return _iter_segments(self._path)
+        return iter_json_events(self._path, chunk_size=self._chunk_size, max_value_size=self._max_value_size)
+
+
+def iter_json_lines(path: str | Path) -> Iterator[Mapping[str, Any]]:
+    try:
+        handle = open_text(path)
+    except RecordingExportError as exc:
+        raise ReplaySourceError(str(exc)) from exc
+    with handle:
+        for line_no, line in enumerate(handle, start=1):
+            text = line.strip()
+            if not text:
+                continue
+            try:
+                yield json.loads(text)
+            except json.JSONDecodeError as exc:
+                raise ReplaySourceError(f"Invalid JSON on line {line_no}: {exc}") from exc
+
+
+def iter_json_events(
+    path: str | Path,
+    *,
+    chunk_size: int = 64 * 1024,
+    max_value_size: int = _MAX_VALUE_SIZE,
+) -> Iterator[Mapping[str, Any]]:
+    with Path(path).open("r", encoding="utf-8") as handle:
+        reader = _ChunkReader(handle, chunk_size, max_value_size)
+        first = reader.peek()
+        if first == "[":
+            reader.advance()
+            yield from _iter_array(reader)
+            return
+        if first != "{":
+            raise ReplaySourceError("Replay file must contain a list of events/actions")
+        reader.advance()
+        found = False
+        while True:
+            char = reader.peek()
+            if char == "}":
+                break
+            key = reader.decode()
+            if reader.peek() != ":":
+                raise ReplaySourceError("Invalid replay file: expected ':' after key")
+            reader.advance()
+            if key == "events" and not found:
+                if reader.peek() != "[":
+                    raise ReplaySourceError("Replay file must contain a list of events/actions")
+                reader.advance()
+                found = True
+                yield from _iter_array(reader)
+            else:
+                reader.decode()
+            char = reader.peek()
+            if char == ",":
+                reader.advance()
+                continue
+            if char == "}":
+                break
+            raise ReplaySourceError("Invalid replay file: expected ',' or '}'")
+        if not found:
+            raise ReplaySourceError("Replay file must contain a list of events/actions")
+
+
+def _iter_array(reader: "_ChunkReader") -> Iterator[Any]:
+    if reader.peek() == "]":
+        reader.advance()
+        return
+    while True:
+        yield reader.decode()
+        char = reader.peek()
+        reader.advance()
+        if char == "]":
+            return
+        if char != ",":
+            raise ReplaySourceError("Invalid replay file: expected ',' or ']'")
+
+
+def _iter_yaml(path: Path) -> Iterator[Mapping[str, Any]]:
+    data = yaml.safe_load(path.read_text(encoding="utf-8"))
+    if isinstance(data, dict) and "events" in data:
+        data = data["events"]
+    if not isinstance(data, list):
+        raise ReplaySourceError("Replay file must contain a list of events/actions")
+    yield from data
+
+
+def _iter_columnar(path: Path) -> Iterator[Mapping[str, Any]]:
+    try:
+        recording = ColumnarRecording.load(path)
+    except ColumnarError as exc:
+        raise ReplaySourceError(str(exc)) from exc
+    yield from recording.iter_events()
+
+
+def _iter_segments(path: Path) -> Iterator[Mapping[str, Any]]:
+    if not (path / INDEX_NAME).exists():
+        raise ReplaySourceError(f"Not a recording directory: {path}")
+    try:
+        handle = RecordingHandle.load(path)
+    except RecordingStoreError as exc:
+        raise ReplaySourceError(str(exc)) from exc
+    yield from handle.iter_events()
+
+
+class _ChunkReader:
+    def __init__(self, handle: TextIO, chunk_size: int, max_value_size: int = _MAX_VALUE_SIZE) -> None:
+        self._handle = handle
+        self._chunk_size = chunk_size
+        self._max_value_size = max_value_size
+        self._decoder = json.JSONDecoder()
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self) -> bool:
+        if self._eof:
+            return False
+        chunk = self._handle.read(self._chunk_size)
+        if not chunk:
+            self._eof = True
+            return False
+        if self._pos:
+            self._buf = self._buf[self._pos :]
+            self._pos = 0
+        self._buf += chunk
+        return True
+
+    def peek(self) -> str:
+        while True:
+            buf = self._buf
+            pos = self._pos
+            length = len(buf)
+            while pos < length and buf[pos] in _WHITESPACE:
+                pos += 1
+            self._pos = pos
+            if pos < length:
+                return buf[pos]
+            if not self._fill():
+                raise ReplaySourceError("Unexpected end of replay file")
+
+    def advance(self) -> None:
+        self._pos += 1
+
+    def decode(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError as exc:
+                if exc.pos + _TOKEN_SLACK < len(self._buf) and not exc.msg.startswith("Unterminated string"):
+                    raise ReplaySourceError(f"Invalid replay file: {exc}") from exc
+                if len(self._buf) - self._pos > self._max_value_size:
+                    raise ReplaySourceError(
+                        f"Invalid replay file: value exceeds {self._max_value_size} characters"
+                    ) from exc
+                if self._fill():
+                    continue
+                raise ReplaySourceError(f"Invalid replay file: {exc}") from exc
+            if end >= len(self._buf) and self._fill():
+                continue
+            self._pos = end
+            return value
@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Iterable, Mapping
+import math
+
+from .replay_plan import PlanStep
+
+
+MOVE_ACTIONS = {"move", "mouse_down", "mouse_up", "scroll", "click"}
+TYPING_ACTIONS = {"type", "key_down", "key_up", "hotkey"}
+WAIT_ACTIONS = {"wait"}
+
+
+@dataclass(frozen=True)
+class ReplayTiming:
+    max_gap: float | None = None
+    move_speed: float = 1.0
+    typing_speed: float = 1.0
+    wait_speed: float = 1.0
+    fast_segments: tuple[tuple[int, int], ...] = ()
+
+    def __post_init__(self) -> None:
+        if self.max_gap is not None and self.max_gap < 0:
+            raise ValueError("max_gap must be >= 0")
+        for name in ("move_speed", "typing_speed", "wait_speed"):
+            if getattr(self, name) <= 0:
+                raise ValueError(f"{name} must be greater than 0")
+        for start, end in self.fast_segments:
+            if start < 0 or end < start:
+                raise ValueError("fast_segments must be [start, end) index ranges")
+
+    @classmethod
+    def from_obj(cls, value: "ReplayTiming | Mapping[str, Any] | None") -> "ReplayTiming | None":
+        if value is None or isinstance(value, ReplayTiming):
+            return value
+        if not isinstance(value, Mapping):
+            raise ValueError("Timing options must be a mapping")
+        max_gap = value.get("max_gap")
+        segments: list[tuple[int, int]] = []
+        for segment in value.get("fast_segments", []) or []:
+            if isinstance(segment, Mapping):
+                segments.append((int(segment.get("start", 0)), int(segment.get("end", 0))))
+            elif isinstance(segment, (list, tuple)) and len(segment) == 2:
+                segments.append((int(segment[0]), int(segment[1])))
+            else:
+                raise ValueError("fast_segments entries must be [start, end] or {start, end}")
+        return cls(
+            max_gap=float(max_gap) if max_gap is not None else None,
+            move_speed=float(value.get("move_speed", 1.0)),
+            typing_speed=float(value.get("typing_speed", 1.0)),
+            wait_speed=float(value.get("wait_speed", 1.0)),
+            fast_segments=tuple(sorted(segments)),
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "max_gap": self.max_gap,
+            "move_speed": self.move_speed,
+            "typing_speed": self.typing_speed,
+            "wait_speed": self.wait_speed,
+            "fast_segments": [list(segment) for segment in self.fast_segments],
+        }
+
+    def is_fast(self, index: int) -> bool:
+        for start, end in self.fast_segments:
+            if start > index:
+                return False
+            if index < end:
+                return True
+        return False
+
+    def factor(self, step: PlanStep) -> float:
+        if step.action is None:
+            return 1.0
+        kind = step.action.type
+        if kind in MOVE_ACTIONS:
+            return self.move_speed
+        if kind in TYPING_ACTIONS:
+            return self.typing_speed
+        if kind in WAIT_ACTIONS:
+            return self.wait_speed
+        return 1.0
+
+    def schedule(self, index: int, step: PlanStep, speed: float) -> tuple[float, float, bool]:
+        if self.is_fast(index):
+            return 0.0, math.inf, False
+        delay = step.delay
+        capped = self.max_gap is not None and delay > self.max_gap
+        if capped:
+            delay = self.max_gap
+        effective = speed * self.factor(step)
+        return delay / effective, effective, capped
+
+
+@dataclass
+class TimingReport:
+    steps: int = 0
+    recorded: float = 0.0
+    baseline: float = 0.0
+    projected: float = 0.0
+    actual: float = 0.0
+    gaps_capped: int = 0
+    fast_steps: int = 0
+    by_kind: dict[str, float] = field(default_factory=dict)
+
+    @property
+    def projected_savings(self) -> float:
+        return max(0.0, self.baseline - self.projected)
+
+    @property
+    def actual_savings(self) -> float:
+        return max(0.0, self.baseline - self.actual)
+
+    def add(self, index: int, step: PlanStep, speed: float, timing: ReplayTiming) -> tuple[float, float]:
+        sleep, effective, capped = timing.schedule(index, step, speed)
+        recorded = step.delay + _action_time(step)
+        planned = sleep + (_action_time(step) / effective if effective != math.inf else 0.0)
+        self.steps += 1
+        self.recorded += recorded
+        self.baseline += recorded / speed
+        self.projected += planned
+        if capped:
+            self.gaps_capped += 1
+        if effective == math.inf:
+            self.fast_steps += 1
+        kind = step.action.type if step.action is not None else "invalid"
+        self.by_kind[kind] = self.by_kind.get(kind, 0.0) + planned
+        return sleep, effective
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "steps": self.steps,
+            "recorded": self.recorded,
+            "baseline": self.baseline,
+            "projected": self.projected,
+            "actual": self.actual,
+            "projected_savings": self.projected_savings,
+            "actual_savings": self.actual_savings,
+            "gaps_capped": self.gaps_capped,
+            "fast_steps": self.fast_steps,
+            "by_kind": dict(self.by_kind),
+        }
+
+
+def project(steps: Iterable[PlanStep], timing: ReplayTiming, *, speed: float = 1.0) -> TimingReport:
+    report = TimingReport()
+    for step in steps:
+        report.add(step.index, step, speed, timing)
+    return report
+
+
+def _action_time(step: PlanStep) -> float:
+    if step.action is None:
+        return 0.0
+    params = step.action.params
+    if step.action.type == "wait":
+        return _seconds(params.get("seconds"))
+    return _seconds(params.get("duration"))
+
+
+def _seconds(value: Any) -> float:
+    try:
+        return max(0.0, float(value or 0.0))
+    except (TypeError, ValueError):
+        return 0.0
@@ -1,17 +1,22 @@
 from __future__ import annotations
 
+from collections import deque
 from pathlib import Path
-from typing import Any, Callable, Iterable, Mapping
-import json
+from typing import Any, Callable, Iterable, Mapping, Sized
 import time
 
-import yaml
-
 from ..automation import Action, AutomationEngine, ExecutionResult
 from ..utils.logger import get_logger
+from .fingerprint import FingerprintProbe, ReadinessOptions, ReadinessReport, wait_until_ready
+from .replay_checkpoint import InputState, ReplayCheckpoint, seek
+from .replay_plan import PlanStep, ReplayPlan, ReplayPlanCache, compile_stream
+from .replay_source import ReplaySource, ReplaySourceError
+from .replay_timing import ReplayTiming, TimingReport
+from .trajectory import SimplifyOptions, SimplifyReport, simplify_events
 
 StateCallback = Callable[[str], None]
 ResultCallback = Callable[[ExecutionResult], None]
+CheckpointCallback = Callable[[ReplayCheckpoint], None]
 
 
 class ReplayerError(RuntimeError):
@@ -25,6 +30,9 @@ class Replayer:
         *,
         on_state_change: StateCallback | None = None,
         on_result: ResultCallback | None = None,
+        plan_cache: ReplayPlanCache | None = None,
+        on_checkpoint: CheckpointCallback | None = None,
+        probe: FingerprintProbe | None = None,
     ) -> None:
         self._engine = engine or AutomationEngine()
         self._on_state_change = on_state_change
@@ -32,71 +40,194 @@ class Replayer:
         self._state = "idle"
         self._paused = False
         self._stopped = False
-        self._items: list[Mapping[str, Any]] | None = None
+        self._items: Iterable[Mapping[str, Any]] | None = None
+        self._summary: dict[str, int] = {"total": 0, "succeeded": 0, "failed": 0}
+        self._simplify_report: SimplifyReport | None = None
+        self._plan_cache = plan_cache
+        self._on_checkpoint = on_checkpoint
+        self._checkpoint: ReplayCheckpoint | None = None
+        self._timing_report: TimingReport | None = None
+        self._probe = probe
+        self._readiness_report: ReadinessReport | None = None
         self._logger = get_logger("autotool.replayer")
 
     @property
     def state(self) -> str:
         return self._state
 
+    @property
+    def last_summary(self) -> dict[str, int]:
+        return dict(self._summary)
+
+    @property
+    def last_checkpoint(self) -> ReplayCheckpoint | None:
+        return self._checkpoint
+
+    @property
+    def last_timing_report(self) -> TimingReport | None:
+        return self._timing_report
+
+    @property
+    def last_readiness_report(self) -> ReadinessReport | None:
+        return self._readiness_report
+
+    @property
+    def last_simplify_report(self) -> SimplifyReport | None:
+        return self._simplify_report
+
     def load(self, path: str | Path) -> list[Mapping[str, Any]]:
-        target = Path(path)
-        if not target.exists():
-            raise ReplayerError(f"Replay file not found: {target}")
-        content = target.read_text(encoding="utf-8")
-        if target.suffix.lower() in {".yaml", ".yml"}:
-            data = yaml.safe_load(content)
-        else:
-            data = json.loads(content)
-        if isinstance(data, dict) and "events" in data:
-            items = data["events"]
-        else:
-            items = data
-        if not isinstance(items, list):
-            raise ReplayerError("Replay file must contain a list of events/actions")
+        try:
+            items = list(ReplaySource(path))
+        except ReplaySourceError as exc:
+            raise ReplayerError(str(exc)) from exc
         self._items = items
-        self._logger.info("Replay file loaded: %s (%s items)", target, len(items))
+        self._logger.info("Replay file loaded: %s (%s items)", path, len(items))
         return items
 
+    def open(self, path: str | Path) -> ReplaySource:
+        try:
+            source = ReplaySource(path)
+        except ReplaySourceError as exc:
+            raise ReplayerError(str(exc)) from exc
+        self._items = source
+        self._logger.info("Replay file opened for streaming: %s", path)
+        return source
+
+    def compile(self, path: str | Path, *, simplify: SimplifyOptions | None = None) -> Iterable[PlanStep]:
+        try:
+            source = ReplaySource(path)
+        except ReplaySourceError as exc:
+            raise ReplayerError(str(exc)) from exc
+        items: Iterable[Mapping[str, Any]] = source
+        if simplify is not None:
+            items = simplify_events(items, simplify)
+        if self._plan_cache is None:
+            return compile_stream(items)
+
+        try:
+            key = self._plan_cache.cache_key(path, _plan_variant(simplify))
+        except OSError as exc:
+            raise ReplayerError(f"Replay source unreadable: {exc}") from exc
+        plan = self._plan_cache.get(key)
+        if plan is not None:
+            self._logger.info("Replay plan cache hit: %s (%s steps)", path, len(plan))
+            return plan
+
+        def store(compiled: ReplayPlan) -> None:
+            compiled.source = str(path)
+            self._plan_cache.put(key, compiled)
+            self._logger.info("Replay plan cached: %s (%s steps)", path, len(compiled))
+
+        return compile_stream(items, store, digest=key)
+
     def play(
         self,
         items: Iterable[Action | Mapping[str, Any]] | None = None,
         *,
         speed: float = 1.0,
         stop_on_error: bool = False,
+        collect_results: bool = True,
+        max_results: int | None = None,
+        simplify: SimplifyOptions | None = None,
+        start_index: int = 0,
+        start_ts: float | None = None,
+        checkpoint_every: int = 0,
+        resume_from: ReplayCheckpoint | None = None,
+        timing: ReplayTiming | None = None,
+        readiness: ReadinessOptions | None = None,
     ) -> list[ExecutionResult]:
         if speed <= 0:
             raise ReplayerError("Speed must be greater than 0")
         if items is None:
             if self._items is None:
                 raise ReplayerError("No replay items loaded")
-            items_to_play = list(self._items)
+            items_to_play = self._items
         else:
-            items_to_play = list(items)
+            items_to_play = items
+        self._simplify_report = None
+        if simplify is not None:
+            self._simplify_report = SimplifyReport()
+            items_to_play = simplify_events(items_to_play, simplify, report=self._simplify_report)
 
+        if resume_from is not None:
+            start_index = max(start_index, resume_from.index)
         self._stopped = False
         self._paused = False
         self._set_state("running")
-        results: list[ExecutionResult] = []
-        self._logger.info("Replay started (%s items)", len(items_to_play))
-
-        for item in items_to_play:
-            while self._paused and not self._stopped:
-                time.sleep(0.05)
-            if self._stopped:
-                break
-
-            result = self._execute_item(item, speed=speed)
-            results.append(result)
-            if self._on_result is not None:
-                self._on_result(result)
-            if stop_on_error and not result.success:
-                self._stopped = True
-                break
+        results: deque[ExecutionResult] = deque(maxlen=max_results)
+        summary = {"total": 0, "succeeded": 0, "failed": 0}
+        self._summary = summary
+        if isinstance(items_to_play, Sized):
+            self._logger.info("Replay started (%s items)", len(items_to_play))
+        else:
+            self._logger.info("Replay started (streaming)")
+
+        input_state = resume_from.state.copy() if resume_from is not None else InputState()
+        position = start_index
+        elapsed = 0.0
+        report = TimingReport() if timing is not None else None
+        self._timing_report = report
+        self._readiness_report = ReadinessReport() if readiness is not None else None
+        started = time.perf_counter()
+        try:
+            steps, elapsed = seek(items_to_play, start_index=start_index, start_ts=start_ts)
+            if resume_from is not None:
+                self._restore_input(input_state, speed)
+            for index, step in steps:
+                position = index
+                while self._paused and not self._stopped:
+                    time.sleep(0.05)
+                if self._stopped:
+                    break
 
+                if report is not None:
+                    delay, step_speed = report.add(index, step, speed, timing)
+                else:
+                    delay, step_speed = step.delay / speed, speed
+                if readiness is not None and step.fingerprint and step.action is not None:
+                    result = self._execute_when_ready(index, step, delay=delay, speed=step_speed, options=readiness)
+                else:
+                    result = self._execute_step(step, delay=delay, speed=step_speed)
+                summary["total"] += 1
+                summary["succeeded" if result.success else "failed"] += 1
+                if result.success and step.action is not None:
+                    input_state.observe(step.action)
+                if collect_results:
+                    results.append(result)
+                if self._on_result is not None:
+                    self._on_result(result)
+                if stop_on_error and not result.success:
+                    self._stopped = True
+                    break
+                elapsed += step.delay
+                position = index + 1
+                if checkpoint_every > 0 and summary["total"] % checkpoint_every == 0:
+                    self._emit_checkpoint(position, elapsed, input_state)
+        except ReplaySourceError as exc:
+            self._emit_checkpoint(position, elapsed, input_state)
+            self._set_state("stopped")
+            raise ReplayerError(str(exc)) from exc
+        except ReplayerError:
+            self._set_state("stopped")
+            raise
+
+        self._emit_checkpoint(position, elapsed, input_state)
         self._set_state("stopped" if self._stopped else "idle")
-        self._logger.info("Replay finished (%s results)", len(results))
-        return results
+        self._logger.info("Replay finished (%s results)", summary["total"])
+        if report is not None:
+            report.actual = time.perf_counter() - started
+            self._logger.info("Replay timing: %s", report.to_dict())
+        if self._readiness_report is not None:
+            readiness_report = self._readiness_report
+            self._logger.info(
+                "Replay readiness: %s/%s matched, %.3fs saved",
+                readiness_report.matched,
+                readiness_report.checked,
+                readiness_report.saved,
+            )
+        if self._simplify_report is not None:
+            self._logger.info("Replay path simplification: %s", self._simplify_report.to_dict())
+        return list(results)
 
     def pause(self) -> None:
         if self._state == "running":
@@ -121,85 +252,57 @@ class Replayer:
         if self._on_state_change is not None:
             self._on_state_change(state)
 
-    def _execute_item(self, item: Action | Mapping[str, Any], *, speed: float) -> ExecutionResult:
-        if isinstance(item, Action):
-            return self._engine.execute(item, speed=speed)
-
-        if not isinstance(item, Mapping):
-            return ExecutionResult(action_id="unknown", success=False, message="Invalid replay item")
-
-        if "params" in item or "type" in item and item.get("type") in _ACTION_TYPES:
-            if "delta" in item:
-                self._sleep_delta(item, speed)
-            return self._engine.execute(item, speed=speed)
-
-        if "type" in item and "action" in item:
-            self._sleep_delta(item, speed)
-            action = self._event_to_action(item)
-            if action is None:
-                return ExecutionResult(action_id=str(item.get("id", "unknown")), success=False, message="Unsupported event")
-            return self._engine.execute(action, speed=speed)
-
-        return ExecutionResult(action_id=str(item.get("id", "unknown")), success=False, message="Unknown replay item")
-
-    def _sleep_delta(self, item: Mapping[str, Any], speed: float) -> None:
-        delta = float(item.get("delta", 0.0))
-        if delta > 0:
-            time.sleep(delta / speed)
-
-    def _event_to_action(self, item: Mapping[str, Any]) -> Action | None:
-        event_type = item.get("type")
-        action = item.get("action")
-        payload = item.get("payload", {})
-        action_id = item.get("id")
-
-        if event_type == "mouse":
-            if action == "move":
-                return Action.create("move", {"x": payload.get("x"), "y": payload.get("y")}, action_id=action_id)
-            if action == "scroll":
-                return Action.create(
-                    "scroll",
-                    {"x": payload.get("x"), "y": payload.get("y"), "dx": payload.get("dx", 0), "dy": payload.get("dy", 0)},
-                    action_id=action_id,
-                )
-            if action == "click":
-                button = payload.get("button", "left")
-                if payload.get("pressed") is True:
-                    return Action.create(
-                        "mouse_down",
-                        {"x": payload.get("x"), "y": payload.get("y"), "button": button},
-                        action_id=action_id,
-                    )
-                if payload.get("pressed") is False:
-                    return Action.create(
-                        "mouse_up",
-                        {"x": payload.get("x"), "y": payload.get("y"), "button": button},
-                        action_id=action_id,
-                    )
-                return None
-
-        if event_type == "keyboard":
-            key = payload.get("key") or payload.get("char")
-            if not key:
-                return None
-            if action == "press":
-                return Action.create("key_down", {"key": key}, action_id=action_id)
-            if action == "release":
-                return Action.create("key_up", {"key": key}, action_id=action_id)
-
-        return None
-
-
-_ACTION_TYPES = {
-    "click",
-    "move",
-    "type",
-    "hotkey",
-    "wait",
-    "screenshot",
-    "key_down",
-    "key_up",
-    "mouse_down",
-    "mouse_up",
-    "scroll",
-}
+    def _emit_checkpoint(self, index: int, elapsed: float, input_state: InputState) -> None:
+        checkpoint = ReplayCheckpoint(index=index, ts=elapsed, state=input_state.copy())
+        self._checkpoint = checkpoint
+        if self._on_checkpoint is not None:
+            self._on_checkpoint(checkpoint)
+
+    def _restore_input(self, input_state: InputState, speed: float) -> None:
+        for action in input_state.restore_actions():
+            result = self._engine.execute(action, speed=speed)
+            if not result.success:
+                raise ReplayerError(f"Failed to restore input state: {result.message}")
+        self._logger.info("Replay input state restored: %s", input_state.to_dict())
+
+    def _execute_when_ready(
+        self, index: int, step: PlanStep, *, delay: float, speed: float, options: ReadinessOptions
+    ) -> ExecutionResult:
+        params = step.action.params
+        report = self._readiness_report
+        if not isinstance(params.get("x"), (int, float)) or not isinstance(params.get("y"), (int, float)):
+            return self._execute_step(step, delay=delay, speed=speed)
+        if self._probe is None:
+            self._probe = FingerprintProbe()
+        try:
+            matched, waited = wait_until_ready(
+                self._probe,
+                params["x"],
+                params["y"],
+                step.fingerprint,
+                timeout=max(options.timeout, delay),
+                interval=options.interval,
+                threshold=options.threshold,
+                should_stop=lambda: self._stopped,
+            )
+        except Exception as exc:
+            report.errors += 1
+            self._logger.warning("Readiness check failed for step %s: %s", step.step_id, exc)
+            return self._execute_step(step, delay=delay, speed=speed)
+        report.add(index, step.step_id, step.delay, waited, matched)
+        if not matched and options.strict:
+            return ExecutionResult(action_id=step.step_id, success=False, message="Screen not ready")
+        return self._execute_step(step, delay=0.0, speed=speed)
+
+    def _execute_step(self, step: PlanStep, *, delay: float, speed: float) -> ExecutionResult:
+        if delay > 0:
+            time.sleep(delay)
+        if step.action is None:
+            return ExecutionResult(action_id=step.step_id, success=False, message=step.error or "Invalid replay item")
+        return self._engine.execute(step.action, speed=speed)
+
+
+def _plan_variant(simplify: SimplifyOptions | None) -> str:
+    if simplify is None:
+        return ""
+    return repr(simplify)
@@ -0,0 +1,265 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Mapping, Sequence
+import operator
+
+from .rule_engine import Condition, RuleEngine
+
+
+BATCH_BACKENDS = {"auto", "numpy", "python"}
+
+
+def _try_numpy() -> Any | None:
+    try:
+        import numpy
+    except Exception:
+        return None
+    return numpy
+
+
+def _compare(op: Callable[[Any, Any], bool]) -> Callable[[Any, Any], bool]:
+    return lambda actual, expected: actual is not None and op(actual, expected)
+
+
+def _member(actual: Any, expected: Any) -> bool:
+    if expected is None:
+        return False
+    return actual in expected
+
+
+_VALUE_OPS: dict[str, Callable[[Any, Any], bool]] = {
+    "eq": operator.eq,
+    "ne": operator.ne,
+    "gt": _compare(operator.gt),
+    "gte": _compare(operator.ge),
+    "lt": _compare(operator.lt),
+    "lte": _compare(operator.le),
+    "contains": lambda actual, expected: actual is not None and expected in actual,
+    "in": _member,
+    "not_in": lambda actual, expected: expected is not None and actual not in expected,
+}
+
+_VECTOR_TYPES = {bool, int, float, str}
+
+_ARRAY_OPS = {
+    "eq": operator.eq,
+    "ne": operator.ne,
+    "gt": operator.gt,
+    "gte": operator.ge,
+    "lt": operator.lt,
+    "lte": operator.le,
+}
+
+
+@dataclass
+class MatchMatrix:
+    rule_ids: list[str]
+    size: int
+    matrix: Any
+    backend: str
+
+    def row(self, rule_id: str) -> Any:
+        return self.matrix[self.rule_ids.index(rule_id)]
+
+    def matches(self, index: int) -> list[str]:
+        return [rule_id for rule_id, row in zip(self.rule_ids, self.matrix) if row[index]]
+
+    def counts(self) -> dict[str, int]:
+        return {rule_id: int(sum(row)) for rule_id, row in zip(self.rule_ids, self.matrix)}
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "rules": list(self.rule_ids),
+            "size": self.size,
+            "backend": self.backend,
+            "matrix": [[bool(value) for value in row] for row in self.matrix],
+        }
+
+
+def _missing(check: Callable[[Any, Any], bool], expected: Any) -> bool:
+    try:
+        return bool(check(None, expected))
+    except TypeError:
+        return False
+
+
+class _PythonColumns:
+    name = "python"
+
+    def __init__(self, columns: Mapping[str, Sequence[Any]], size: int) -> None:
+        self._columns = {key: list(values) for key, values in columns.items()}
+        self.size = size
+        self._records: list[dict[str, Any]] | None = None
+
+    def full(self, value: bool) -> Any:
+        return [value] * self.size
+
+    def compare(self, key: str, op: str, expected: Any) -> Any:
+        check = _VALUE_OPS[op]
+        column = self._columns.get(key)
+        if column is None:
+            return self.full(_missing(check, expected))
+        return [bool(check(value, expected)) for value in column]
+
+    def both(self, left: Any, right: Any) -> Any:
+        return [a and b for a, b in zip(left, right)]
+
+    def either(self, left: Any, right: Any) -> Any:
+        return [a or b for a, b in zip(left, right)]
+
+    def records(self) -> list[dict[str, Any]]:
+        if self._records is None:
+            keys = list(self._columns)
+            self._records = [dict(zip(keys, values)) for values in zip(*self._columns.values())] if keys else [{} for _ in range(self.size)]
+        return self._records
+
+    def per_row(self, predicate: Callable[[Mapping[str, Any]], Any]) -> Any:
+        return [bool(predicate(record)) for record in self.records()]
+
+    def stack(self, rows: list[Any]) -> Any:
+        return rows
+
+
+class _NumpyColumns(_PythonColumns):
+    name = "numpy"
+
+    def __init__(self, np: Any, columns: Mapping[str, Sequence[Any]], size: int) -> None:
+        self._np = np
+        self._columns = {key: self._array(values) for key, values in columns.items()}
+        self.size = size
+        self._records = None
+
+    def _array(self, values: Any) -> Any:
+        np = self._np
+        if isinstance(values, np.ndarray) and values.ndim == 1:
+            return values
+        values = list(values)
+        array = None
+        if _uniform(values):
+            try:
+                array = np.asarray(values)
+            except (ValueError, TypeError):
+                array = None
+        if array is None or array.ndim != 1:
+            array = np.empty(len(values), dtype=object)
+            array[:] = values
+        return array
+
+    def full(self, value: bool) -> Any:
+        return self._np.full(self.size, value, dtype=bool)
+
+    def compare(self, key: str, op: str, expected: Any) -> Any:
+        np = self._np
+        column = self._columns.get(key)
+        if column is None:
+            return self.full(_missing(_VALUE_OPS[op], expected))
+        kind = column.dtype.kind
+        numeric = kind in "biuf" and isinstance(expected, (int, float)) and expected is not None
+        text = kind == "U" and isinstance(expected, str)
+        if op in _ARRAY_OPS and (numeric or text):
+            return _ARRAY_OPS[op](column, expected)
+        if op == "contains" and kind == "U" and isinstance(expected, str):
+            return np.char.find(column, expected) >= 0
+        if op in {"in", "not_in"} and kind in "biufU" and isinstance(expected, (list, tuple, set, frozenset)):
+            members = list(expected)
+            if members and all(isinstance(item, str) if kind == "U" else isinstance(item, (int, float)) for item in members):
+                return np.isin(column, members, invert=op == "not_in")
+        check = _VALUE_OPS[op]
+        return np.fromiter((bool(check(value, expected)) for value in column.tolist()), dtype=bool, count=self.size)
+
+    def both(self, left: Any, right: Any) -> Any:
+        return left & right
+
+    def either(self, left: Any, right: Any) -> Any:
+        return left | right
+
+    def records(self) -> list[dict[str, Any]]:
+        if self._records is None:
+            keys = list(self._columns)
+            columns = [column.tolist() for column in self._columns.values()]
+            self._records = [dict(zip(keys, values)) for values in zip(*columns)] if keys else [{} for _ in range(self.size)]
+        return self._records
+
+    def per_row(self, predicate: Callable[[Mapping[str, Any]], Any]) -> Any:
+        return self._np.fromiter((bool(predicate(record)) for record in self.records()), dtype=bool, count=self.size)
+
+    def stack(self, rows: list[Any]) -> Any:
+        if not rows:
+            return self._np.zeros((0, self.size), dtype=bool)
+        return self._np.vstack(rows)
+
+
+def _uniform(values: list[Any]) -> bool:
+    kinds = {type(value) for value in values}
+    return (len(kinds) == 1 and kinds <= _VECTOR_TYPES) or kinds == {int, float}
+
+
+def columns_from_records(records: Iterable[Mapping[str, Any]], keys: Iterable[str] | None = None) -> dict[str, list[Any]]:
+    rows = list(records)
+    if keys is None:
+        names: dict[str, None] = {}
+        for row in rows:
+            names.update(dict.fromkeys(row))
+        keys = names
+    return {key: [row.get(key) for row in rows] for key in keys}
+
+
+def evaluate_batch(
+    rules: RuleEngine | Iterable[Mapping[str, Any]],
+    columns: Mapping[str, Sequence[Any]],
+    *,
+    backend: str = "auto",
+) -> MatchMatrix:
+    if backend not in BATCH_BACKENDS:
+        raise ValueError(f"Unsupported batch backend: {backend}")
+    sizes = {len(values) for values in columns.values()}
+    if len(sizes) > 1:
+        raise ValueError("All context columns must have the same length")
+    size = sizes.pop() if sizes else 0
+    np = _try_numpy() if backend != "python" else None
+    if backend == "numpy" and np is None:
+        raise ValueError("numpy is not available")
+    data: _PythonColumns = _NumpyColumns(np, columns, size) if np is not None else _PythonColumns(columns, size)
+
+    items = rules.rules if isinstance(rules, RuleEngine) else list(rules)
+    rule_ids: list[str] = []
+    rows: list[Any] = []
+    for rule in items:
+        rule_ids.append(str(rule["id"]))
+        if not rule.get("enabled", True):
+            rows.append(data.full(False))
+            continue
+        condition = rule.get("condition") or rule.get("conditions")
+        rows.append(_evaluate(data, condition, str(rule.get("strategy", "all")).lower()))
+    return MatchMatrix(rule_ids=rule_ids, size=size, matrix=data.stack(rows), backend=data.name)
+
+
+def _evaluate(data: _PythonColumns, condition: Condition, strategy: str = "all") -> Any:
+    if callable(condition):
+        return data.per_row(condition)
+    if isinstance(condition, Mapping):
+        if "any" in condition:
+            return _combine(data, [_evaluate(data, item) for item in condition["any"]], any_of=True)
+        if "all" in condition:
+            return _combine(data, [_evaluate(data, item) for item in condition["all"]], any_of=False)
+        if "key" in condition:
+            op = str(condition.get("op", "eq")).lower()
+            if op not in _VALUE_OPS:
+                return data.full(False)
+            return data.compare(condition.get("key"), op, condition.get("value"))
+        parts = [data.compare(key, "eq", value) for key, value in condition.items()]
+        return _combine(data, parts, any_of=False)
+    if isinstance(condition, Iterable) and not isinstance(condition, (str, bytes)):
+        parts = [_evaluate(data, item) for item in condition]
+        return _combine(data, parts, any_of=strategy == "any")
+    return data.full(False)
+
+
+def _combine(data: _PythonColumns, parts: list[Any], *, any_of: bool) -> Any:
+    if not parts:
+        return data.full(not any_of)
+    result = parts[0]
+    for part in parts[1:]:
+        result = data.either(result, part) if any_of else data.both(result, part)
+    return result
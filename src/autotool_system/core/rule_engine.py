@@ -1,11 +1,18 @@
 from __future__ import annotations
 
+from bisect import insort
 from dataclasses import dataclass, field
-from typing import Any, Callable, Iterable, Mapping
+from operator import attrgetter
+from typing import Any, Callable, Iterable, Iterator, Mapping
 from uuid import uuid4
 
 
 Condition = Mapping[str, Any] | Iterable[Any] | Callable[[Mapping[str, Any]], bool]
+Predicate = Callable[[Mapping[str, Any]], bool]
+
+_MISSING: Any = object()
+
+_RULE_FIELDS = ("id", "condition", "strategy", "priority", "enabled", "meta")
 
 
 @dataclass
@@ -16,11 +23,24 @@ class Rule:
     priority: int = 0
     enabled: bool = True
     meta: dict[str, Any] = field(default_factory=dict)
+    _compiled: "CompiledCondition | None" = field(default=None, init=False, repr=False, compare=False)
+
+    @property
+    def compiled(self) -> "CompiledCondition":
+        compiled = self._compiled
+        if compiled is None:
+            compiled = compile_condition(self.condition, self.strategy)
+            self._compiled = compiled
+        return compiled
+
+    @property
+    def order(self) -> tuple[int, str]:
+        return (-self.priority, self.id)
 
     def matches(self, context: Mapping[str, Any]) -> bool:
         if not self.enabled:
             return False
-        return _evaluate_condition(self.condition, context, self.strategy)
+        return self.compiled.predicate(context)
 
     def to_dict(self) -> dict[str, Any]:
         return {
@@ -33,95 +53,414 @@ class Rule:
         }
 
 
+class RuleMatch(Mapping[str, Any]):
+    __slots__ = ("rule",)
+
+    def __init__(self, rule: Rule) -> None:
+        self.rule = rule
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in _RULE_FIELDS:
+            raise KeyError(key)
+        value = getattr(self.rule, key)
+        return dict(value) if key == "meta" else value
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(_RULE_FIELDS)
+
+    def __len__(self) -> int:
+        return len(_RULE_FIELDS)
+
+    def __repr__(self) -> str:
+        return f"RuleMatch(id={self.rule.id!r}, priority={self.rule.priority!r})"
+
+    @property
+    def id(self) -> str:
+        return self.rule.id
+
+    @property
+    def priority(self) -> int:
+        return self.rule.priority
+
+    def to_dict(self) -> dict[str, Any]:
+        return self.rule.to_dict()
+
+
+@dataclass(frozen=True)
+class RuleTransition:
+    id: str
+    matched: bool
+    priority: int
+
+    def to_dict(self) -> dict[str, Any]:
+        return {"id": self.id, "matched": self.matched, "priority": self.priority}
+
+
+@dataclass(frozen=True)
+class CompiledCondition:
+    predicate: Predicate
+    keys: frozenset[str] | None
+    anchors: frozenset[str] | None
+    guard: tuple[str, Any] | None = None
+
+
 class RuleEngine:
     def __init__(self) -> None:
-        self._rules: list[Rule] = []
+        self._rules: dict[str, Rule] = {}
+        self._ordered: list[Rule] = []
+        self._guards: dict[str, dict[Any, list[Rule]]] = {}
+        self._anchored: dict[str, list[Rule]] = {}
+        self._unindexed: list[Rule] = []
+        self._slots: dict[str, tuple[str, Any]] = {}
+        self._dependents: dict[str, set[str]] = {}
+        self._guarded: dict[str, dict[str, dict[Any, set[str]]]] = {}
+        self._opaque: set[str] = set()
+        self._version = 0
 
     def add_rule(self, rule: Rule | Mapping[str, Any]) -> Rule:
-        if isinstance(rule, Rule):
-            self._rules.append(rule)
-            return rule
-        if not isinstance(rule, Mapping):
-            raise ValueError("Rule must be a mapping or Rule instance")
-        rule_id = str(rule.get("id") or uuid4())
-        condition = rule.get("condition") or rule.get("conditions")
-        if condition is None:
-            raise ValueError("Rule requires condition or conditions")
-        strategy = str(rule.get("strategy", "all")).lower()
-        priority = int(rule.get("priority", 0))
-        enabled = bool(rule.get("enabled", True))
-        meta = rule.get("meta", {})
-        new_rule = Rule(
-            id=rule_id,
-            condition=condition,
-            strategy=strategy,
-            priority=priority,
-            enabled=enabled,
-            meta=dict(meta) if isinstance(meta, Mapping) else {},
-        )
-        self._rules.append(new_rule)
-        return new_rule
+        if not isinstance(rule, Rule):
+            rule = _rule_from_mapping(rule)
+        if rule.id in self._rules:
+            self.remove_rule(rule.id)
+        compiled = rule.compiled
+        self._rules[rule.id] = rule
+        insort(self._ordered, rule, key=attrgetter("order"))
+        if compiled.guard is not None:
+            key, value = compiled.guard
+            insort(self._guards.setdefault(key, {}).setdefault(value, []), rule, key=attrgetter("order"))
+            self._slots[rule.id] = ("guard", compiled.guard)
+        elif compiled.anchors is not None:
+            for key in compiled.anchors:
+                insort(self._anchored.setdefault(key, []), rule, key=attrgetter("order"))
+            self._slots[rule.id] = ("anchors", compiled.anchors)
+        else:
+            insort(self._unindexed, rule, key=attrgetter("order"))
+            self._slots[rule.id] = ("scan", None)
+        if compiled.keys is None:
+            self._opaque.add(rule.id)
+        elif compiled.guard is not None:
+            guard_key, guard_value = compiled.guard
+            for key in compiled.keys - {guard_key}:
+                guarded = self._guarded.setdefault(key, {}).setdefault(guard_key, {})
+                guarded.setdefault(guard_value, set()).add(rule.id)
+        else:
+            for key in compiled.keys:
+                self._dependents.setdefault(key, set()).add(rule.id)
+        self._version += 1
+        return rule
 
     def remove_rule(self, rule_id: str) -> None:
-        self._rules = [rule for rule in self._rules if rule.id != rule_id]
+        rule = self._rules.pop(rule_id, None)
+        if rule is None:
+            return
+        self._ordered.remove(rule)
+        self._version += 1
+        compiled = rule.compiled
+        if compiled.keys is None:
+            self._opaque.discard(rule_id)
+        elif compiled.guard is not None:
+            guard_key, guard_value = compiled.guard
+            for key in compiled.keys - {guard_key}:
+                by_value = self._guarded[key][guard_key]
+                by_value[guard_value].discard(rule_id)
+                if not by_value[guard_value]:
+                    del by_value[guard_value]
+                    if not by_value:
+                        del self._guarded[key][guard_key]
+                        if not self._guarded[key]:
+                            del self._guarded[key]
+        else:
+            for key in compiled.keys:
+                dependents = self._dependents[key]
+                dependents.discard(rule_id)
+                if not dependents:
+                    del self._dependents[key]
+        kind, slot = self._slots.pop(rule_id)
+        if kind == "guard":
+            key, value = slot
+            bucket = self._guards[key][value]
+            bucket.remove(rule)
+            if not bucket:
+                del self._guards[key][value]
+                if not self._guards[key]:
+                    del self._guards[key]
+        elif kind == "anchors":
+            for key in slot:
+                bucket = self._anchored[key]
+                bucket.remove(rule)
+                if not bucket:
+                    del self._anchored[key]
+        else:
+            self._unindexed.remove(rule)
+
+    def candidates(self, context: Mapping[str, Any]) -> list[Rule]:
+        candidates: list[Rule] = list(self._unindexed)
+        guards = self._guards
+        if guards:
+            for key, buckets in guards.items() if len(guards) <= len(context) else _present(guards, context):
+                if key not in context:
+                    continue
+                try:
+                    bucket = buckets.get(context[key])
+                except TypeError:
+                    continue
+                if bucket:
+                    candidates.extend(bucket)
+        anchored = self._anchored
+        if anchored:
+            seen: set[str] = set()
+            for key, bucket in anchored.items() if len(anchored) <= len(context) else _present(anchored, context):
+                if key not in context:
+                    continue
+                for rule in bucket:
+                    if rule.id not in seen:
+                        seen.add(rule.id)
+                        candidates.append(rule)
+        return candidates
+
+    def evaluate(self, context: Mapping[str, Any]) -> list[RuleMatch]:
+        matches = [rule for rule in self.candidates(context) if rule.enabled and rule.compiled.predicate(context)]
+        if len(matches) > 1:
+            matches.sort(key=attrgetter("order"))
+        return [RuleMatch(rule) for rule in matches]
+
+    def session(self, context: Mapping[str, Any] | None = None) -> "RuleSession":
+        return RuleSession(self, context)
 
-    def evaluate(self, context: Mapping[str, Any]) -> list[dict[str, Any]]:
-        matches = [rule for rule in self._rules if rule.matches(context)]
-        matches.sort(key=lambda item: (-item.priority, item.id))
-        return [rule.to_dict() for rule in matches]
+    def affected(self, changes: Mapping[str, tuple[Any, Any]], context: Mapping[str, Any]) -> set[str]:
+        affected = set(self._opaque)
+        for key, values in changes.items():
+            dependents = self._dependents.get(key)
+            if dependents:
+                affected |= dependents
+            buckets = self._guards.get(key)
+            if buckets:
+                for value in values:
+                    bucket = _lookup(buckets, value)
+                    if bucket:
+                        affected.update(rule.id for rule in bucket)
+            guarded = self._guarded.get(key)
+            if guarded:
+                for guard_key, by_value in guarded.items():
+                    if guard_key in context:
+                        ids = _lookup(by_value, context[guard_key])
+                        if ids:
+                            affected |= ids
+        return affected
+
+    def get(self, rule_id: str) -> Rule | None:
+        return self._rules.get(rule_id)
+
+    def __len__(self) -> int:
+        return len(self._rules)
 
     @property
     def rules(self) -> list[dict[str, Any]]:
-        return [rule.to_dict() for rule in self._rules]
+        return [rule.to_dict() for rule in self._ordered]
+
+
+class RuleSession:
+    def __init__(self, engine: RuleEngine, context: Mapping[str, Any] | None = None) -> None:
+        self._engine = engine
+        self._context: dict[str, Any] = dict(context or {})
+        self._matched: set[str] = set()
+        self._version = -1
+        self.evaluated = 0
+        self.refresh()
+
+    @property
+    def context(self) -> Mapping[str, Any]:
+        return self._context
+
+    def matches(self) -> list[RuleMatch]:
+        rules = [rule for rule_id in self._matched if (rule := self._engine.get(rule_id)) is not None]
+        rules.sort(key=attrgetter("order"))
+        return [RuleMatch(rule) for rule in rules]
+
+    def refresh(self) -> list[RuleTransition]:
+        self._version = self._engine._version
+        matched = {match.id for match in self._engine.evaluate(self._context)}
+        self.evaluated += len(self._engine)
+        transitions = [self._transition(rule_id, True) for rule_id in matched - self._matched]
+        transitions.extend(self._transition(rule_id, False) for rule_id in self._matched - matched)
+        self._matched = matched
+        return _ordered(transitions)
+
+    def apply(self, patch: Mapping[str, Any] | None = None, removed: Iterable[str] = ()) -> list[RuleTransition]:
+        context = self._context
+        changes: dict[str, tuple[Any, Any]] = {}
+        for key, value in (patch or {}).items():
+            current = context.get(key, _MISSING)
+            if current is value or (current is not _MISSING and current == value):
+                continue
+            context[key] = value
+            changes[key] = (current, value)
+        for key in removed:
+            if key in context:
+                changes[key] = (context.pop(key), _MISSING)
+        if self._version != self._engine._version:
+            return self.refresh()
+        if not changes:
+            return []
+        transitions: list[RuleTransition] = []
+        matched = self._matched
+        for rule_id in self._engine.affected(changes, context):
+            rule = self._engine.get(rule_id)
+            if rule is None:
+                continue
+            self.evaluated += 1
+            now = rule.enabled and rule.compiled.predicate(context)
+            if now and rule_id not in matched:
+                matched.add(rule_id)
+                transitions.append(RuleTransition(rule_id, True, rule.priority))
+            elif not now and rule_id in matched:
+                matched.discard(rule_id)
+                transitions.append(RuleTransition(rule_id, False, rule.priority))
+        return _ordered(transitions)
+
+    def _transition(self, rule_id: str, matched: bool) -> RuleTransition:
+        rule = self._engine.get(rule_id)
+        return RuleTransition(rule_id, matched, rule.priority if rule is not None else 0)
+
+
+def _lookup(index: Mapping[Any, Any], value: Any) -> Any:
+    if value is _MISSING:
+        return None
+    try:
+        return index.get(value)
+    except TypeError:
+        return None
+
+
+def _ordered(transitions: list[RuleTransition]) -> list[RuleTransition]:
+    if len(transitions) > 1:
+        transitions.sort(key=lambda item: (-item.priority, item.id))
+    return transitions
 
 
-def _evaluate_condition(condition: Condition, context: Mapping[str, Any], strategy: str) -> bool:
+def _present(index: Mapping[str, Any], context: Mapping[str, Any]) -> Iterator[tuple[str, Any]]:
+    for key in context:
+        value = index.get(key)
+        if value is not None:
+            yield key, value
+
+
+def _rule_from_mapping(rule: Mapping[str, Any]) -> Rule:
+    if not isinstance(rule, Mapping):
+        raise ValueError("Rule must be a mapping or Rule instance")
+    rule_id = str(rule.get("id") or uuid4())
+    condition = rule.get("condition") or rule.get("conditions")
+    if condition is None:
+        raise ValueError("Rule requires condition or conditions")
+    meta = rule.get("meta", {})
+    return Rule(
+        id=rule_id,
+        condition=condition,
+        strategy=str(rule.get("strategy", "all")).lower(),
+        priority=int(rule.get("priority", 0)),
+        enabled=bool(rule.get("enabled", True)),
+        meta=dict(meta) if isinstance(meta, Mapping) else {},
+    )
+
+
+def compile_condition(condition: Condition, strategy: str = "all") -> CompiledCondition:
     if callable(condition):
-        return bool(condition(context))
+        return CompiledCondition(lambda context: bool(condition(context)), None, None)
     if isinstance(condition, Mapping):
         if "any" in condition:
-            return any(_evaluate_condition(item, context, "all") for item in condition["any"])
+            return _combine([compile_condition(item) for item in condition["any"]], any_of=True)
         if "all" in condition:
-            return all(_evaluate_condition(item, context, "all") for item in condition["all"])
+            return _combine([compile_condition(item) for item in condition["all"]], any_of=False)
         if "key" in condition:
-            return _evaluate_single(condition, context)
-        return all(context.get(key) == value for key, value in condition.items())
-    if isinstance(condition, Iterable):
-        items = list(condition)
-        if strategy == "any":
-            return any(_evaluate_condition(item, context, "all") for item in items)
-        return all(_evaluate_condition(item, context, "all") for item in items)
-    return False
+            return _compile_single(condition)
+        parts = [_compile_single({"key": key, "op": "eq", "value": value}) for key, value in condition.items()]
+        return _combine(parts, any_of=False)
+    if isinstance(condition, Iterable) and not isinstance(condition, (str, bytes)):
+        parts = [compile_condition(item) for item in condition]
+        return _combine(parts, any_of=strategy == "any")
+    return CompiledCondition(lambda context: False, frozenset(), frozenset())
 
 
-def _evaluate_single(condition: Mapping[str, Any], context: Mapping[str, Any]) -> bool:
+def _combine(parts: list[CompiledCondition], *, any_of: bool) -> CompiledCondition:
+    if len(parts) == 1:
+        return parts[0]
+    predicates = tuple(part.predicate for part in parts)
+    keys = None if any(part.keys is None for part in parts) else frozenset().union(*(part.keys for part in parts))
+    if any_of:
+        if not parts:
+            return CompiledCondition(lambda context: False, frozenset(), frozenset())
+        anchors = None
+        if all(part.anchors is not None for part in parts):
+            anchors = frozenset().union(*(part.anchors for part in parts))
+        return CompiledCondition(lambda context: any(check(context) for check in predicates), keys, anchors)
+    guard = next((part.guard for part in parts if part.guard is not None), None)
+    anchored = [part.anchors for part in parts if part.anchors]
+    anchors = min(anchored, key=len) if anchored else None
+    if not parts:
+        return CompiledCondition(lambda context: True, frozenset(), None)
+    return CompiledCondition(lambda context: all(check(context) for check in predicates), keys, anchors, guard)
+
+
+def _compile_single(condition: Mapping[str, Any]) -> CompiledCondition:
     key = condition.get("key")
     op = str(condition.get("op", "eq")).lower()
     expected = condition.get("value")
-    actual = context.get(key)
-
+    keys = frozenset([key])
+    anchors = keys
+    guard = None
     if op == "eq":
-        return actual == expected
-    if op == "ne":
-        return actual != expected
-    if op == "gt":
-        return actual is not None and actual > expected
-    if op == "gte":
-        return actual is not None and actual >= expected
-    if op == "lt":
-        return actual is not None and actual < expected
-    if op == "lte":
-        return actual is not None and actual <= expected
-    if op == "contains":
-        if actual is None:
-            return False
-        return expected in actual
-    if op == "in":
+        predicate: Predicate = lambda context: context.get(key) == expected
         if expected is None:
-            return False
-        return actual in expected
-    if op == "not_in":
+            anchors = None
+        else:
+            try:
+                hash(expected)
+            except TypeError:
+                pass
+            else:
+                guard = (key, expected)
+    elif op == "ne":
+        predicate = lambda context: context.get(key) != expected
+        anchors = None if expected is not None else keys
+    elif op == "gt":
+        predicate = lambda context: (actual := context.get(key)) is not None and actual > expected
+    elif op == "gte":
+        predicate = lambda context: (actual := context.get(key)) is not None and actual >= expected
+    elif op == "lt":
+        predicate = lambda context: (actual := context.get(key)) is not None and actual < expected
+    elif op == "lte":
+        predicate = lambda context: (actual := context.get(key)) is not None and actual <= expected
+    elif op == "contains":
+        predicate = lambda context: (actual := context.get(key)) is not None and expected in actual
+    elif op in {"in", "not_in"}:
         if expected is None:
-            return False
-        return actual not in expected
-    return False
+            return CompiledCondition(lambda context: False, keys, frozenset())
+        members: Any = expected
+        if isinstance(expected, (list, tuple, set, frozenset)):
+            try:
+                members = frozenset(expected)
+            except TypeError:
+                members = expected
+        if op == "in":
+            predicate = lambda context: _member(context.get(key), members, expected)
+        else:
+            predicate = lambda context: not _member(context.get(key), members, expected)
+        if _matches_missing(predicate, key):
+            anchors = None
+    else:
+        return CompiledCondition(lambda context: False, keys, frozenset())
+    return CompiledCondition(predicate, keys, anchors, guard)
+
+
+def _matches_missing(predicate: Predicate, key: Any) -> bool:
+    try:
+        return bool(predicate({}))
+    except TypeError:
+        return False
+
+
+def _member(value: Any, members: Any, expected: Any) -> bool:
+    try:
+        return value in members
+    except TypeError:
+        return value in expected
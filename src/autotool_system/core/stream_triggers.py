@@ -0,0 +1,328 @@
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterator, Mapping
+import threading
+import time
+
+from ..listeners.event import Event
+from ..listeners.event_dispatcher import EventDispatcher, Subscription
+from ..utils.logger import get_logger
+from .rule_engine import CompiledCondition, compile_condition
+
+
+TRIGGER_KINDS = {"count", "sequence"}
+WINDOW_MODES = {"sliding", "tumbling"}
+
+
+class StreamTriggerError(RuntimeError):
+    pass
+
+
+class _EventView(Mapping[str, Any]):
+    __slots__ = ("_event",)
+
+    def __init__(self, event: Event) -> None:
+        self._event = event
+
+    def __getitem__(self, key: str) -> Any:
+        if key == "type":
+            return self._event.type
+        if key == "action":
+            return self._event.action
+        return self._event.payload[key]
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key == "type":
+            return self._event.type
+        if key == "action":
+            return self._event.action
+        return self._event.payload.get(key, default)
+
+    def __iter__(self) -> Iterator[str]:
+        yield "type"
+        yield "action"
+        yield from self._event.payload
+
+    def __len__(self) -> int:
+        return 2 + len(self._event.payload)
+
+
+@dataclass(frozen=True)
+class TriggerSpec:
+    id: str
+    kind: str = "count"
+    match: Any = None
+    steps: tuple[Any, ...] = ()
+    count: int = 1
+    window: float = 1.0
+    mode: str = "sliding"
+    workflow_id: str | None = None
+    enabled: bool = True
+
+    def __post_init__(self) -> None:
+        if not self.id:
+            raise ValueError("Trigger id is required")
+        if self.kind not in TRIGGER_KINDS:
+            raise ValueError(f"Unsupported trigger kind: {self.kind}")
+        if self.mode not in WINDOW_MODES:
+            raise ValueError(f"Unsupported window mode: {self.mode}")
+        if self.window <= 0:
+            raise ValueError("window must be > 0 seconds")
+        if self.kind == "count":
+            if self.match is None:
+                raise ValueError("Count triggers require match")
+            if self.count < 1:
+                raise ValueError("count must be >= 1")
+        elif not self.steps:
+            raise ValueError("Sequence triggers require steps")
+
+    @classmethod
+    def from_obj(cls, value: "TriggerSpec | Mapping[str, Any]") -> "TriggerSpec":
+        if isinstance(value, TriggerSpec):
+            return value
+        if not isinstance(value, Mapping):
+            raise ValueError("Trigger must be a mapping")
+        steps = value.get("steps") or ()
+        if not isinstance(steps, (list, tuple)):
+            raise ValueError("Trigger steps must be a list")
+        workflow_id = value.get("workflow_id")
+        return cls(
+            id=str(value.get("id") or ""),
+            kind=str(value.get("kind", "sequence" if steps else "count")).lower(),
+            match=value.get("match"),
+            steps=tuple(steps),
+            count=int(value.get("count", 1)),
+            window=float(value.get("window", 1.0)),
+            mode=str(value.get("mode", "sliding")).lower(),
+            workflow_id=str(workflow_id) if workflow_id else None,
+            enabled=bool(value.get("enabled", True)),
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        data: dict[str, Any] = {
+            "id": self.id,
+            "kind": self.kind,
+            "window": self.window,
+            "mode": self.mode,
+            "workflow_id": self.workflow_id,
+            "enabled": self.enabled,
+        }
+        if self.kind == "count":
+            data["match"] = self.match
+            data["count"] = self.count
+        else:
+            data["steps"] = list(self.steps)
+        return data
+
+
+@dataclass(frozen=True)
+class TriggerFire:
+    trigger_id: str
+    workflow_id: str | None
+    ns: int
+    event_id: str
+
+    def to_dict(self) -> dict[str, Any]:
+        return {"trigger_id": self.trigger_id, "workflow_id": self.workflow_id, "ns": self.ns, "event_id": self.event_id}
+
+
+class _Window:
+    __slots__ = ("_window_ns", "_tumbling", "_origin")
+
+    def __init__(self, spec: TriggerSpec) -> None:
+        self._window_ns = int(spec.window * 1_000_000_000)
+        self._tumbling = spec.mode == "tumbling"
+        self._origin: int | None = None
+
+    @property
+    def tumbling(self) -> bool:
+        return self._tumbling
+
+    def bucket(self, ns: int) -> int:
+        if not self._tumbling:
+            return 0
+        if self._origin is None:
+            self._origin = ns
+        return (ns - self._origin) // self._window_ns
+
+    def within(self, start: int, start_bucket: int, ns: int, bucket: int) -> bool:
+        if self._tumbling:
+            return start_bucket == bucket
+        return ns - start <= self._window_ns
+
+
+class _CountState:
+    __slots__ = ("_window", "_count", "_hits", "_bucket", "_done")
+
+    def __init__(self, spec: TriggerSpec) -> None:
+        self._window = _Window(spec)
+        self._count = spec.count
+        self._hits: deque[tuple[int, int]] = deque(maxlen=spec.count)
+        self._bucket = -1
+        self._done = False
+
+    def feed(self, conditions: tuple[CompiledCondition, ...], view: _EventView, ns: int) -> bool:
+        if not conditions[0].predicate(view):
+            return False
+        bucket = self._window.bucket(ns)
+        if bucket != self._bucket:
+            self._bucket = bucket
+            self._done = False
+            self._hits.clear()
+        if self._done:
+            return False
+        hits = self._hits
+        hits.append((ns, bucket))
+        if len(hits) < self._count:
+            return False
+        start, start_bucket = hits[0]
+        if not self._window.within(start, start_bucket, ns, bucket):
+            return False
+        hits.clear()
+        self._done = self._window.tumbling
+        return True
+
+    def reset(self) -> None:
+        self._hits.clear()
+        self._bucket = -1
+        self._done = False
+
+
+class _SequenceState:
+    __slots__ = ("_window", "_starts")
+
+    def __init__(self, spec: TriggerSpec) -> None:
+        self._window = _Window(spec)
+        self._starts: list[tuple[int, int] | None] = [None] * len(spec.steps)
+
+    def feed(self, conditions: tuple[CompiledCondition, ...], view: _EventView, ns: int) -> bool:
+        starts = self._starts
+        last = len(starts) - 1
+        bucket = self._window.bucket(ns)
+        for index in range(last, -1, -1):
+            if not conditions[index].predicate(view):
+                continue
+            if index == 0:
+                starts[0] = (ns, bucket)
+            else:
+                previous = starts[index - 1]
+                if previous is None or not self._window.within(previous[0], previous[1], ns, bucket):
+                    continue
+                starts[index] = previous
+            if index == last:
+                self.reset()
+                return True
+        return False
+
+    def reset(self) -> None:
+        self._starts = [None] * len(self._starts)
+
+
+@dataclass
+class _Trigger:
+    spec: TriggerSpec
+    conditions: tuple[CompiledCondition, ...]
+    state: _CountState | _SequenceState
+    fired: int = 0
+    types: frozenset[str | None] = field(default_factory=frozenset)
+
+
+class StreamTriggerEngine:
+    def __init__(self, on_fire: Callable[[TriggerFire], None] | None = None) -> None:
+        self._on_fire = on_fire
+        self._triggers: dict[str, _Trigger] = {}
+        self._by_type: dict[str | None, tuple[_Trigger, ...]] = {}
+        self._lock = threading.Lock()
+        self._subscription: Subscription | None = None
+        self._logger = get_logger("autotool.triggers")
+        self.events = 0
+
+    def add(self, spec: TriggerSpec | Mapping[str, Any]) -> TriggerSpec:
+        spec = TriggerSpec.from_obj(spec)
+        patterns = (spec.match,) if spec.kind == "count" else spec.steps
+        conditions = tuple(_compile_pattern(pattern) for pattern in patterns)
+        state: _CountState | _SequenceState = _CountState(spec) if spec.kind == "count" else _SequenceState(spec)
+        trigger = _Trigger(spec, conditions, state, types=frozenset(_event_type(pattern) for pattern in patterns))
+        with self._lock:
+            self._triggers[spec.id] = trigger
+            self._reindex()
+        return spec
+
+    def remove(self, trigger_id: str) -> bool:
+        with self._lock:
+            if self._triggers.pop(trigger_id, None) is None:
+                return False
+            self._reindex()
+        return True
+
+    def triggers(self) -> list[TriggerSpec]:
+        return [trigger.spec for trigger in self._triggers.values()]
+
+    def reset(self) -> None:
+        for trigger in self._triggers.values():
+            trigger.state.reset()
+
+    def feed(self, event: Event) -> list[TriggerFire]:
+        self.events += 1
+        by_type = self._by_type
+        candidates = by_type.get(event.type, ()) + by_type.get(None, ())
+        if not candidates:
+            return []
+        ns = event.ns if event.ns is not None else time.perf_counter_ns()
+        view = _EventView(event)
+        fired: list[TriggerFire] = []
+        for trigger in candidates:
+            if trigger.state.feed(trigger.conditions, view, ns):
+                trigger.fired += 1
+                fired.append(TriggerFire(trigger.spec.id, trigger.spec.workflow_id, ns, event.id))
+        if fired and self._on_fire is not None:
+            for fire in fired:
+                try:
+                    self._on_fire(fire)
+                except Exception as exc:
+                    self._logger.error("Trigger %s failed: %s", fire.trigger_id, exc)
+        return fired
+
+    def attach(self, dispatcher: EventDispatcher, *, queue_size: int = 4096) -> Subscription:
+        if self._subscription is not None:
+            raise StreamTriggerError("Trigger engine already attached")
+        self._subscription = dispatcher.subscribe(self.feed, queue_size=queue_size, name="stream-triggers")
+        return self._subscription
+
+    def detach(self, dispatcher: EventDispatcher) -> None:
+        subscription = self._subscription
+        self._subscription = None
+        if subscription is not None:
+            dispatcher.unsubscribe(subscription)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "events": self.events,
+            "triggers": [{"id": trigger.spec.id, "fired": trigger.fired} for trigger in self._triggers.values()],
+            "subscription": self._subscription.stats() if self._subscription is not None else None,
+        }
+
+    def _reindex(self) -> None:
+        index: dict[str | None, list[_Trigger]] = {}
+        for trigger in self._triggers.values():
+            if not trigger.spec.enabled:
+                continue
+            for event_type in trigger.types if None not in trigger.types else (None,):
+                index.setdefault(event_type, []).append(trigger)
+        self._by_type = {key: tuple(items) for key, items in index.items()}
+
+
+def _compile_pattern(pattern: Any) -> CompiledCondition:
+    if isinstance(pattern, Mapping) and "any" not in pattern and "all" not in pattern:
+        return compile_condition({"all": [{"key": key, "value": value} for key, value in pattern.items()]})
+    return compile_condition(pattern)
+
+
+def _event_type(pattern: Any) -> str | None:
+    if isinstance(pattern, Mapping):
+        value = pattern.get("type")
+        if isinstance(value, str) and "any" not in pattern and "all" not in pattern:
+            return value
+    return None
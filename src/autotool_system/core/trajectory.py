@@ -0,0 +1,278 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Iterable, Iterator, Mapping, Sequence
+import math
+
+try:
+    import numpy
+except Exception:  # pragma: no cover - optional dependency
+    numpy = None
+
+
+@dataclass(frozen=True)
+class SimplifyOptions:
+    tolerance: float = 2.0
+    max_interval: float | None = None
+    min_interval: float = 0.0
+    method: str = "rdp"
+    max_run: int = 10000
+
+    @classmethod
+    def from_obj(cls, value: "SimplifyOptions | Mapping[str, Any] | float | None") -> "SimplifyOptions | None":
+        if value is None or isinstance(value, SimplifyOptions):
+            return value
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return cls(tolerance=float(value))
+        if not isinstance(value, Mapping):
+            raise ValueError("Simplify options must be a mapping or tolerance")
+        method = str(value.get("method", "rdp")).lower()
+        if method not in {"rdp", "resample"}:
+            raise ValueError(f"Unsupported simplify method: {method}")
+        max_interval = value.get("max_interval")
+        return cls(
+            tolerance=float(value.get("tolerance", 2.0)),
+            max_interval=float(max_interval) if max_interval is not None else None,
+            min_interval=float(value.get("min_interval", 0.0)),
+            method=method,
+            max_run=int(value.get("max_run", 10000)),
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "tolerance": self.tolerance,
+            "max_interval": self.max_interval,
+            "min_interval": self.min_interval,
+            "method": self.method,
+            "max_run": self.max_run,
+        }
+
+
+@dataclass
+class SimplifyReport:
+    original: int = 0
+    retained: int = 0
+    moves_original: int = 0
+    moves_retained: int = 0
+    runs: int = 0
+
+    @property
+    def ratio(self) -> float:
+        if self.original == 0:
+            return 1.0
+        return self.retained / self.original
+
+    @property
+    def reduction(self) -> float:
+        return 1.0 - self.ratio
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "original": self.original,
+            "retained": self.retained,
+            "moves_original": self.moves_original,
+            "moves_retained": self.moves_retained,
+            "runs": self.runs,
+            "ratio": self.ratio,
+            "reduction": self.reduction,
+        }
+
+
+def rdp_indices(xs: Sequence[float], ys: Sequence[float], tolerance: float) -> list[int]:
+    count = len(xs)
+    if count <= 2 or tolerance <= 0:
+        return list(range(count))
+    keep = [False] * count
+    keep[0] = keep[-1] = True
+    if numpy is not None:
+        px = numpy.asarray(xs, dtype=float)
+        py = numpy.asarray(ys, dtype=float)
+    stack = [(0, count - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+        if numpy is not None:
+            idx, dist = _farthest_numpy(px, py, start, end)
+        else:
+            idx, dist = _farthest_python(xs, ys, start, end)
+        if dist > tolerance:
+            keep[idx] = True
+            stack.append((start, idx))
+            stack.append((idx, end))
+    return [idx for idx, flag in enumerate(keep) if flag]
+
+
+def _farthest_numpy(px: Any, py: Any, start: int, end: int) -> tuple[int, float]:
+    x0, y0, x1, y1 = px[start], py[start], px[end], py[end]
+    seg_x = px[start + 1 : end]
+    seg_y = py[start + 1 : end]
+    dx = x1 - x0
+    dy = y1 - y0
+    norm = math.hypot(dx, dy)
+    if norm == 0:
+        dists = numpy.hypot(seg_x - x0, seg_y - y0)
+    else:
+        dists = numpy.abs(dy * seg_x - dx * seg_y + x1 * y0 - y1 * x0) / norm
+    offset = int(numpy.argmax(dists))
+    return start + 1 + offset, float(dists[offset])
+
+
+def _farthest_python(xs: Sequence[float], ys: Sequence[float], start: int, end: int) -> tuple[int, float]:
+    x0, y0, x1, y1 = xs[start], ys[start], xs[end], ys[end]
+    dx = x1 - x0
+    dy = y1 - y0
+    norm = math.hypot(dx, dy)
+    best_idx = start + 1
+    best = -1.0
+    cross = x1 * y0 - y1 * x0
+    for idx in range(start + 1, end):
+        if norm == 0:
+            dist = math.hypot(xs[idx] - x0, ys[idx] - y0)
+        else:
+            dist = abs(dy * xs[idx] - dx * ys[idx] + cross) / norm
+        if dist > best:
+            best = dist
+            best_idx = idx
+    return best_idx, best
+
+
+def resample_indices(
+    xs: Sequence[float],
+    ys: Sequence[float],
+    ts: Sequence[float],
+    *,
+    tolerance: float,
+    min_interval: float = 0.0,
+    speed_change: float = 2.0,
+) -> list[int]:
+    count = len(xs)
+    if count <= 2:
+        return list(range(count))
+    kept = [0]
+    last = 0
+    last_speed: float | None = None
+    for idx in range(1, count - 1):
+        distance = math.hypot(xs[idx] - xs[last], ys[idx] - ys[last])
+        elapsed = ts[idx] - ts[last]
+        speed = distance / elapsed if elapsed > 0 else math.inf
+        changed = False
+        if last_speed is not None and distance > 0:
+            low, high = sorted((speed, last_speed))
+            changed = low == 0 or high / low >= speed_change
+        if (distance >= tolerance and elapsed >= min_interval) or (changed and distance >= tolerance / 2):
+            kept.append(idx)
+            last = idx
+            last_speed = speed
+    kept.append(count - 1)
+    return kept
+
+
+def simplify_events(
+    items: Iterable[Mapping[str, Any]],
+    options: SimplifyOptions | None = None,
+    *,
+    report: SimplifyReport | None = None,
+) -> Iterator[Mapping[str, Any]]:
+    opts = options or SimplifyOptions()
+    stats = report if report is not None else SimplifyReport()
+    run: list[Mapping[str, Any]] = []
+    for item in items:
+        stats.original += 1
+        if _move_point(item) is not None:
+            stats.moves_original += 1
+            run.append(item)
+            if len(run) >= opts.max_run:
+                for kept in _simplify_run(run, opts, stats):
+                    yield kept
+                run = []
+            continue
+        if run:
+            for kept in _simplify_run(run, opts, stats):
+                yield kept
+            run = []
+        stats.retained += 1
+        yield item
+    if run:
+        for kept in _simplify_run(run, opts, stats):
+            yield kept
+
+
+def _simplify_run(
+    run: list[Mapping[str, Any]], options: SimplifyOptions, stats: SimplifyReport
+) -> Iterator[Mapping[str, Any]]:
+    stats.runs += 1
+    points = [_move_point(item) for item in run]
+    xs = [point[0] for point in points]
+    ys = [point[1] for point in points]
+    ts = _timeline(run)
+    if options.method == "resample":
+        kept = resample_indices(xs, ys, ts, tolerance=options.tolerance, min_interval=options.min_interval)
+    else:
+        kept = rdp_indices(xs, ys, options.tolerance)
+    if options.max_interval is not None:
+        kept = _enforce_interval(kept, ts, options.max_interval)
+    stats.moves_retained += len(kept)
+    stats.retained += len(kept)
+    previous = -1
+    for idx in kept:
+        item = run[idx]
+        skipped = run[previous + 1 : idx]
+        if skipped:
+            carried = sum(_delta(entry) for entry in skipped)
+            item = dict(item)
+            item["delta"] = _delta(run[idx]) + carried
+        previous = idx
+        yield item
+
+
+def _enforce_interval(kept: list[int], ts: list[float], max_interval: float) -> list[int]:
+    result: list[int] = []
+    kept_set = set(kept)
+    last_ts: float | None = None
+    for idx in range(len(ts)):
+        if idx in kept_set:
+            result.append(idx)
+            last_ts = ts[idx]
+            continue
+        if last_ts is not None and idx + 1 < len(ts) and ts[idx + 1] - last_ts > max_interval:
+            result.append(idx)
+            last_ts = ts[idx]
+    return result
+
+
+def _timeline(run: list[Mapping[str, Any]]) -> list[float]:
+    timeline: list[float] = []
+    elapsed = 0.0
+    for idx, item in enumerate(run):
+        if idx:
+            elapsed += _delta(item)
+        timeline.append(elapsed)
+    return timeline
+
+
+def _delta(item: Mapping[str, Any]) -> float:
+    try:
+        return float(item.get("delta", 0.0) or 0.0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _move_point(item: Any) -> tuple[float, float] | None:
+    if not isinstance(item, Mapping):
+        return None
+    if item.get("type") == "mouse" and item.get("action") == "move":
+        data = item.get("payload")
+    elif item.get("type") == "move" and "action" not in item:
+        data = item.get("params")
+    else:
+        return None
+    if not isinstance(data, Mapping):
+        return None
+    x = data.get("x")
+    y = data.get("y")
+    if not isinstance(x, (int, float)) or not isinstance(y, (int, float)):
+        return None
+    if set(data) - {"x", "y", "duration"}:
+        return None
+    return float(x), float(y)
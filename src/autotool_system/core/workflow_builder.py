@@ -1,26 +1,48 @@
 from __future__ import annotations
 
-from collections import deque
+import heapq
 from typing import Any, Mapping
 
 from ..automation import Action, ActionError
 
 
+LOOP_NODE_TYPES = {"control.loop", "control.retry"}
+
+
 class WorkflowError(RuntimeError):
     pass
 
 
 class WorkflowBuilder:
     def validate(self, workflow: Mapping[str, Any]) -> list[str]:
+        return self._check(workflow)[0]
+
+    def compile(self, workflow: Mapping[str, Any]) -> list[Action]:
+        errors, index = self._check(workflow)
+        if errors:
+            raise WorkflowError("; ".join(errors))
+
+        if index is None:
+            steps = workflow.get("steps", [])
+            return [Action.from_obj(step) for step in steps]
+
+        order, _ = index.toposort()
+        actions = [action for position in order if (action := index.actions[position]) is not None]
+        if not actions:
+            raise WorkflowError("workflow contains no executable actions")
+        return actions
+
+    def _check(self, workflow: Mapping[str, Any]) -> tuple[list[str], "_GraphIndex | None"]:
         errors: list[str] = []
         if not isinstance(workflow, Mapping):
-            return ["workflow must be a mapping"]
+            return ["workflow must be a mapping"], None
 
         if not workflow.get("id"):
             errors.append("workflow.id is required")
         if not workflow.get("name"):
             errors.append("workflow.name is required")
 
+        index = None
         if "steps" in workflow:
             steps = workflow.get("steps")
             if not isinstance(steps, list):
@@ -37,98 +59,198 @@ class WorkflowBuilder:
             if not isinstance(graph, Mapping):
                 errors.append("workflow.graph must be a mapping")
             else:
-                nodes = graph.get("nodes")
-                edges = graph.get("edges")
-                if not isinstance(nodes, list) or not nodes:
-                    errors.append("workflow.graph.nodes must be a non-empty list")
-                if not isinstance(edges, list):
-                    errors.append("workflow.graph.edges must be a list")
-                if isinstance(nodes, list):
-                    ids = [node.get("id") for node in nodes if isinstance(node, Mapping)]
-                    if any(not node_id for node_id in ids):
-                        errors.append("workflow.graph.nodes require id")
-                    if len(set(ids)) != len(ids):
-                        errors.append("workflow.graph.nodes ids must be unique")
-                if isinstance(nodes, list) and isinstance(edges, list):
-                    node_ids = {node.get("id") for node in nodes if isinstance(node, Mapping)}
-                    for edge in edges:
-                        if not isinstance(edge, Mapping):
-                            errors.append("workflow.graph.edges entries must be mappings")
-                            continue
-                        source = _edge_from(edge)
-                        target = _edge_to(edge)
-                        if source not in node_ids or target not in node_ids:
-                            errors.append(f"edge references missing node: {source} -> {target}")
-                    if not errors and _has_cycle(nodes, edges):
-                        errors.append("workflow.graph contains cycles")
-                    if isinstance(nodes, list):
-                        for node in nodes:
-                            if not isinstance(node, Mapping):
-                                continue
-                            action_data = _extract_action_data(node)
-                            if action_data is None:
-                                continue
-                            try:
-                                Action.from_obj(action_data)
-                            except ActionError as exc:
-                                errors.append(f"node {node.get('id')} invalid action: {exc}")
+                index = _GraphIndex(graph)
+                errors.extend(index.errors())
         else:
             errors.append("workflow.steps or workflow.graph is required")
 
-        return errors
-
-    def compile(self, workflow: Mapping[str, Any]) -> list[Action]:
-        errors = self.validate(workflow)
-        if errors:
-            raise WorkflowError("; ".join(errors))
-
-        if "steps" in workflow:
-            steps = workflow.get("steps", [])
-            return [Action.from_obj(step) for step in steps]
-
-        graph = workflow.get("graph", {})
-        nodes = graph.get("nodes", [])
-        edges = graph.get("edges", [])
-        node_map = {node["id"]: node for node in nodes if isinstance(node, Mapping)}
-
-        ordered_ids = _toposort(node_map, edges)
-        actions: list[Action] = []
-        for node_id in ordered_ids:
-            node = node_map[node_id]
+        return errors, index
+
+
+class _GraphIndex:
+    def __init__(self, graph: Mapping[str, Any]) -> None:
+        self.structure: list[str] = []
+        self.edge_errors: list[str] = []
+        self.action_errors: list[str] = []
+        self.ids: list[str] = []
+        self.nodes: list[Mapping[str, Any]] = []
+        self.actions: list[Action | None] = []
+        self.adjacency: list[list[int]] = []
+        self.in_degree: list[int] = []
+        self.position: dict[str, int] = {}
+        self._order: tuple[list[int], list[str]] | None = None
+
+        nodes = graph.get("nodes")
+        edges = graph.get("edges")
+        if not isinstance(nodes, list) or not nodes:
+            self.structure.append("workflow.graph.nodes must be a non-empty list")
+        if not isinstance(edges, list):
+            self.structure.append("workflow.graph.edges must be a list")
+        if isinstance(nodes, list):
+            self._index_nodes(nodes)
+        if isinstance(nodes, list) and isinstance(edges, list):
+            self._index_edges(edges)
+
+    def _index_nodes(self, nodes: list[Any]) -> None:
+        position = self.position
+        missing_id = False
+        duplicate = False
+        for node in nodes:
+            if type(node) is not dict and not isinstance(node, Mapping):
+                continue
+            node_id = node.get("id")
+            slot = None
+            if not node_id:
+                missing_id = True
+            elif node_id in position:
+                duplicate = True
+            else:
+                slot = len(self.ids)
+                position[node_id] = slot
+                self.ids.append(node_id)
+                self.nodes.append(node)
+                self.actions.append(None)
             action_data = _extract_action_data(node)
             if action_data is None:
                 continue
-            action_payload = dict(action_data)
-            action_payload.setdefault("id", node_id)
-            actions.append(Action.from_obj(action_payload))
-
-        if not actions:
-            raise WorkflowError("workflow contains no executable actions")
-        return actions
+            if node_id and (type(action_data) is dict or isinstance(action_data, Mapping)) and not action_data.get("id"):
+                action_data = {**action_data, "id": node_id}
+            try:
+                action = Action.from_obj(action_data)
+            except ActionError as exc:
+                self.action_errors.append(f"node {node_id} invalid action: {exc}")
+                continue
+            if slot is not None:
+                self.actions[slot] = action
+        if missing_id:
+            self.structure.append("workflow.graph.nodes require id")
+        if duplicate:
+            self.structure.append("workflow.graph.nodes ids must be unique")
+
+    def _index_edges(self, edges: list[Any]) -> None:
+        position = self.position
+        adjacency = self.adjacency = [[] for _ in self.ids]
+        in_degree = self.in_degree = [0] * len(self.ids)
+        shapes: dict[tuple[str, ...], tuple[tuple[str, ...], tuple[str, ...]]] = {}
+        for edge in edges:
+            if type(edge) is dict:
+                shape = tuple(edge)
+                keys = shapes.get(shape)
+                if keys is None:
+                    keys = shapes[shape] = (
+                        tuple(key for key in _SOURCE_KEYS if key in edge),
+                        tuple(key for key in _TARGET_KEYS if key in edge),
+                    )
+                source = target = None
+                for key in keys[0]:
+                    source = edge[key]
+                    if source:
+                        break
+                for key in keys[1]:
+                    target = edge[key]
+                    if target:
+                        break
+            elif isinstance(edge, Mapping):
+                source = _edge_from(edge)
+                target = _edge_to(edge)
+            else:
+                self.edge_errors.append("workflow.graph.edges entries must be mappings")
+                continue
+            try:
+                source_pos = position.get(source)
+                target_pos = position.get(target)
+            except TypeError:
+                source_pos = target_pos = None
+            if source_pos is None or target_pos is None:
+                self.edge_errors.append(f"edge references missing node: {source} -> {target}")
+                continue
+            adjacency[source_pos].append(target_pos)
+            in_degree[target_pos] += 1
+        for position, node in enumerate(self.nodes):
+            if _node_type(node) in LOOP_NODE_TYPES and in_degree[position]:
+                self._drop_back_edges(position)
+
+    def _drop_back_edges(self, loop: int) -> None:
+        adjacency = self.adjacency
+        seen = {loop}
+        stack = [loop]
+        while stack:
+            for target in adjacency[stack.pop()]:
+                if target not in seen:
+                    seen.add(target)
+                    stack.append(target)
+        for source in seen:
+            targets = adjacency[source]
+            if source != loop and loop in targets:
+                kept = [target for target in targets if target != loop]
+                self.in_degree[loop] -= len(targets) - len(kept)
+                adjacency[source] = kept
+
+    def errors(self) -> list[str]:
+        errors = self.structure + self.edge_errors
+        if not errors and self.ids:
+            _, cycle = self.toposort()
+            if cycle:
+                errors.append(f"workflow.graph contains cycles: {' -> '.join(cycle)}")
+        return errors + self.action_errors
+
+    def toposort(self) -> tuple[list[int], list[str]]:
+        if self._order is not None:
+            return self._order
+        ids = self.ids
+        count = len(ids)
+        ranked = sorted(range(count), key=lambda pos: (0 if _node_type(self.nodes[pos]) == "start" else 1, ids[pos]))
+        rank = [0] * count
+        for order, pos in enumerate(ranked):
+            rank[pos] = order
+        in_degree = list(self.in_degree)
+        adjacency = self.adjacency
+        frontier = [rank[pos] for pos in range(count) if in_degree[pos] == 0]
+        heapq.heapify(frontier)
+        ordered: list[int] = []
+        while frontier:
+            current = ranked[heapq.heappop(frontier)]
+            ordered.append(current)
+            for neighbor in adjacency[current]:
+                in_degree[neighbor] -= 1
+                if in_degree[neighbor] == 0:
+                    heapq.heappush(frontier, rank[neighbor])
+        cycle = self._find_cycle(in_degree) if len(ordered) != count else []
+        self._order = (ordered, cycle)
+        return self._order
+
+    def _find_cycle(self, in_degree: list[int]) -> list[str]:
+        predecessor: dict[int, int] = {}
+        for source, targets in enumerate(self.adjacency):
+            if in_degree[source] == 0:
+                continue
+            for target in targets:
+                if in_degree[target] > 0:
+                    predecessor.setdefault(target, source)
+        current = next(iter(predecessor))
+        seen: dict[int, int] = {}
+        path: list[int] = []
+        while current not in seen:
+            seen[current] = len(path)
+            path.append(current)
+            current = predecessor[current]
+        members = path[seen[current]:]
+        members.reverse()
+        first = min(range(len(members)), key=lambda idx: str(self.ids[members[idx]]))
+        members = members[first:] + members[:first]
+        return [self.ids[pos] for pos in members + members[:1]]
+
+
+_SOURCE_KEYS = ("from", "source", "src", "start", "sourceId", "sourceNodeID", "sourceNodeId")
+_TARGET_KEYS = ("to", "target", "dst", "end", "targetId", "targetNodeID", "targetNodeId")
 
 
 def _edge_from(edge: Mapping[str, Any]) -> str | None:
-    return (
-        edge.get("from")
-        or edge.get("source")
-        or edge.get("src")
-        or edge.get("start")
-        or edge.get("sourceId")
-        or edge.get("sourceNodeID")
-        or edge.get("sourceNodeId")
-    )
+    return next((value for key in _SOURCE_KEYS if (value := edge.get(key))), None)
 
 
 def _edge_to(edge: Mapping[str, Any]) -> str | None:
-    return (
-        edge.get("to")
-        or edge.get("target")
-        or edge.get("dst")
-        or edge.get("end")
-        or edge.get("targetId")
-        or edge.get("targetNodeID")
-        or edge.get("targetNodeId")
-    )
+    return next((value for key in _TARGET_KEYS if (value := edge.get(key))), None)
 
 
 def _node_type(node: Mapping[str, Any]) -> str:
@@ -139,7 +261,7 @@ def _extract_action_data(node: Mapping[str, Any]) -> Mapping[str, Any] | None:
     if "action" in node:
         return node.get("action")
     data = node.get("data")
-    if isinstance(data, Mapping):
+    if type(data) is dict or isinstance(data, Mapping):
         if "action" in data:
             return data.get("action")
         if "type" in data:
@@ -147,49 +269,3 @@ def _extract_action_data(node: Mapping[str, Any]) -> Mapping[str, Any] | None:
     if "type" in node and "params" in node:
         return {"type": node.get("type"), "params": node.get("params", {})}
     return None
-
-
-def _has_cycle(nodes: list[Mapping[str, Any]], edges: list[Mapping[str, Any]]) -> bool:
-    node_map = {node["id"]: node for node in nodes if isinstance(node, Mapping) and node.get("id")}
-    ordered = _toposort(node_map, edges, allow_partial=True)
-    return len(ordered) != len(node_map)
-
-
-def _toposort(
-    nodes: Mapping[str, Mapping[str, Any]],
-    edges: list[Mapping[str, Any]],
-    *,
-    allow_partial: bool = False,
-) -> list[str]:
-    in_degree = {node_id: 0 for node_id in nodes}
-    adjacency: dict[str, list[str]] = {node_id: [] for node_id in nodes}
-
-    for edge in edges:
-        if not isinstance(edge, Mapping):
-            continue
-        source = _edge_from(edge)
-        target = _edge_to(edge)
-        if source in nodes and target in nodes:
-            adjacency[source].append(target)
-            in_degree[target] += 1
-
-    def sort_key(node_id: str) -> tuple[int, str]:
-        return (0 if _node_type(nodes[node_id]) == "start" else 1, node_id)
-
-    queue = deque(sorted([nid for nid, degree in in_degree.items() if degree == 0], key=sort_key))
-    ordered: list[str] = []
-
-    while queue:
-        current = queue.popleft()
-        ordered.append(current)
-        for neighbor in sorted(adjacency[current]):
-            in_degree[neighbor] -= 1
-            if in_degree[neighbor] == 0:
-                queue.append(neighbor)
-
-    if allow_partial:
-        return ordered
-
-    if len(ordered) != len(nodes):
-        raise WorkflowError("workflow graph contains cycles or disconnected nodes")
-    return ordered
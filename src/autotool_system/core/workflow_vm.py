@@ -0,0 +1,501 @@
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Mapping
+import json
+import re
+
+from ..automation import Action, ActionError
+from ..automation.action import ExecutionResult
+from .rule_engine import CompiledCondition, compile_condition
+from .workflow_builder import LOOP_NODE_TYPES, WorkflowBuilder, WorkflowError, _edge_from, _edge_to, _extract_action_data, _node_type
+
+
+CONTROL_NODE_TYPES = LOOP_NODE_TYPES | {"control.condition"}
+
+OP_ACT = 0
+OP_JUMP = 1
+OP_BRANCH = 2
+OP_LOOP = 3
+OP_NEXT = 4
+OP_TRY = 5
+OP_RETRY = 6
+OP_HALT = 7
+
+OP_NAMES = ("act", "jump", "branch", "loop", "next", "try", "retry", "halt")
+
+_EXPRESSION = re.compile(r"^\s*([A-Za-z_][\w.]*)\s*(==|!=|>=|<=|>|<|\bnot in\b|\bin\b|\bcontains\b)\s*(.+?)\s*$")
+_EXPRESSION_OPS = {
+    "==": "eq",
+    "!=": "ne",
+    ">": "gt",
+    ">=": "gte",
+    "<": "lt",
+    "<=": "lte",
+    "in": "in",
+    "not in": "not_in",
+    "contains": "contains",
+}
+
+Instruction = tuple[int, int, int, int, int]
+
+
+def has_control_nodes(workflow: Mapping[str, Any]) -> bool:
+    graph = workflow.get("graph") if isinstance(workflow, Mapping) else None
+    if not isinstance(graph, Mapping) or not isinstance(graph.get("nodes"), list):
+        return False
+    return any(isinstance(node, Mapping) and _node_type(node) in CONTROL_NODE_TYPES for node in graph["nodes"])
+
+
+def parse_condition(data: Mapping[str, Any]) -> Any:
+    condition = data.get("condition")
+    if condition is not None:
+        return condition
+    expression = data.get("expression")
+    if isinstance(expression, (Mapping, list)):
+        return expression
+    if not isinstance(expression, str) or not expression.strip():
+        raise WorkflowError("condition node requires condition or expression")
+    text = expression.strip()
+    if text.startswith(("{", "[")):
+        try:
+            return json.loads(text)
+        except json.JSONDecodeError as exc:
+            raise WorkflowError(f"Invalid condition expression: {exc}") from exc
+    match = _EXPRESSION.match(text)
+    if match is None:
+        raise WorkflowError(f"Unsupported condition expression: {expression}")
+    key, op, literal = match.groups()
+    try:
+        value = json.loads(literal)
+    except json.JSONDecodeError:
+        value = literal.strip("'\"")
+    return {"key": key, "op": _EXPRESSION_OPS[op], "value": value}
+
+
+@dataclass
+class WorkflowProgram:
+    node_ids: list[str]
+    actions: list[Action]
+    conditions: list[CompiledCondition]
+    sources: list[Any]
+    code: list[Instruction]
+    slots: int
+
+    def action_dicts(self) -> list[dict[str, Any]]:
+        return [action.to_dict() for action in self.actions]
+
+    def listing(self) -> list[str]:
+        lines = []
+        for pc, (op, node, a, b, c) in enumerate(self.code):
+            node_id = self.node_ids[node] if node >= 0 else "-"
+            lines.append(f"{pc:04d} {OP_NAMES[op]:<6} {node_id} {a} {b} {c}")
+        return lines
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "nodes": list(self.node_ids),
+            "actions": self.action_dicts(),
+            "conditions": list(self.sources),
+            "code": [[OP_NAMES[op], node, a, b, c] for op, node, a, b, c in self.code],
+            "slots": self.slots,
+        }
+
+
+@dataclass
+class VMResult:
+    status: str
+    results: list[ExecutionResult]
+    counts: dict[str, int]
+    steps: int
+    variables: dict[str, Any] = field(default_factory=dict)
+    error: str | None = None
+    succeeded: int = 0
+    failed: int = 0
+
+    @property
+    def total(self) -> int:
+        return self.succeeded + self.failed
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "status": self.status,
+            "results": [result.to_dict() for result in self.results],
+            "counts": dict(self.counts),
+            "steps": self.steps,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "error": self.error,
+        }
+
+
+class _ProgramBuilder:
+    def __init__(self, workflow: Mapping[str, Any]) -> None:
+        errors = WorkflowBuilder().validate(workflow)
+        if errors:
+            raise WorkflowError("; ".join(errors))
+        graph = workflow["graph"]
+        self.nodes = [node for node in graph["nodes"] if isinstance(node, Mapping)]
+        self.position = {node["id"]: idx for idx, node in enumerate(self.nodes)}
+        self.outgoing: list[list[tuple[str | None, int]]] = [[] for _ in self.nodes]
+        self.incoming: list[list[int]] = [[] for _ in self.nodes]
+        for edge in graph["edges"]:
+            source = self.position[_edge_from(edge)]
+            target = self.position[_edge_to(edge)]
+            port = edge.get("sourcePortID") or edge.get("sourcePortId") or edge.get("sourcePort") or edge.get("port")
+            self.outgoing[source].append((str(port).lower() if port else None, target))
+            self.incoming[target].append(source)
+        self.types = [_node_type(node) for node in self.nodes]
+        self.entries = self._entries()
+        self.bodies = self._loop_bodies(self._dominators())
+        self.scope = 0
+        self.code: list[list[int]] = []
+        self.actions: list[Action] = []
+        self.conditions: list[CompiledCondition] = []
+        self.sources: list[Any] = []
+        self.compiled: dict[int, int] = {}
+        self.labels: dict[tuple[int, tuple[int, ...], int], int] = {}
+        self.slots = 0
+
+    def build(self) -> WorkflowProgram:
+        for scope, entry in enumerate(self.entries):
+            self.scope = scope
+            ends: list[int] = []
+            self._chain(entry, (), ends, ())
+            for pc in ends:
+                self.code[pc][2] = len(self.code)
+        self._emit(OP_HALT, -1)
+        return WorkflowProgram(
+            node_ids=[str(node["id"]) for node in self.nodes],
+            actions=self.actions,
+            conditions=self.conditions,
+            sources=self.sources,
+            code=[tuple(item) for item in self.code],  # type: ignore[misc]
+            slots=self.slots,
+        )
+
+    def _entries(self) -> list[int]:
+        entries = [position for position, sources in enumerate(self.incoming) if not sources]
+        reached: set[int] = set(entries)
+        for entry in entries:
+            reached |= self._reach(entry)
+        while len(reached) < len(self.nodes):
+            pending = [position for position in range(len(self.nodes)) if position not in reached]
+            candidates = []
+            for position in pending:
+                if self.types[position] not in LOOP_NODE_TYPES:
+                    continue
+                inside = self._reach(position) | {position}
+                if all(source in inside for source in self.incoming[position]):
+                    candidates.append(position)
+            if not candidates:
+                raise WorkflowError(f"workflow.graph contains cycles outside loop nodes at {self.nodes[pending[0]]['id']}")
+            entry = min(candidates, key=lambda pos: str(self.nodes[pos]["id"]))
+            entries.append(entry)
+            reached |= self._reach(entry) | {entry}
+        entries.sort(key=lambda pos: (0 if self.types[pos] == "start" else 1, str(self.nodes[pos]["id"])))
+        return entries
+
+    def _dominators(self) -> list[set[int]]:
+        everything = set(range(len(self.nodes)))
+        roots = set(self.entries)
+        dominators = [{position} if position in roots else set(everything) for position in range(len(self.nodes))]
+        changed = True
+        while changed:
+            changed = False
+            for position in range(len(self.nodes)):
+                if position in roots:
+                    continue
+                common = set(everything)
+                for source in self.incoming[position]:
+                    common &= dominators[source]
+                common.add(position)
+                if common != dominators[position]:
+                    dominators[position] = common
+                    changed = True
+        return dominators
+
+    def _loop_bodies(self, dominators: list[set[int]]) -> dict[int, set[int]]:
+        bodies: dict[int, set[int]] = {}
+        for source, targets in enumerate(self.outgoing):
+            for _, target in targets:
+                if target not in dominators[source]:
+                    continue
+                if self.types[target] not in LOOP_NODE_TYPES:
+                    raise WorkflowError(f"workflow.graph contains cycles outside loop nodes at {self.nodes[target]['id']}")
+                body = bodies.setdefault(target, {target})
+                stack = [source]
+                while stack:
+                    position = stack.pop()
+                    if position in body:
+                        continue
+                    body.add(position)
+                    stack.extend(self.incoming[position])
+        return bodies
+
+    def _reach(self, start: int) -> set[int]:
+        seen = {start}
+        stack = [start]
+        while stack:
+            for _, target in self.outgoing[stack.pop()]:
+                if target not in seen:
+                    seen.add(target)
+                    stack.append(target)
+        seen.discard(start)
+        return seen
+
+    def _emit(self, op: int, node: int, a: int = 0, b: int = 0, c: int = 0) -> int:
+        self.code.append([op, node, a, b, c])
+        return len(self.code) - 1
+
+    def _chain(self, position: int | None, region: tuple[int, ...], ends: list[int], path: tuple[int, ...]) -> None:
+        while position is not None:
+            if region and position == region[-1]:
+                break
+            if position in path:
+                raise WorkflowError(f"workflow.graph contains cycles outside loop nodes at {self.nodes[position]['id']}")
+            label = self.labels.get((self.scope, region, position))
+            if label is not None:
+                self._emit(OP_JUMP, position, label)
+                return
+            self.labels[(self.scope, region, position)] = len(self.code)
+            path = path + (position,)
+            kind = self.types[position]
+            if kind == "control.condition":
+                self._condition(position, region, ends, path)
+                return
+            if kind in LOOP_NODE_TYPES:
+                position = self._loop(position, region, path)
+                continue
+            self._action(position)
+            targets = [target for _, target in self.outgoing[position]]
+            if len(targets) > 1:
+                raise WorkflowError(f"node {self.nodes[position]['id']} has multiple outgoing edges; branch with control.condition")
+            position = targets[0] if targets else None
+        ends.append(self._emit(OP_JUMP, -1))
+
+    def _action(self, position: int) -> None:
+        index = self.compiled.get(position)
+        if index is not None:
+            self._emit(OP_ACT, position, index)
+            return
+        node = self.nodes[position]
+        action_data = _extract_action_data(node)
+        if action_data is None:
+            return
+        payload = dict(action_data)
+        payload.setdefault("id", node["id"])
+        try:
+            action = Action.from_obj(payload)
+        except ActionError as exc:
+            raise WorkflowError(f"node {node['id']} invalid action: {exc}") from exc
+        self.actions.append(action)
+        self.compiled[position] = len(self.actions) - 1
+        self._emit(OP_ACT, position, len(self.actions) - 1)
+
+    def _condition(self, position: int, region: tuple[int, ...], ends: list[int], path: tuple[int, ...]) -> None:
+        node = self.nodes[position]
+        index = self.compiled.get(position)
+        if index is None:
+            data = node.get("data") if isinstance(node.get("data"), Mapping) else {}
+            source = parse_condition(data)
+            self.conditions.append(compile_condition(source))
+            self.sources.append(source if not callable(source) else repr(source))
+            index = self.compiled[position] = len(self.conditions) - 1
+        branches: dict[str, int] = {}
+        for port, target in self.outgoing[position]:
+            if port not in {"true", "false"}:
+                raise WorkflowError(f"condition node {node['id']} edges require a true or false port")
+            if port in branches:
+                raise WorkflowError(f"condition node {node['id']} has more than one {port} edge")
+            branches[port] = target
+        branch = self._emit(OP_BRANCH, position, index)
+        self._chain(branches.get("true"), region, ends, path)
+        self.code[branch][3] = len(self.code)
+        self._chain(branches.get("false"), region, ends, path)
+
+    def _loop(self, position: int, region: tuple[int, ...], path: tuple[int, ...]) -> int | None:
+        node = self.nodes[position]
+        data = node.get("data") if isinstance(node.get("data"), Mapping) else {}
+        try:
+            times = int(data.get("times", 1 if self.types[position] == "control.loop" else 3))
+        except (TypeError, ValueError) as exc:
+            raise WorkflowError(f"node {node['id']} times must be an integer") from exc
+        if times < 0:
+            raise WorkflowError(f"node {node['id']} times must be >= 0")
+        body, exit_ = self._split_body(position)
+        slot = self.slots
+        self.slots += 1
+        retry = self.types[position] == "control.retry"
+        head = self._emit(OP_TRY if retry else OP_LOOP, position, slot, times)
+        start = len(self.code)
+        ends: list[int] = []
+        self._chain(body, region + (position,), ends, path)
+        tail = self._emit(OP_RETRY if retry else OP_NEXT, position, slot, times, start)
+        for pc in ends:
+            self.code[pc][2] = tail
+        self.code[head][4] = tail
+        return exit_
+
+    def _split_body(self, position: int) -> tuple[int | None, int | None]:
+        node_id = self.nodes[position]["id"]
+        targets = self.outgoing[position]
+        body = [target for port, target in targets if port in {"body", "loop"}]
+        if not body:
+            inside = self.bodies.get(position, set())
+            body = [target for _, target in targets if target in inside]
+        exits = [target for _, target in targets if target not in body]
+        if len(body) != 1:
+            raise WorkflowError(f"node {node_id} requires exactly one body edge that leads back to it")
+        if len(exits) > 1:
+            raise WorkflowError(f"node {node_id} has more than one exit edge")
+        return body[0], exits[0] if exits else None
+
+
+def compile_program(workflow: Mapping[str, Any]) -> WorkflowProgram:
+    return _ProgramBuilder(workflow).build()
+
+
+class WorkflowVM:
+    def __init__(self, program: WorkflowProgram, *, max_steps: int | None = None) -> None:
+        self._program = program
+        self._max_steps = max_steps
+
+    def run(
+        self,
+        execute: Callable[[Action], ExecutionResult],
+        *,
+        variables: Mapping[str, Any] | None = None,
+        should_stop: Callable[[], bool] | None = None,
+        stop_on_error: bool = False,
+        max_results: int | None = None,
+    ) -> VMResult:
+        program = self._program
+        code = program.code
+        actions = program.actions
+        conditions = program.conditions
+        counts = [0] * len(program.node_ids)
+        remaining = [0] * program.slots
+        attempts = [0] * program.slots
+        failed = [False] * program.slots
+        handlers: list[tuple[int, int, int]] = []
+        loops: list[int] = []
+        node_ids = program.node_ids
+        context: dict[str, Any] = dict(variables or {})
+        context.setdefault("last_success", True)
+        results: deque[ExecutionResult] = deque(maxlen=max_results)
+        succeeded = 0
+        failures = 0
+        max_steps = self._max_steps
+        status = "success"
+        error: str | None = None
+        steps = 0
+        pc = 0
+        while True:
+            op, node, a, b, c = code[pc]
+            steps += 1
+            if max_steps is not None and steps > max_steps:
+                status = "aborted"
+                error = f"step limit of {max_steps} exceeded"
+                break
+            if op == OP_ACT:
+                if should_stop is not None and should_stop():
+                    status = "stopped"
+                    break
+                counts[node] += 1
+                result = execute(actions[a])
+                results.append(result)
+                context["last_success"] = result.success
+                context["last_action"] = result.action_id
+                if result.success:
+                    succeeded += 1
+                else:
+                    failures += 1
+                    if handlers:
+                        slot, end, depth = handlers[-1]
+                        failed[slot] = True
+                        _unwind(loops, depth, code, remaining, context)
+                        pc = end
+                        continue
+                    status = "failed"
+                    if stop_on_error:
+                        break
+                pc += 1
+            elif op == OP_JUMP:
+                pc = a
+            elif op == OP_BRANCH:
+                counts[node] += 1
+                try:
+                    matched = conditions[a].predicate(context)
+                except Exception as exc:
+                    status = "failed"
+                    error = f"condition {program.node_ids[node]} failed: {exc}"
+                    break
+                pc = pc + 1 if matched else b
+            elif op == OP_LOOP:
+                counts[node] += 1
+                remaining[a] = b
+                if b > 0:
+                    loops.append(pc)
+                    context["iteration"] = context[f"loops.{node_ids[node]}"] = 0
+                    pc += 1
+                else:
+                    pc = c + 1
+            elif op == OP_NEXT:
+                remaining[a] -= 1
+                if remaining[a] > 0:
+                    context["iteration"] = context[f"loops.{node_ids[node]}"] = b - remaining[a]
+                    pc = c
+                else:
+                    _unwind(loops, len(loops) - 1, code, remaining, context)
+                    pc += 1
+            elif op == OP_TRY:
+                counts[node] += 1
+                attempts[a] = 0
+                failed[a] = False
+                handlers.append((a, c, len(loops)))
+                pc += 1
+            elif op == OP_RETRY:
+                handlers.pop()
+                if failed[a] and attempts[a] < b:
+                    attempts[a] += 1
+                    failed[a] = False
+                    counts[node] += 1
+                    handlers.append((a, pc, len(loops)))
+                    pc = c
+                elif failed[a]:
+                    context["last_success"] = False
+                    if handlers:
+                        slot, end, depth = handlers[-1]
+                        failed[slot] = True
+                        _unwind(loops, depth, code, remaining, context)
+                        pc = end
+                    else:
+                        status = "failed"
+                        if stop_on_error:
+                            break
+                        pc += 1
+                else:
+                    pc += 1
+            else:
+                break
+        return VMResult(
+            status=status,
+            results=list(results),
+            counts={node_ids[idx]: count for idx, count in enumerate(counts) if count},
+            steps=steps,
+            variables=context,
+            error=error,
+            succeeded=succeeded,
+            failed=failures,
+        )
+
+
+def _unwind(loops: list[int], depth: int, code: list[Instruction], remaining: list[int], context: dict[str, Any]) -> None:
+    del loops[depth:]
+    if not loops:
+        context.pop("iteration", None)
+        return
+    _, _, slot, times, _ = code[loops[-1]]
+    context["iteration"] = times - remaining[slot]
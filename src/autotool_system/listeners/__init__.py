@@ -1,6 +1,25 @@
-from .event import Event
-from .event_dispatcher import EventDispatcher
+from .capture_buffer import CaptureBuffer, CaptureRing
+from .event import ClickPayload, Event, EventSession, KeyPayload, PointerPayload, ScrollPayload
+from .event_dispatcher import EventDispatcher, Subscription
+from .hotkeys import HotkeyIndex
 from .keyboard_listener import KeyboardListener
+from .motion_sampler import MotionSampler, MotionSamplerOptions
 from .mouse_listener import MouseListener
 
-__all__ = ["Event", "EventDispatcher", "KeyboardListener", "MouseListener"]
+__all__ = [
+    "CaptureBuffer",
+    "CaptureRing",
+    "ClickPayload",
+    "Event",
+    "EventDispatcher",
+    "EventSession",
+    "HotkeyIndex",
+    "KeyPayload",
+    "KeyboardListener",
+    "MotionSampler",
+    "MotionSamplerOptions",
+    "MouseListener",
+    "PointerPayload",
+    "ScrollPayload",
+    "Subscription",
+]
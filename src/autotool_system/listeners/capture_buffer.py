@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+from heapq import merge
+from typing import Any, Callable, Mapping
+import threading
+import time
+
+from ..utils.logger import get_logger
+from .event import Event, EventSession
+
+
+CaptureRecord = tuple[int, int, int, int, Any]
+Decoder = Callable[[CaptureRecord], tuple[str, str, Mapping[str, Any]] | None]
+EventCallback = Callable[[Event], None]
+
+
+class CaptureRing:
+    __slots__ = ("name", "decode", "_slots", "_mask", "_head", "_tail", "dropped", "high_water")
+
+    def __init__(self, name: str, decode: Decoder, capacity: int) -> None:
+        size = 1
+        while size < max(2, capacity):
+            size <<= 1
+        self.name = name
+        self.decode = decode
+        self._slots: list[CaptureRecord | None] = [None] * size
+        self._mask = size - 1
+        self._head = 0
+        self._tail = 0
+        self.dropped = 0
+        self.high_water = 0
+
+    @property
+    def capacity(self) -> int:
+        return self._mask + 1
+
+    def __len__(self) -> int:
+        return self._head - self._tail
+
+    def push(self, code: int, x: int = 0, y: int = 0, extra: Any = None) -> bool:
+        head = self._head
+        depth = head - self._tail
+        if depth > self._mask:
+            self.dropped += 1
+            return False
+        self._slots[head & self._mask] = (time.perf_counter_ns(), code, x, y, extra)
+        self._head = head + 1
+        if depth >= self.high_water:
+            self.high_water = depth + 1
+        return True
+
+    def drain(self, limit: int) -> list[CaptureRecord]:
+        tail = self._tail
+        end = min(self._head, tail + limit)
+        if end == tail:
+            return []
+        slots = self._slots
+        mask = self._mask
+        records = [slots[idx & mask] for idx in range(tail, end)]
+        for idx in range(tail, end):
+            slots[idx & mask] = None
+        self._tail = end
+        return records
+
+
+class CaptureBuffer:
+    def __init__(
+        self,
+        on_event: EventCallback,
+        *,
+        capacity: int = 65536,
+        batch_size: int = 1024,
+        poll_interval: float = 0.002,
+    ) -> None:
+        self._on_event = on_event
+        self._capacity = capacity
+        self._batch_size = max(1, batch_size)
+        self._poll_interval = max(0.0005, poll_interval)
+        self._rings: list[CaptureRing] = []
+        self._thread: threading.Thread | None = None
+        self._stop = threading.Event()
+        self._session = EventSession()
+        self._delivered = 0
+        self._failed = 0
+        self._max_lag_ns = 0
+        self._logger = get_logger("autotool.capture")
+
+    def ring(self, name: str, decode: Decoder) -> CaptureRing:
+        ring = CaptureRing(name, decode, self._capacity)
+        self._rings.append(ring)
+        return ring
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="autotool-capture", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 2.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            if self._thread.is_alive():
+                self._logger.warning("Capture consumer did not stop within %.1fs", timeout)
+                return
+            self._thread = None
+        self.drain()
+
+    def drain(self) -> int:
+        total = 0
+        while True:
+            batches = [(ring, ring.drain(self._batch_size)) for ring in self._rings]
+            batches = [(ring, records) for ring, records in batches if records]
+            if not batches:
+                return total
+            if len(batches) == 1:
+                ring, records = batches[0]
+                decode = ring.decode
+                for record in records:
+                    self._deliver(record, decode)
+                total += len(records)
+                continue
+            tagged = [[(record, ring.decode) for record in records] for ring, records in batches]
+            for record, decode in merge(*tagged, key=_record_ns):
+                self._deliver(record, decode)
+                total += 1
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "delivered": self._delivered,
+            "failed": self._failed,
+            "dropped": sum(ring.dropped for ring in self._rings),
+            "pending": sum(len(ring) for ring in self._rings),
+            "max_lag_ms": self._max_lag_ns / 1_000_000,
+            "rings": {
+                ring.name: {"capacity": ring.capacity, "dropped": ring.dropped, "high_water": ring.high_water}
+                for ring in self._rings
+            },
+        }
+
+    @property
+    def session(self) -> EventSession:
+        return self._session
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            if not self.drain():
+                self._stop.wait(self._poll_interval)
+
+    def _deliver(self, record: CaptureRecord, decode: Decoder) -> None:
+        try:
+            decoded = decode(record)
+            if decoded is None:
+                return
+            event_type, action, payload = decoded
+            event = Event.create(event_type, action, payload, ns=record[0], session=self._session)
+            self._on_event(event)
+        except Exception as exc:
+            self._failed += 1
+            self._logger.error("Capture consumer failed: %s", exc)
+            return
+        self._delivered += 1
+        lag = time.perf_counter_ns() - record[0]
+        if lag > self._max_lag_ns:
+            self._max_lag_ns = lag
+
+
+def _record_ns(entry: tuple[CaptureRecord, Decoder]) -> int:
+    return entry[0][0]
@@ -1,34 +1,198 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Any, Mapping
+from itertools import count
+from typing import Any, Iterator, Mapping
 from uuid import uuid4
 import time
 
 
-@dataclass(frozen=True)
+_UNSET: Any = object()
+
+
+class EventSession:
+    __slots__ = ("prefix", "epoch_wall", "epoch_ns", "_counter")
+
+    def __init__(self, prefix: str | None = None) -> None:
+        self.prefix = prefix or uuid4().hex[:8]
+        self.epoch_wall = time.time()
+        self.epoch_ns = time.perf_counter_ns()
+        self._counter = count(1)
+
+    def next_seq(self) -> int:
+        return next(self._counter)
+
+    def to_wall(self, ns: int) -> float:
+        return self.epoch_wall + (ns - self.epoch_ns) / 1_000_000_000
+
+    def elapsed(self, ns: int) -> float:
+        return (ns - self.epoch_ns) / 1_000_000_000
+
+
+_DEFAULT_SESSION = EventSession()
+
+
+def default_session() -> EventSession:
+    return _DEFAULT_SESSION
+
+
+class SlotPayload(Mapping[str, Any]):
+    __slots__ = ()
+    fields: tuple[str, ...] = ()
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self.fields:
+            value = getattr(self, key)
+            if value is not _UNSET:
+                return value
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        for name in self.fields:
+            if getattr(self, name) is not _UNSET:
+                yield name
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+    def to_dict(self) -> dict[str, Any]:
+        return {name: value for name in self.fields if (value := getattr(self, name)) is not _UNSET}
+
+
+class PointerPayload(SlotPayload):
+    __slots__ = ("x", "y")
+    fields = ("x", "y")
+
+    def __init__(self, x: int, y: int) -> None:
+        self.x = x
+        self.y = y
+
+
+class ClickPayload(SlotPayload):
+    __slots__ = ("x", "y", "button", "pressed")
+    fields = ("x", "y", "button", "pressed")
+
+    def __init__(self, x: int, y: int, button: str, pressed: bool) -> None:
+        self.x = x
+        self.y = y
+        self.button = button
+        self.pressed = pressed
+
+
+class ScrollPayload(SlotPayload):
+    __slots__ = ("x", "y", "dx", "dy")
+    fields = ("x", "y", "dx", "dy")
+
+    def __init__(self, x: int, y: int, dx: int, dy: int) -> None:
+        self.x = x
+        self.y = y
+        self.dx = dx
+        self.dy = dy
+
+
+class KeyPayload(SlotPayload):
+    __slots__ = ("key", "char", "vk")
+    fields = ("key", "char", "vk")
+
+    def __init__(self, key: str, char: Any = _UNSET, vk: Any = _UNSET) -> None:
+        self.key = key
+        self.char = char
+        self.vk = vk
+
+
 class Event:
-    id: str
-    ts: float
-    type: str
-    action: str
-    payload: dict[str, Any]
+    __slots__ = ("type", "action", "payload", "seq", "ns", "session", "_id", "_ts")
+
+    def __init__(
+        self,
+        id: str | None = None,
+        ts: float | None = None,
+        type: str = "",
+        action: str = "",
+        payload: Mapping[str, Any] | None = None,
+        *,
+        seq: int = 0,
+        ns: int | None = None,
+        session: EventSession | None = None,
+    ) -> None:
+        self.type = type
+        self.action = action
+        self.payload = payload if payload is not None else {}
+        self.seq = seq
+        self.ns = ns
+        self.session = session
+        self._id = id
+        self._ts = ts
 
     @classmethod
-    def create(cls, event_type: str, action: str, payload: Mapping[str, Any]) -> "Event":
+    def create(
+        cls,
+        event_type: str,
+        action: str,
+        payload: Mapping[str, Any],
+        *,
+        ns: int | None = None,
+        session: EventSession | None = None,
+    ) -> "Event":
+        owner = session or _DEFAULT_SESSION
         return cls(
-            id=str(uuid4()),
-            ts=time.time(),
             type=event_type,
             action=action,
-            payload=dict(payload),
+            payload=payload,
+            seq=owner.next_seq(),
+            ns=ns if ns is not None else time.perf_counter_ns(),
+            session=owner,
+        )
+
+    @property
+    def id(self) -> str:
+        value = self._id
+        if value is None:
+            owner = self.session or _DEFAULT_SESSION
+            value = f"{owner.prefix}-{self.seq}"
+            self._id = value
+        return value
+
+    @property
+    def ts(self) -> float:
+        value = self._ts
+        if value is None:
+            owner = self.session or _DEFAULT_SESSION
+            value = owner.to_wall(self.ns) if self.ns is not None else time.time()
+            self._ts = value
+        return value
+
+    @property
+    def elapsed(self) -> float | None:
+        if self.ns is None or self.session is None:
+            return None
+        return self.session.elapsed(self.ns)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Event):
+            return NotImplemented
+        return (self.id, self.ts, self.type, self.action, dict(self.payload)) == (
+            other.id,
+            other.ts,
+            other.type,
+            other.action,
+            dict(other.payload),
         )
 
+    def __hash__(self) -> int:
+        return hash((self.id, self.type, self.action))
+
+    def __repr__(self) -> str:
+        return f"Event(id={self.id!r}, ts={self.ts!r}, type={self.type!r}, action={self.action!r}, payload={dict(self.payload)!r})"
+
     def to_dict(self) -> dict[str, Any]:
+        payload = self.payload
         return {
             "id": self.id,
             "ts": self.ts,
             "type": self.type,
             "action": self.action,
-            "payload": dict(self.payload),
+            "payload": payload.to_dict() if isinstance(payload, SlotPayload) else dict(payload),
         }
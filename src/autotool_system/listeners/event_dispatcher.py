@@ -1,17 +1,146 @@
 from __future__ import annotations
 
-from typing import Callable
+from typing import Any, Callable
+import queue
+import threading
+import time
 
+from ..utils.logger import get_logger
 from .event import Event
 
 EventFilter = Callable[[Event], bool]
 EventHandler = Callable[[Event], None]
 
+DISPATCH_POLICIES = {"drop", "block"}
+
+_STOP: Any = object()
+
+
+class Subscription:
+    def __init__(
+        self,
+        handler: EventHandler,
+        *,
+        name: str,
+        topic: tuple[str | None, str | None],
+        queue_size: int,
+        policy: str,
+        block_timeout: float,
+        filter_fn: EventFilter | None,
+    ) -> None:
+        if policy not in DISPATCH_POLICIES:
+            raise ValueError(f"Unsupported dispatch policy: {policy}")
+        self.name = name
+        self.topic = topic
+        self.policy = policy
+        self._handler = handler
+        self._filter = filter_fn
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max(1, queue_size))
+        self._block_timeout = block_timeout
+        self._thread = threading.Thread(target=self._run, name=f"autotool-dispatch-{name}", daemon=True)
+        self._active = True
+        self._logger = get_logger("autotool.dispatcher")
+        self.delivered = 0
+        self.dropped = 0
+        self.failed = 0
+        self.high_water = 0
+        self._handler_ns = 0
+        self._max_handler_ns = 0
+        self._max_lag_ns = 0
+        self._thread.start()
+
+    @property
+    def backlog(self) -> int:
+        return self._queue.qsize()
+
+    @property
+    def active(self) -> bool:
+        return self._active
+
+    def offer(self, event: Event) -> bool:
+        if not self._active:
+            return False
+        if self._filter is not None and not self._filter(event):
+            return False
+        item = (time.perf_counter_ns(), event)
+        try:
+            if self.policy == "block":
+                self._queue.put(item, timeout=self._block_timeout)
+            else:
+                self._queue.put_nowait(item)
+        except queue.Full:
+            self.dropped += 1
+            return False
+        depth = self._queue.qsize()
+        if depth > self.high_water:
+            self.high_water = depth
+        return True
+
+    def close(self, timeout: float = 2.0) -> None:
+        if not self._active:
+            return
+        self._active = False
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            self._logger.warning("Subscriber %s backlog full on close", self.name)
+            return
+        self._thread.join(timeout)
+
+    def join(self) -> None:
+        self._queue.join()
+
+    def stats(self) -> dict[str, Any]:
+        delivered = self.delivered
+        return {
+            "name": self.name,
+            "type": self.topic[0],
+            "action": self.topic[1],
+            "policy": self.policy,
+            "delivered": delivered,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "backlog": self.backlog,
+            "capacity": self._queue.maxsize,
+            "high_water": self.high_water,
+            "avg_handler_ms": self._handler_ns / delivered / 1_000_000 if delivered else 0.0,
+            "max_handler_ms": self._max_handler_ns / 1_000_000,
+            "max_lag_ms": self._max_lag_ns / 1_000_000,
+        }
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            try:
+                if item is _STOP:
+                    return
+                queued_ns, event = item
+                started = time.perf_counter_ns()
+                try:
+                    self._handler(event)
+                except Exception as exc:
+                    self.failed += 1
+                    self._logger.error("Subscriber %s failed: %s", self.name, exc)
+                finished = time.perf_counter_ns()
+                self.delivered += 1
+                elapsed = finished - started
+                self._handler_ns += elapsed
+                if elapsed > self._max_handler_ns:
+                    self._max_handler_ns = elapsed
+                lag = started - queued_ns
+                if lag > self._max_lag_ns:
+                    self._max_lag_ns = lag
+            finally:
+                self._queue.task_done()
+
 
 class EventDispatcher:
     def __init__(self) -> None:
         self._filters: list[EventFilter] = []
         self._handlers: list[EventHandler] = []
+        self._topics: dict[tuple[str | None, str | None], tuple[Subscription, ...]] = {}
+        self._lock = threading.Lock()
+        self._counter = 0
 
     def add_filter(self, filter_fn: EventFilter) -> None:
         self._filters.append(filter_fn)
@@ -19,9 +148,74 @@ class EventDispatcher:
     def add_handler(self, handler_fn: EventHandler) -> None:
         self._handlers.append(handler_fn)
 
+    def subscribe(
+        self,
+        handler: EventHandler,
+        *,
+        event_type: str | None = None,
+        action: str | None = None,
+        queue_size: int = 1024,
+        policy: str = "drop",
+        block_timeout: float = 0.05,
+        filter_fn: EventFilter | None = None,
+        name: str | None = None,
+    ) -> Subscription:
+        with self._lock:
+            self._counter += 1
+            topic = (event_type, action)
+            subscription = Subscription(
+                handler,
+                name=name or f"{getattr(handler, '__name__', 'handler')}-{self._counter}",
+                topic=topic,
+                queue_size=queue_size,
+                policy=policy,
+                block_timeout=block_timeout,
+                filter_fn=filter_fn,
+            )
+            self._topics[topic] = self._topics.get(topic, ()) + (subscription,)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription, timeout: float = 2.0) -> bool:
+        with self._lock:
+            current = self._topics.get(subscription.topic, ())
+            if subscription not in current:
+                return False
+            remaining = tuple(item for item in current if item is not subscription)
+            if remaining:
+                self._topics[subscription.topic] = remaining
+            else:
+                del self._topics[subscription.topic]
+        subscription.close(timeout)
+        return True
+
+    def subscriptions(self) -> list[Subscription]:
+        return [subscription for group in self._topics.values() for subscription in group]
+
     def dispatch(self, event: Event) -> None:
         for filter_fn in self._filters:
             if not filter_fn(event):
                 return
         for handler_fn in self._handlers:
             handler_fn(event)
+        topics = self._topics
+        if not topics:
+            return
+        for key in ((event.type, event.action), (event.type, None), (None, event.action), (None, None)):
+            group = topics.get(key)
+            if group:
+                for subscription in group:
+                    subscription.offer(event)
+
+    def join(self) -> None:
+        for subscription in self.subscriptions():
+            subscription.join()
+
+    def close(self, timeout: float = 2.0) -> None:
+        with self._lock:
+            subscriptions = self.subscriptions()
+            self._topics = {}
+        for subscription in subscriptions:
+            subscription.close(timeout)
+
+    def stats(self) -> list[dict[str, Any]]:
+        return [subscription.stats() for subscription in self.subscriptions()]
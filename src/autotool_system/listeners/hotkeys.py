@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+from collections import Counter
+from typing import Callable
+import queue
+import threading
+
+from ..utils.logger import get_logger
+
+
+HotkeyCallback = Callable[[], None]
+
+_ALIASES = {
+    "control": "ctrl",
+    "command": "cmd",
+    "win": "cmd",
+    "super": "cmd",
+    "meta": "cmd",
+    "escape": "esc",
+    "return": "enter",
+    "del": "delete",
+    "pageup": "page_up",
+    "pagedown": "page_down",
+}
+
+_VARIANTS = {
+    "ctrl_l": "ctrl",
+    "ctrl_r": "ctrl",
+    "alt_l": "alt",
+    "alt_r": "alt",
+    "alt_gr": "alt",
+    "shift_l": "shift",
+    "shift_r": "shift",
+    "cmd_l": "cmd",
+    "cmd_r": "cmd",
+}
+
+
+def combo_tokens(combo: str) -> list[str]:
+    parts = [item.strip().lower().strip("<>") for item in combo.split("+") if item.strip()]
+    tokens: list[str] = []
+    for part in parts:
+        token = _ALIASES.get(part, part)
+        token = _VARIANTS.get(token, token)
+        if token in tokens:
+            raise ValueError(f"Duplicate key in hotkey combo: {combo}")
+        tokens.append(token)
+    if not tokens:
+        raise ValueError(f"Invalid hotkey combo: {combo}")
+    return tokens
+
+
+def format_combo(tokens: list[str]) -> str:
+    return "+".join(token if len(token) == 1 and token.isalnum() else f"<{token}>" for token in tokens)
+
+
+def key_token(key: object) -> str:
+    return _key_parts(key)[1]
+
+
+def _key_parts(key: object) -> tuple[str, str]:
+    if isinstance(key, str):
+        if len(key) == 1 and ord(key) < 32:
+            key = chr(ord(key) + 96)
+        name = key.lower().strip("<>") if len(key) > 1 else key.lower()
+        name = _ALIASES.get(name, name)
+        return name, _VARIANTS.get(name, name)
+    name = getattr(key, "name", None)
+    if isinstance(name, str):
+        return name, _VARIANTS.get(name, name)
+    token = _char_token(key)
+    return token, token
+
+
+def _char_token(key: object) -> str:
+    char = getattr(key, "char", None)
+    if isinstance(char, str) and char:
+        if len(char) == 1 and ord(char) < 32:
+            return chr(ord(char) + 96)
+        return char.lower()
+    vk = getattr(key, "vk", None)
+    if isinstance(vk, int):
+        if 48 <= vk <= 57 or 65 <= vk <= 90:
+            return chr(vk).lower()
+        return f"vk{vk}"
+    return str(key).lower()
+
+
+class KeyState:
+    def __init__(self) -> None:
+        self._held: Counter[str] = Counter()
+        self._raw: set[str] = set()
+
+    def press(self, ident: str, token: str) -> bool:
+        if ident in self._raw:
+            return False
+        self._raw.add(ident)
+        self._held[token] += 1
+        return self._held[token] == 1
+
+    def release(self, ident: str, token: str) -> None:
+        if ident not in self._raw:
+            return
+        self._raw.discard(ident)
+        self._held[token] -= 1
+        if self._held[token] <= 0:
+            del self._held[token]
+
+    def held(self) -> frozenset[str]:
+        return frozenset(self._held)
+
+    def clear(self) -> None:
+        self._held.clear()
+        self._raw.clear()
+
+
+class HotkeyIndex:
+    def __init__(self, dispatch: Callable[[HotkeyCallback], None] | None = None) -> None:
+        self._combos: dict[frozenset[str], dict[str, HotkeyCallback]] = {}
+        self._names: dict[str, frozenset[str]] = {}
+        self._state = KeyState()
+        self._dispatch = dispatch
+        self._queue: "queue.Queue[HotkeyCallback | None]" = queue.Queue()
+        self._worker: threading.Thread | None = None
+        self._lock = threading.Lock()
+        self.fired = 0
+        self._logger = get_logger("autotool.hotkeys")
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __contains__(self, combo: str) -> bool:
+        return format_combo(combo_tokens(combo)) in self._names
+
+    def register(self, combo: str, callback: HotkeyCallback) -> str:
+        tokens = combo_tokens(combo)
+        name = format_combo(tokens)
+        with self._lock:
+            if name in self._names:
+                raise ValueError(f"Hotkey already registered: {combo}")
+            chord = frozenset(tokens)
+            self._names[name] = chord
+            self._combos.setdefault(chord, {})[name] = callback
+        return name
+
+    def unregister(self, combo: str) -> bool:
+        name = format_combo(combo_tokens(combo))
+        with self._lock:
+            chord = self._names.pop(name, None)
+            if chord is None:
+                return False
+            entries = self._combos[chord]
+            entries.pop(name, None)
+            if not entries:
+                del self._combos[chord]
+        return True
+
+    def press(self, key: object) -> int:
+        ident, token = _key_parts(key)
+        if not self._state.press(ident, token):
+            return 0
+        entries = self._combos.get(self._state.held())
+        if not entries:
+            return 0
+        for callback in list(entries.values()):
+            self._submit(callback)
+        return len(entries)
+
+    def release(self, key: object) -> None:
+        self._state.release(*_key_parts(key))
+
+    def reset(self) -> None:
+        self._state.clear()
+
+    def flush(self) -> None:
+        if self._worker is not None:
+            self._queue.join()
+
+    def close(self) -> None:
+        worker = self._worker
+        if worker is not None:
+            self._queue.put(None)
+            worker.join(1.0)
+            self._worker = None
+
+    def _submit(self, callback: HotkeyCallback) -> None:
+        self.fired += 1
+        if self._dispatch is not None:
+            self._dispatch(callback)
+            return
+        if self._worker is None:
+            self._worker = threading.Thread(target=self._run, name="autotool-hotkeys", daemon=True)
+            self._worker.start()
+        self._queue.put(callback)
+
+    def _run(self) -> None:
+        while True:
+            callback = self._queue.get()
+            try:
+                if callback is None:
+                    return
+                callback()
+            except Exception as exc:
+                self._logger.error("Hotkey callback failed: %s", exc)
+            finally:
+                self._queue.task_done()
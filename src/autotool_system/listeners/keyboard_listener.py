@@ -1,8 +1,10 @@
 from __future__ import annotations
 
-from typing import Callable
+from typing import Any, Callable, Mapping
 
-from .event import Event
+from .capture_buffer import CaptureBuffer, CaptureRecord
+from .event import Event, KeyPayload
+from .hotkeys import HotkeyIndex
 
 try:
     from pynput import keyboard as pynput_keyboard
@@ -13,83 +15,56 @@ else:
     _IMPORT_ERROR = None
 
 
-_ALIASES = {
-    "ctrl": "ctrl",
-    "control": "ctrl",
-    "alt": "alt",
-    "shift": "shift",
-    "cmd": "cmd",
-    "command": "cmd",
-    "win": "cmd",
-    "super": "cmd",
-    "meta": "cmd",
-    "esc": "esc",
-    "escape": "esc",
-    "enter": "enter",
-    "return": "enter",
-    "tab": "tab",
-    "space": "space",
-    "backspace": "backspace",
-    "delete": "delete",
-    "del": "delete",
-    "insert": "insert",
-    "home": "home",
-    "end": "end",
-    "pageup": "page_up",
-    "pagedown": "page_down",
-    "up": "up",
-    "down": "down",
-    "left": "left",
-    "right": "right",
-}
-
-
-def _normalize_combo(combo: str) -> str:
-    parts = [item.strip().lower() for item in combo.split("+") if item.strip()]
-    normalized: list[str] = []
-    for part in parts:
-        token = _ALIASES.get(part, part)
-        if len(token) == 1 and token.isalnum():
-            normalized.append(token)
-        elif token.startswith("f") and token[1:].isdigit():
-            normalized.append(f"<{token}>")
-        else:
-            normalized.append(f"<{token}>")
-    return "+".join(normalized)
-
-
-def _key_payload(key: object) -> dict:
+def _key_payload(key: object) -> KeyPayload:
     if pynput_keyboard is None:
-        return {"key": "unknown"}
+        return KeyPayload("unknown")
 
     if isinstance(key, pynput_keyboard.KeyCode):
         key_name = key.char if key.char else str(key.vk)
-        return {"key": key_name, "char": key.char, "vk": key.vk}
+        return KeyPayload(key_name, key.char, key.vk)
 
     if isinstance(key, pynput_keyboard.Key):
-        return {"key": key.name}
+        return KeyPayload(key.name)
+
+    return KeyPayload(str(key))
+
+
+_PRESS = 1
+_RELEASE = 2
+
 
-    return {"key": str(key)}
+def decode_keyboard_record(record: CaptureRecord) -> tuple[str, str, Mapping[str, Any]] | None:
+    code = record[1]
+    if code == _PRESS:
+        return "keyboard", "press", _key_payload(record[4])
+    if code == _RELEASE:
+        return "keyboard", "release", _key_payload(record[4])
+    return None
 
 
 class KeyboardListener:
-    def __init__(self, on_event: Callable[[Event], None] | None = None) -> None:
+    def __init__(
+        self,
+        on_event: Callable[[Event], None] | None = None,
+        *,
+        buffer: CaptureBuffer | None = None,
+        hotkeys: HotkeyIndex | None = None,
+    ) -> None:
         self._on_event = on_event
+        self._ring = buffer.ring("keyboard", decode_keyboard_record) if buffer is not None else None
         self._listener: "pynput_keyboard.Listener | None" = None
         self._running = False
-        self._hotkeys: dict[str, "pynput_keyboard.HotKey"] = {}
+        self._hotkeys = hotkeys if hotkeys is not None else HotkeyIndex()
 
     def register_hotkey(self, combo: str, callback: Callable[[], None]) -> str:
-        self._ensure_backend()
-        normalized = _normalize_combo(combo)
-        if normalized in self._hotkeys:
-            raise ValueError(f"Hotkey already registered: {combo}")
-        try:
-            parsed = pynput_keyboard.HotKey.parse(normalized)
-        except Exception as exc:
-            raise ValueError(f"Invalid hotkey combo: {combo}") from exc
-        self._hotkeys[normalized] = pynput_keyboard.HotKey(parsed, callback)
-        return normalized
+        return self._hotkeys.register(combo, callback)
+
+    def unregister_hotkey(self, combo: str) -> bool:
+        return self._hotkeys.unregister(combo)
+
+    @property
+    def hotkeys(self) -> HotkeyIndex:
+        return self._hotkeys
 
     def start(self) -> None:
         self._ensure_backend()
@@ -106,6 +81,8 @@ class KeyboardListener:
         if self._listener is not None:
             self._listener.stop()
             self._listener = None
+        self._hotkeys.reset()
+        self._hotkeys.close()
         self._running = False
 
     @property
@@ -121,13 +98,19 @@ class KeyboardListener:
             self._on_event(event)
 
     def _on_press(self, key: object) -> None:
-        event = Event.create("keyboard", "press", _key_payload(key))
-        self._emit(event)
-        for hotkey in self._hotkeys.values():
-            hotkey.press(key)
+        ring = self._ring
+        if ring is not None:
+            ring.push(_PRESS, 0, 0, key)
+        else:
+            self._emit(Event.create("keyboard", "press", _key_payload(key)))
+        if self._hotkeys:
+            self._hotkeys.press(key)
 
     def _on_release(self, key: object) -> None:
-        event = Event.create("keyboard", "release", _key_payload(key))
-        self._emit(event)
-        for hotkey in self._hotkeys.values():
-            hotkey.release(key)
+        ring = self._ring
+        if ring is not None:
+            ring.push(_RELEASE, 0, 0, key)
+        else:
+            self._emit(Event.create("keyboard", "release", _key_payload(key)))
+        if self._hotkeys:
+            self._hotkeys.release(key)
@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Mapping
+import math
+import threading
+import time
+
+
+@dataclass(frozen=True)
+class MotionSamplerOptions:
+    min_distance: float = 0.0
+    min_interval: float = 0.0
+    angle_threshold: float = 30.0
+    max_rate: float = 0.0
+
+    def __post_init__(self) -> None:
+        if self.min_distance < 0 or self.min_interval < 0 or self.max_rate < 0:
+            raise ValueError("min_distance, min_interval and max_rate must be >= 0")
+        if not (0 < self.angle_threshold <= 180):
+            raise ValueError("angle_threshold must be in (0, 180] degrees")
+
+    @classmethod
+    def from_obj(cls, value: "MotionSamplerOptions | Mapping[str, Any] | None") -> "MotionSamplerOptions | None":
+        if value is None or isinstance(value, MotionSamplerOptions):
+            return value
+        if not isinstance(value, Mapping):
+            raise ValueError("Motion sampler options must be a mapping")
+        return cls(
+            min_distance=float(value.get("min_distance", 0.0)),
+            min_interval=float(value.get("min_interval", 0.0)),
+            angle_threshold=float(value.get("angle_threshold", 30.0)),
+            max_rate=float(value.get("max_rate", 0.0)),
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "min_distance": self.min_distance,
+            "min_interval": self.min_interval,
+            "angle_threshold": self.angle_threshold,
+            "max_rate": self.max_rate,
+        }
+
+
+class MotionSampler:
+    def __init__(self, options: MotionSamplerOptions | None = None) -> None:
+        self._options = options or MotionSamplerOptions()
+        self._min_distance_sq = self._options.min_distance**2
+        self._min_interval_ns = int(self._options.min_interval * 1_000_000_000)
+        self._turn_cos = math.cos(math.radians(self._options.angle_threshold))
+        self._turn_min_sq = max(4.0, (self._options.min_distance / 2) ** 2)
+        self._rate = self._options.max_rate
+        self._capacity = max(1.0, self._rate * 0.1)
+        self._tokens = self._capacity
+        self._refill_ns: int | None = None
+        self._last: tuple[int, int, int] | None = None
+        self._heading: tuple[float, float] | None = None
+        self._pending: tuple[int, int] | None = None
+        self._lock = threading.Lock()
+        self.seen = 0
+        self.retained = 0
+        self.turns = 0
+        self.dropped_threshold = 0
+        self.dropped_budget = 0
+        self.flushed = 0
+
+    @property
+    def options(self) -> MotionSamplerOptions:
+        return self._options
+
+    def accept(self, x: int, y: int, ns: int | None = None) -> bool:
+        now = ns if ns is not None else time.perf_counter_ns()
+        with self._lock:
+            self.seen += 1
+            last = self._last
+            if last is None:
+                self.retained += 1
+                self._keep(x, y, now, None)
+                return True
+            dx = x - last[0]
+            dy = y - last[1]
+            if dx == 0 and dy == 0:
+                self.dropped_threshold += 1
+                return False
+            dist_sq = dx * dx + dy * dy
+            turned = self._is_turn(dx, dy, dist_sq)
+            if not turned and (dist_sq < self._min_distance_sq or now - last[2] < self._min_interval_ns):
+                self._pending = (x, y)
+                self.dropped_threshold += 1
+                return False
+            if self._rate > 0 and not self._take_token(now):
+                self._pending = (x, y)
+                self.dropped_budget += 1
+                return False
+            if turned:
+                self.turns += 1
+            self.retained += 1
+            self._keep(x, y, now, (dx, dy))
+            return True
+
+    def flush(self, ns: int | None = None) -> tuple[int, int] | None:
+        with self._lock:
+            pending = self._pending
+            if pending is None:
+                return None
+            self._keep(pending[0], pending[1], ns if ns is not None else time.perf_counter_ns(), None)
+            self.flushed += 1
+            return pending
+
+    def anchor(self, x: int, y: int, ns: int | None = None) -> None:
+        with self._lock:
+            self._pending = None
+            self._last = (x, y, ns if ns is not None else time.perf_counter_ns())
+            self._heading = None
+
+    def report(self) -> dict[str, Any]:
+        dropped = self.dropped_threshold + self.dropped_budget
+        return {
+            "seen": self.seen,
+            "retained": self.retained,
+            "dropped": dropped,
+            "dropped_threshold": self.dropped_threshold,
+            "dropped_budget": self.dropped_budget,
+            "turns": self.turns,
+            "flushed": self.flushed,
+            "retained_ratio": self.retained / self.seen if self.seen else 1.0,
+            "options": self._options.to_dict(),
+        }
+
+    def _keep(self, x: int, y: int, ns: int, heading: tuple[float, float] | None) -> None:
+        self._last = (x, y, ns)
+        self._heading = heading
+        self._pending = None
+
+    def _is_turn(self, dx: int, dy: int, dist_sq: int) -> bool:
+        heading = self._heading
+        if heading is None or dist_sq < self._turn_min_sq:
+            return False
+        norm = math.sqrt(dist_sq * (heading[0] * heading[0] + heading[1] * heading[1]))
+        return (dx * heading[0] + dy * heading[1]) < self._turn_cos * norm
+
+    def _take_token(self, now: int) -> bool:
+        if self._refill_ns is not None:
+            self._tokens = min(self._capacity, self._tokens + (now - self._refill_ns) / 1_000_000_000 * self._rate)
+        self._refill_ns = now
+        if self._tokens < 1.0:
+            return False
+        self._tokens -= 1.0
+        return True
@@ -1,8 +1,10 @@
 from __future__ import annotations
 
-from typing import Callable
+from typing import Any, Callable, Mapping
 
-from .event import Event
+from .capture_buffer import CaptureBuffer, CaptureRecord
+from .event import ClickPayload, Event, PointerPayload, ScrollPayload
+from .motion_sampler import MotionSampler
 
 try:
     from pynput import mouse as pynput_mouse
@@ -19,9 +21,34 @@ def _button_name(button: object) -> str:
     return getattr(button, "name", str(button))
 
 
+_MOVE = 1
+_PRESS = 2
+_RELEASE = 3
+_SCROLL = 4
+
+
+def decode_mouse_record(record: CaptureRecord) -> tuple[str, str, Mapping[str, Any]] | None:
+    _, code, x, y, extra = record
+    if code == _MOVE:
+        return "mouse", "move", PointerPayload(x, y)
+    if code == _PRESS or code == _RELEASE:
+        return "mouse", "click", ClickPayload(x, y, _button_name(extra), code == _PRESS)
+    if code == _SCROLL:
+        return "mouse", "scroll", ScrollPayload(x, y, extra[0], extra[1])
+    return None
+
+
 class MouseListener:
-    def __init__(self, on_event: Callable[[Event], None] | None = None) -> None:
+    def __init__(
+        self,
+        on_event: Callable[[Event], None] | None = None,
+        *,
+        buffer: CaptureBuffer | None = None,
+        sampler: MotionSampler | None = None,
+    ) -> None:
         self._on_event = on_event
+        self._sampler = sampler
+        self._ring = buffer.ring("mouse", decode_mouse_record) if buffer is not None else None
         self._listener: "pynput_mouse.Listener | None" = None
         self._running = False
 
@@ -55,16 +82,44 @@ class MouseListener:
         if self._on_event is not None:
             self._on_event(event)
 
+    @property
+    def sampler(self) -> MotionSampler | None:
+        return self._sampler
+
     def _on_move(self, x: int, y: int) -> None:
-        event = Event.create("mouse", "move", {"x": x, "y": y})
-        self._emit(event)
+        sampler = self._sampler
+        if sampler is not None and not sampler.accept(x, y):
+            return
+        ring = self._ring
+        if ring is not None:
+            ring.push(_MOVE, x, y)
+            return
+        self._emit(Event.create("mouse", "move", PointerPayload(x, y)))
+
+    def _flush_motion(self, x: int, y: int) -> None:
+        sampler = self._sampler
+        if sampler is None:
+            return
+        pending = sampler.flush()
+        if pending is not None:
+            if self._ring is not None:
+                self._ring.push(_MOVE, pending[0], pending[1])
+            else:
+                self._emit(Event.create("mouse", "move", PointerPayload(pending[0], pending[1])))
+        sampler.anchor(x, y)
 
     def _on_click(self, x: int, y: int, button: object, pressed: bool) -> None:
-        payload = {"x": x, "y": y, "button": _button_name(button), "pressed": pressed}
-        event = Event.create("mouse", "click", payload)
-        self._emit(event)
+        self._flush_motion(x, y)
+        ring = self._ring
+        if ring is not None:
+            ring.push(_PRESS if pressed else _RELEASE, x, y, button)
+            return
+        self._emit(Event.create("mouse", "click", ClickPayload(x, y, _button_name(button), pressed)))
 
     def _on_scroll(self, x: int, y: int, dx: int, dy: int) -> None:
-        payload = {"x": x, "y": y, "dx": dx, "dy": dy}
-        event = Event.create("mouse", "scroll", payload)
-        self._emit(event)
+        self._flush_motion(x, y)
+        ring = self._ring
+        if ring is not None:
+            ring.push(_SCROLL, x, y, (dx, dy))
+            return
+        self._emit(Event.create("mouse", "scroll", ScrollPayload(x, y, dx, dy)))
@@ -1,6 +1,7 @@
+from .audit import AuditSink
 from .config_manager import ConfigManager
 from .database import Database
 from .logger import configure_logging, get_logger
 from .scheduler import Scheduler
 
-__all__ = ["ConfigManager", "Database", "Scheduler", "configure_logging", "get_logger"]
+__all__ = ["AuditSink", "ConfigManager", "Database", "Scheduler", "configure_logging", "get_logger"]
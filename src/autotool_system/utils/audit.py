@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+from collections import deque
+from pathlib import Path
+from typing import Any, Mapping
+import json
+import threading
+import time
+
+from .logger import get_logger
+
+
+class AuditSink:
+    def __init__(
+        self,
+        path: str | Path,
+        *,
+        capacity: int = 65536,
+        batch_size: int = 512,
+        flush_interval: float = 0.5,
+        max_bytes: int = 10 * 1024 * 1024,
+        backup_count: int = 3,
+    ) -> None:
+        if capacity <= 0:
+            raise ValueError("Audit capacity must be greater than 0")
+        if batch_size <= 0:
+            raise ValueError("Audit batch size must be greater than 0")
+        self._path = Path(path)
+        self._capacity = capacity
+        self._batch_size = batch_size
+        self._flush_interval = max(0.01, float(flush_interval))
+        self._max_bytes = max_bytes
+        self._backup_count = max(0, backup_count)
+        self._queue: deque[tuple[float, str, Mapping[str, Any]]] = deque()
+        self._wake = threading.Event()
+        self._drain_lock = threading.Lock()
+        self._closing = False
+        self._thread: threading.Thread | None = None
+        self._handle: Any | None = None
+        self._size = 0
+        self._emitted = 0
+        self._dropped = 0
+        self._written = 0
+        self._batches = 0
+        self._rotations = 0
+        self._errors = 0
+        self._logger = get_logger("autotool.audit")
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.is_running:
+            return
+        self._closing = False
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name="autotool-audit", daemon=True)
+        self._thread.start()
+
+    def emit(self, event: str, **fields: Any) -> bool:
+        queue = self._queue
+        if len(queue) >= self._capacity:
+            self._dropped += 1
+            return False
+        queue.append((time.time(), event, fields))
+        self._emitted += 1
+        if len(queue) >= self._batch_size:
+            self._wake.set()
+        return True
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        if not self.is_running:
+            self._drain()
+            return not self._queue
+        deadline = time.monotonic() + timeout
+        self._wake.set()
+        while self._queue and time.monotonic() < deadline:
+            time.sleep(0.005)
+        if not self._drain_lock.acquire(timeout=max(0.0, deadline - time.monotonic())):
+            return False
+        self._drain_lock.release()
+        return not self._queue
+
+    def close(self, timeout: float = 5.0) -> None:
+        self._closing = True
+        self._wake.set()
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+        self._thread = None
+        self._drain()
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "path": str(self._path),
+            "running": self.is_running,
+            "capacity": self._capacity,
+            "backlog": len(self._queue),
+            "emitted": self._emitted,
+            "written": self._written,
+            "dropped": self._dropped,
+            "batches": self._batches,
+            "rotations": self._rotations,
+            "errors": self._errors,
+        }
+
+    def _run(self) -> None:
+        last_flush = time.monotonic()
+        while not self._closing:
+            self._wake.wait(self._flush_interval)
+            self._wake.clear()
+            now = time.monotonic()
+            if len(self._queue) >= self._batch_size or now - last_flush >= self._flush_interval:
+                self._drain()
+                last_flush = now
+
+    def _drain(self) -> None:
+        with self._drain_lock:
+            queue = self._queue
+            while queue:
+                lines: list[str] = []
+                while queue and len(lines) < self._batch_size:
+                    ts, event, fields = queue.popleft()
+                    lines.append(_encode(ts, event, fields))
+                try:
+                    self._write_batch("".join(lines))
+                except OSError as exc:
+                    self._errors += 1
+                    self._dropped += len(lines)
+                    self._logger.error("Audit write failed, dropped %s records: %s", len(lines), exc)
+                    return
+                self._written += len(lines)
+                self._batches += 1
+
+    def _write_batch(self, chunk: str) -> None:
+        data = chunk.encode("utf-8")
+        handle = self._open()
+        if self._max_bytes > 0 and self._size > 0 and self._size + len(data) > self._max_bytes:
+            self._rotate()
+            handle = self._open()
+        handle.write(data)
+        handle.flush()
+        self._size += len(data)
+
+    def _open(self) -> Any:
+        if self._handle is None:
+            self._handle = self._path.open("ab")
+            self._size = self._handle.tell()
+        return self._handle
+
+    def _rotate(self) -> None:
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+        if self._backup_count > 0:
+            for idx in range(self._backup_count - 1, 0, -1):
+                source = self._path.with_name(f"{self._path.name}.{idx}")
+                if source.exists():
+                    source.replace(self._path.with_name(f"{self._path.name}.{idx + 1}"))
+            self._path.replace(self._path.with_name(f"{self._path.name}.1"))
+        else:
+            self._path.unlink(missing_ok=True)
+        self._size = 0
+        self._rotations += 1
+
+
+def _encode(ts: float, event: str, fields: Mapping[str, Any]) -> str:
+    record = {"ts": round(ts, 6), "event": event}
+    record.update(fields)
+    return json.dumps(record, ensure_ascii=True, separators=(",", ":"), default=str) + "\n"
+
+
+def create_audit_sink(config: Mapping[str, Any] | None) -> AuditSink | None:
+    if not isinstance(config, Mapping) or not config.get("file"):
+        return None
+    sink = AuditSink(
+        str(config["file"]),
+        capacity=int(config.get("capacity", 65536)),
+        batch_size=int(config.get("batch_size", 512)),
+        flush_interval=float(config.get("flush_interval", 0.5)),
+        max_bytes=int(config.get("max_bytes", 10 * 1024 * 1024)),
+        backup_count=int(config.get("backup_count", 3)),
+    )
+    sink.start()
+    return sink
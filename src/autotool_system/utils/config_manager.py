@@ -6,6 +6,8 @@ from typing import Any, Mapping
 
 import yaml
 
+_INPUT_BACKENDS = ("legacy", "pyautogui")
+
 
 class ConfigError(RuntimeError):
     pass
@@ -56,6 +58,9 @@ class ConfigManager:
             if "pause_interval" in automation:
                 if not _is_number(automation.get("pause_interval")):
                     errors.append("automation.pause_interval must be a number")
+            if "input_backend" in automation and automation.get("input_backend") not in _INPUT_BACKENDS:
+                backends = ", ".join(_INPUT_BACKENDS)
+                errors.append(f"automation.input_backend must be one of: {backends}")
 
         hotkeys = config.get("hotkeys", {})
         if hotkeys and not isinstance(hotkeys, Mapping):
@@ -71,6 +76,10 @@ class ConfigManager:
         if isinstance(storage, Mapping):
             if "db_path" in storage and not isinstance(storage.get("db_path"), str):
                 errors.append("storage.db_path must be a string")
+            if "replay_cache_dir" in storage and not isinstance(storage.get("replay_cache_dir"), str):
+                errors.append("storage.replay_cache_dir must be a string")
+            if "recordings_dir" in storage and not isinstance(storage.get("recordings_dir"), str):
+                errors.append("storage.recordings_dir must be a string")
 
         logging_cfg = config.get("logging", {})
         if logging_cfg and not isinstance(logging_cfg, Mapping):
@@ -80,6 +89,17 @@ class ConfigManager:
                 errors.append("logging.level must be a string")
             if "file" in logging_cfg and not isinstance(logging_cfg.get("file"), str):
                 errors.append("logging.file must be a string")
+            audit = logging_cfg.get("audit")
+            if audit is not None and not isinstance(audit, Mapping):
+                errors.append("logging.audit must be a mapping")
+            if isinstance(audit, Mapping):
+                if "file" in audit and not isinstance(audit.get("file"), str):
+                    errors.append("logging.audit.file must be a string")
+                for key in ("capacity", "batch_size", "max_bytes", "backup_count"):
+                    if key in audit and not isinstance(audit.get(key), int):
+                        errors.append(f"logging.audit.{key} must be an integer")
+                if "flush_interval" in audit and not _is_number(audit.get("flush_interval")):
+                    errors.append("logging.audit.flush_interval must be a number")
 
         return errors
 
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Any, Iterable
+from typing import Any, Callable, Iterable
 import json
 import sqlite3
 
@@ -14,6 +14,10 @@ class Database:
     def __init__(self, path: str | None = None) -> None:
         self._path = Path(path) if path else None
         self._conn: sqlite3.Connection | None = None
+        self._workflow_listeners: list[Callable[[str], None]] = []
+
+    def on_workflow_change(self, callback: Callable[[str], None]) -> None:
+        self._workflow_listeners.append(callback)
 
     def connect(self, path: str | None = None) -> None:
         if path is not None:
@@ -21,7 +25,7 @@ class Database:
         if self._path is None:
             raise DatabaseError("Database path is required")
         self._path.parent.mkdir(parents=True, exist_ok=True)
-        self._conn = sqlite3.connect(self._path)
+        self._conn = sqlite3.connect(self._path, check_same_thread=False)
         self._conn.row_factory = sqlite3.Row
 
     def migrate(self) -> None:
@@ -51,6 +55,17 @@ class Database:
             )
             """
         )
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS workflow_plans (
+                workflow_id TEXT PRIMARY KEY,
+                digest TEXT NOT NULL,
+                data TEXT NOT NULL,
+                created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (workflow_id) REFERENCES workflows(id)
+            )
+            """
+        )
         conn.execute(
             """
             CREATE TABLE IF NOT EXISTS schema_migrations (
@@ -79,7 +94,9 @@ class Database:
             """,
             (workflow_id, name, payload),
         )
+        conn.execute("DELETE FROM workflow_plans WHERE workflow_id = ?", (workflow_id,))
         conn.commit()
+        self._notify_workflow(str(workflow_id))
 
     def get_workflow(self, workflow_id: str) -> dict[str, Any] | None:
         conn = self._ensure_conn()
@@ -96,6 +113,36 @@ class Database:
         payload["updated_at"] = row["updated_at"]
         return payload
 
+    def save_workflow_plan(self, workflow_id: str, digest: str, actions: list[dict[str, Any]]) -> None:
+        conn = self._ensure_conn()
+        payload = json.dumps(actions, ensure_ascii=True)
+        conn.execute(
+            """
+            INSERT INTO workflow_plans (workflow_id, digest, data)
+            VALUES (?, ?, ?)
+            ON CONFLICT(workflow_id) DO UPDATE SET
+                digest = excluded.digest,
+                data = excluded.data,
+                created_at = CURRENT_TIMESTAMP
+            """,
+            (workflow_id, digest, payload),
+        )
+        conn.commit()
+
+    def get_workflow_plan(self, workflow_id: str, digest: str) -> list[dict[str, Any]] | None:
+        conn = self._ensure_conn()
+        row = conn.execute(
+            "SELECT data FROM workflow_plans WHERE workflow_id = ? AND digest = ?",
+            (workflow_id, digest),
+        ).fetchone()
+        if row is None:
+            return None
+        try:
+            payload = json.loads(row["data"])
+        except json.JSONDecodeError:
+            return None
+        return payload if isinstance(payload, list) else None
+
     def list_workflows(self) -> list[dict[str, Any]]:
         conn = self._ensure_conn()
         rows = conn.execute(
@@ -190,8 +237,10 @@ class Database:
 
     def delete_workflow(self, workflow_id: str) -> bool:
         conn = self._ensure_conn()
+        conn.execute("DELETE FROM workflow_plans WHERE workflow_id = ?", (workflow_id,))
         cursor = conn.execute("DELETE FROM workflows WHERE id = ?", (workflow_id,))
         conn.commit()
+        self._notify_workflow(workflow_id)
         return cursor.rowcount > 0
 
     def close(self) -> None:
@@ -207,6 +256,10 @@ class Database:
         conn.backup(backup_conn)
         backup_conn.close()
 
+    def _notify_workflow(self, workflow_id: str) -> None:
+        for callback in self._workflow_listeners:
+            callback(workflow_id)
+
     def _ensure_conn(self) -> sqlite3.Connection:
         if self._conn is None:
             raise DatabaseError("Database is not connected")
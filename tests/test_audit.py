@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import json
+import time
+
+from autotool_system.automation import AutomationEngine
+from autotool_system.utils.audit import AuditSink
+
+
+class BackendStub:
+    FAILSAFE = True
+    PAUSE = 0
+
+    def __init__(self) -> None:
+        self.calls: list[tuple[str, object]] = []
+
+    def click(self, **kwargs: object) -> None:
+        self.calls.append(("click", kwargs))
+
+
+def test_audit_sink_writes_json_lines(tmp_path) -> None:
+    sink = AuditSink(tmp_path / "audit.jsonl", batch_size=2, flush_interval=0.01)
+    sink.start()
+    engine = AutomationEngine(backend=BackendStub(), pause=0, audit=sink)
+
+    engine.execute({"id": "a1", "type": "click", "params": {"x": 1, "y": 2}})
+    sink.close()
+
+    lines = (tmp_path / "audit.jsonl").read_text(encoding="utf-8").splitlines()
+    records = [json.loads(line) for line in lines]
+    assert [record["event"] for record in records] == ["action_start", "action_end"]
+    assert records[0]["id"] == "a1"
+    assert records[1]["success"] is True
+    assert sink.stats()["written"] == 2
+
+
+def test_audit_sink_counts_dropped_records(tmp_path) -> None:
+    sink = AuditSink(tmp_path / "audit.jsonl", capacity=3)
+
+    accepted = [sink.emit("tick", n=idx) for idx in range(5)]
+    sink.close()
+
+    assert accepted == [True, True, True, False, False]
+    stats = sink.stats()
+    assert stats["dropped"] == 2
+    assert stats["written"] == 3
+
+
+def test_audit_sink_rotates_by_size(tmp_path) -> None:
+    target = tmp_path / "audit.jsonl"
+    sink = AuditSink(target, batch_size=1, max_bytes=64, backup_count=2)
+
+    for idx in range(6):
+        sink.emit("tick", payload="x" * 20, n=idx)
+        sink.flush()
+    sink.close()
+
+    assert (tmp_path / "audit.jsonl.1").exists()
+    assert sink.stats()["rotations"] >= 1
+
+
+def test_audit_sink_counts_failed_batches_as_dropped(tmp_path) -> None:
+    sink = AuditSink(tmp_path / "audit.jsonl", batch_size=2)
+
+    def fail(chunk: str) -> None:
+        raise OSError("disk full")
+
+    sink._write_batch = fail  # type: ignore[method-assign]
+    for idx in range(3):
+        sink.emit("tick", n=idx)
+    sink.flush()
+    sink.flush()
+
+    stats = sink.stats()
+    assert stats["dropped"] == 3
+    assert stats["written"] == 0
+    assert stats["errors"] == 2
+
+
+def test_audit_sink_flush_waits_for_in_flight_batch(tmp_path) -> None:
+    target = tmp_path / "audit.jsonl"
+    sink = AuditSink(target, batch_size=1, flush_interval=0.01)
+    write_batch = sink._write_batch
+
+    def slow(chunk: str) -> None:
+        time.sleep(0.2)
+        write_batch(chunk)
+
+    sink._write_batch = slow  # type: ignore[method-assign]
+    sink.start()
+    sink.emit("tick", n=1)
+    time.sleep(0.05)
+
+    assert sink.flush() is True
+    assert len(target.read_text(encoding="utf-8").splitlines()) == 1
+    sink.close()
@@ -1,6 +1,6 @@
 from types import SimpleNamespace
 
-from autotool_system.automation import Action, AutomationEngine
+from autotool_system.automation import Action, AutomationEngine, Capability, PyAutoGUIBackend, RecordingBackend
 
 
 class BackendStub:
@@ -110,3 +110,117 @@ def test_execute_scroll_and_hscroll() -> None:
     assert result.success is True
     assert backend.calls[0][0] == "scroll"
     assert backend.calls[1][0] == "hscroll"
+
+
+def test_input_backend_coalesces_primitive_actions() -> None:
+    backend = RecordingBackend()
+    engine = AutomationEngine(input_backend=backend)
+
+    results = engine.execute_sequence(
+        [
+            {"type": "move", "params": {"x": 1, "y": 1}},
+            {"type": "mouse_down", "params": {"x": 1, "y": 1}},
+            {"type": "move", "params": {"x": 9, "y": 9}},
+            {"type": "mouse_up", "params": {"x": 9, "y": 9}},
+            {"type": "wait", "params": {"seconds": 0}},
+            {"type": "key_down", "params": {"key": "a"}},
+            {"type": "key_up", "params": {"key": "a"}},
+        ]
+    )
+
+    assert all(result.success for result in results)
+    assert len(results) == 7
+    assert [len(batch) for batch in backend.batches] == [4, 2]
+    assert backend.kinds()[:4] == ["move", "mouse_down", "move", "mouse_up"]
+
+
+def test_input_backend_without_batch_capability_sends_singly() -> None:
+    backend = RecordingBackend(Capability.POINTER | Capability.KEYBOARD)
+    engine = AutomationEngine(input_backend=backend)
+
+    results = engine.execute_sequence(
+        [
+            {"type": "click", "params": {"x": 3, "y": 4}},
+            {"type": "hotkey", "params": {"combo": "ctrl+c"}},
+        ]
+    )
+
+    assert [result.success for result in results] == [True, True]
+    assert [len(batch) for batch in backend.batches] == [1, 1]
+    assert backend.events[1].params["keys"] == ["ctrl", "c"]
+
+
+def test_pyautogui_backend_adapter_dispatches_calls() -> None:
+    module = BackendStub()
+    engine = AutomationEngine(input_backend=PyAutoGUIBackend(module))
+
+    engine.execute_sequence(
+        [
+            {"type": "move", "params": {"x": 5, "y": 6}},
+            {"type": "scroll", "params": {"dy": -1}},
+        ]
+    )
+
+    assert module.PAUSE == 0
+    assert [call[0] for call in module.calls] == ["moveTo", "scroll"]
+
+
+class FlakyBackend(RecordingBackend):
+    def __init__(self, failures: int) -> None:
+        super().__init__()
+        self.failures = failures
+
+    def send(self, events) -> None:
+        if self.failures > 0:
+            self.failures -= 1
+            raise OSError("injection failed")
+        super().send(events)
+
+
+def test_actions_with_retry_bypass_batching() -> None:
+    backend = FlakyBackend(failures=1)
+    engine = AutomationEngine(input_backend=backend)
+
+    results = engine.execute_sequence(
+        [
+            {"type": "click", "params": {"x": 1, "y": 1}, "retry": 2},
+            {"type": "move", "params": {"x": 2, "y": 2}},
+            {"type": "move", "params": {"x": 3, "y": 3}, "timeout": 1.0},
+        ]
+    )
+
+    assert [result.success for result in results] == [True, True, True]
+    assert [len(batch) for batch in backend.batches] == [1, 1, 1]
+
+
+def test_partial_batch_failure_keeps_sent_actions() -> None:
+    class FailingHotkey(BackendStub):
+        def hotkey(self, *keys: str) -> None:
+            raise OSError("hotkey failed")
+
+    module = FailingHotkey()
+    engine = AutomationEngine(input_backend=PyAutoGUIBackend(module))
+
+    results = engine.execute_sequence(
+        [
+            {"type": "move", "params": {"x": 1, "y": 1}},
+            {"type": "click", "params": {"x": 1, "y": 1}},
+            {"type": "hotkey", "params": {"combo": "ctrl+v"}},
+            {"type": "move", "params": {"x": 2, "y": 2}},
+        ]
+    )
+
+    assert [result.success for result in results] == [True, True, False, False]
+    assert results[2].message == "hotkey failed"
+    assert results[3].message == "Not sent: batch aborted"
+    assert [call[0] for call in module.calls] == ["moveTo", "click"]
+
+
+def test_pyautogui_backend_module_serves_non_input_actions() -> None:
+    module = BackendStub()
+    engine = AutomationEngine(input_backend=PyAutoGUIBackend(module), pause=0.5)
+
+    result = engine.execute({"type": "screenshot", "params": {}})
+
+    assert result.success is True
+    assert module.PAUSE == 0
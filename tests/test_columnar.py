@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import struct
+
+import pytest
+
+from autotool_system.core.columnar import ColumnarError, ColumnarRecording
+from autotool_system.core.recorder import Recorder
+from autotool_system.core.replay_source import ReplaySource
+from autotool_system.listeners.event import Event
+
+
+def _events() -> list[dict[str, object]]:
+    return [
+        {"id": "m1", "ts": 10.0, "type": "mouse", "action": "move", "payload": {"x": 5, "y": 6}, "delta": 0.0},
+        {
+            "id": "c1",
+            "ts": 10.25,
+            "type": "mouse",
+            "action": "click",
+            "payload": {"x": 5, "y": 6, "button": "left", "pressed": True},
+            "delta": 0.25,
+        },
+        {
+            "id": "k1",
+            "ts": 11,
+            "type": "keyboard",
+            "action": "press",
+            "payload": {"key": "a", "char": "a", "vk": None, "label": ["x"]},
+            "delta": 1,
+        },
+        {"id": "s1", "ts": 12.0, "type": "mouse", "action": "scroll", "payload": {"x": 1.5, "y": 2, "dx": 0, "dy": -3}},
+        {"type": "click", "params": {"x": 1, "y": 2}},
+    ]
+
+
+@pytest.mark.parametrize("compression", [None, "zlib", "lzma"])
+def test_columnar_round_trip_is_lossless(compression) -> None:
+    recording = ColumnarRecording.from_export({"version": 1, "recorded_at": 9.5, "events": _events()})
+
+    restored = ColumnarRecording.from_bytes(recording.to_bytes(compression=compression))
+
+    assert restored.to_export() == {"version": 1, "recorded_at": 9.5, "events": _events()}
+    assert len(restored.strings) == len(recording.strings)
+
+
+def test_columnar_interns_repeated_strings() -> None:
+    recording = ColumnarRecording.from_events(_events()[:2] * 50)
+
+    assert len(recording) == 100
+    assert recording.strings.values.count("mouse") == 1
+    assert list(recording.x[:2]) == [5, 5]
+
+
+def test_columnar_stores_generated_ids_as_sequence() -> None:
+    events = [{"id": f"1a2b3c4d-{seq}", "ts": float(seq), "type": "mouse", "action": "move", "payload": {"x": seq, "y": 0}} for seq in range(1, 1001)]
+    events += [
+        {"id": odd, "ts": 0.0, "type": "mouse", "action": "move"}
+        for odd in ("plain", "run-007", "tail-", "a-b-3", "-5", "big-99999999999999999999")
+    ]
+    recording = ColumnarRecording.from_events(events)
+
+    assert len(recording.strings) < 15
+    assert recording.to_events() == events
+    assert ColumnarRecording.from_bytes(recording.to_bytes()).to_events() == events
+
+
+def test_columnar_reads_version_one_ids() -> None:
+    class VersionOne(ColumnarRecording):
+        def _columns(self):  # type: ignore[override]
+            columns = super()._columns()
+            del columns["event_seq"]
+            return columns
+
+    data = bytearray(VersionOne.from_events(_events()).to_bytes(compression=None))
+    struct.pack_into("<H", data, 4, 1)
+
+    assert ColumnarRecording.from_bytes(bytes(data)).to_events() == _events()
+
+
+def test_columnar_rejects_bad_data() -> None:
+    with pytest.raises(ColumnarError):
+        ColumnarRecording.from_bytes(b"NOPE" + b"\x00" * 16)
+    data = ColumnarRecording.from_events(_events()).to_bytes()
+    with pytest.raises(ColumnarError):
+        ColumnarRecording.from_bytes(data[:16] + b"?" + data[17:])
+
+
+def test_recorder_compact_storage_exports_columnar(tmp_path) -> None:
+    recorder = Recorder(compact=True)
+    recorder.start()
+    recorder.record_event(Event(id="e1", ts=1.0, type="keyboard", action="press", payload={"key": "a"}))
+    recorder.record_event(Event(id="e2", ts=1.5, type="keyboard", action="release", payload={"key": "a"}))
+
+    path = recorder.export(tmp_path / "recording.atrec")
+    events = list(ReplaySource(path))
+
+    assert events == recorder.stop()
+    assert events[1]["delta"] == 0.5
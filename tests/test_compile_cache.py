@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import pytest
+
+from autotool_system.core.compile_cache import CompileCache, workflow_digest
+from autotool_system.core.recording_compiler import compile_recording
+from autotool_system.core.workflow_builder import WorkflowBuilder, WorkflowError
+from autotool_system.utils.database import Database
+
+
+class CountingBuilder(WorkflowBuilder):
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def compile(self, workflow):  # type: ignore[override]
+        self.calls += 1
+        return super().compile(workflow)
+
+
+def _workflow(seconds: float = 1) -> dict:
+    return {"id": "wf1", "name": "Cached", "steps": [{"id": "s1", "type": "wait", "params": {"seconds": seconds}}]}
+
+
+def _db(tmp_path) -> Database:
+    db = Database()
+    db.connect(str(tmp_path / "automation.db"))
+    db.migrate()
+    return db
+
+
+def test_workflow_digest_ignores_timestamps() -> None:
+    base = _workflow()
+    stamped = {**base, "created_at": "2025-01-01", "updated_at": "2025-01-02"}
+    assert workflow_digest(base) == workflow_digest(stamped)
+    assert workflow_digest(base) != workflow_digest(_workflow(2))
+
+
+def test_compile_cache_hits_and_invalidates(tmp_path) -> None:
+    db = _db(tmp_path)
+    builder = CountingBuilder()
+    cache = CompileCache(builder, db=db)
+    db.save_workflow(_workflow())
+
+    plan = cache.plan("wf1")
+    assert plan is not None and plan.source == "compiled"
+    assert plan.action_dicts()[0]["type"] == "wait"
+    assert cache.plan("wf1") is plan
+    assert builder.calls == 1
+
+    db.save_workflow(_workflow(2))
+    updated = cache.plan("wf1")
+    assert updated is not None and updated.digest != plan.digest
+    assert updated.to_actions()[0].params == {"seconds": 2}
+    assert builder.calls == 2
+    assert cache.plan("missing") is None
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["invalidations"]) == (1, 2, 1)
+
+
+def test_compile_cache_sees_compiled_recording_saves(tmp_path) -> None:
+    db = _db(tmp_path)
+    cache = CompileCache(WorkflowBuilder(), db=db)
+    db.save_workflow(_workflow())
+    assert cache.plan("wf1").action_dicts()[0]["type"] == "wait"
+
+    events = [
+        {"type": "mouse", "action": "click", "payload": {"x": 10, "y": 20, "button": "left", "pressed": pressed}, "delta": 0.05}
+        for pressed in (True, False)
+    ]
+    db.save_workflow(compile_recording(events, workflow_id="wf1", name="Recorded"))
+    assert "click" in [action["type"] for action in cache.plan("wf1").action_dicts()]
+
+    db.delete_workflow("wf1")
+    assert cache.plan("wf1") is None
+
+
+def test_compile_cache_reuses_persisted_plans(tmp_path) -> None:
+    db = _db(tmp_path)
+    db.save_workflow(_workflow())
+    CompileCache(WorkflowBuilder(), db=db).plan("wf1")
+
+    builder = CountingBuilder()
+    cache = CompileCache(builder, db=db)
+    plan = cache.plan("wf1")
+    assert plan is not None and plan.source == "db"
+    assert builder.calls == 0
+    assert cache.stats()["db_hits"] == 1
+
+    db.save_workflow(_workflow(3))
+    assert db.get_workflow_plan("wf1", plan.digest) is None
+
+
+def test_compile_cache_lru_and_errors() -> None:
+    cache = CompileCache(WorkflowBuilder(), max_entries=2)
+    for idx in range(3):
+        cache.compile({"id": f"wf{idx}", "name": "n", "steps": [{"type": "wait", "params": {"seconds": idx}}]})
+    assert cache.lookup("wf0") is None
+    assert cache.lookup("wf2") is not None
+    assert cache.stats()["evictions"] == 1
+    with pytest.raises(WorkflowError):
+        cache.compile({"id": "bad", "name": "bad", "steps": [{"params": {}}]})
+    assert cache.lookup("bad") is None
@@ -26,3 +26,11 @@ def test_validate_rejects_invalid_types() -> None:
     manager = ConfigManager()
     with pytest.raises(ConfigError):
         manager.save("config.yaml", {"automation": {"failsafe": "yes"}})
+
+
+def test_validate_input_backend() -> None:
+    manager = ConfigManager()
+    assert manager.validate({"automation": {"input_backend": "pyautogui"}}) == []
+    assert manager.validate({"automation": {"input_backend": "xdotool"}}) == [
+        "automation.input_backend must be one of: legacy, pyautogui"
+    ]
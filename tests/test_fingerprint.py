@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+from PIL import Image
+
+from autotool_system.automation import AutomationEngine, RecordingBackend
+from autotool_system.core.fingerprint import FingerprintProbe, ReadinessOptions, average_hash, hamming
+from autotool_system.core.recorder import Recorder
+from autotool_system.core.replay_plan import compile_items
+from autotool_system.core.replayer import Replayer
+
+
+def _button(ready: bool) -> Image.Image:
+    image = Image.new("L", (32, 32), 0)
+    if ready:
+        image.paste(255, (0, 0, 16, 32))
+    return image
+
+
+def test_average_hash_distinguishes_regions() -> None:
+    ready = average_hash(_button(True))
+    assert hamming(ready, average_hash(_button(True))) == 0
+    assert hamming(ready, average_hash(_button(False))) > 6
+
+
+def test_recorder_captures_click_fingerprint() -> None:
+    regions = []
+    probe = FingerprintProbe(lambda region: regions.append(region) or _button(True))
+    recorder = Recorder(fingerprint=probe)
+    recorder.start()
+    recorder.record_event({"type": "mouse", "action": "click", "payload": {"x": 40, "y": 50, "pressed": True}, "ts": 1.0})
+    recorder.record_event({"type": "mouse", "action": "click", "payload": {"x": 40, "y": 50, "pressed": False}, "ts": 1.1})
+    events = recorder.stop()
+
+    assert regions == [(24, 34, 32, 32)]
+    assert events[0]["payload"]["fingerprint"] == probe.capture(40, 50)
+    assert "fingerprint" not in events[1]["payload"]
+    assert compile_items(events)[0].fingerprint == events[0]["payload"]["fingerprint"]
+
+
+def test_replayer_waits_for_fingerprint_instead_of_delay() -> None:
+    frames = iter([_button(False), _button(False), _button(True)])
+    probe = FingerprintProbe(lambda region: next(frames))
+    fingerprint = FingerprintProbe(lambda region: _button(True)).capture(10, 10)
+    backend = RecordingBackend()
+    replayer = Replayer(AutomationEngine(input_backend=backend), probe=probe)
+    events = [
+        {
+            "id": "c1",
+            "type": "mouse",
+            "action": "click",
+            "payload": {"x": 10, "y": 10, "button": "left", "pressed": True, "fingerprint": fingerprint},
+            "delta": 5.0,
+        }
+    ]
+
+    results = replayer.play(events, readiness=ReadinessOptions(timeout=1.0, interval=0.001))
+
+    assert results[0].success is True
+    report = replayer.last_readiness_report
+    assert report is not None
+    assert report.matched == 1
+    assert report.steps[0]["saved"] > 4.0
+    assert report.steps[0]["step_id"] == "c1"
+
+
+def test_replayer_strict_readiness_times_out() -> None:
+    probe = FingerprintProbe(lambda region: _button(False))
+    fingerprint = FingerprintProbe(lambda region: _button(True)).capture(0, 0)
+    replayer = Replayer(AutomationEngine(input_backend=RecordingBackend()), probe=probe)
+    events = [{"type": "click", "params": {"x": 1, "y": 1}, "fingerprint": fingerprint}]
+
+    results = replayer.play(events, readiness=ReadinessOptions(timeout=0.01, interval=0.005, strict=True))
+
+    assert results[0].success is False
+    assert results[0].message == "Screen not ready"
+    assert replayer.last_readiness_report.timed_out == 1
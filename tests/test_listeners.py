@@ -1,5 +1,14 @@
-from autotool_system.listeners.event import Event
+import threading
+
+import pytest
+
+from autotool_system.listeners.capture_buffer import CaptureBuffer, CaptureRing
+from autotool_system.listeners.event import Event, EventSession, KeyPayload, PointerPayload
 from autotool_system.listeners.event_dispatcher import EventDispatcher
+from autotool_system.listeners.hotkeys import HotkeyIndex
+from autotool_system.listeners.keyboard_listener import KeyboardListener
+from autotool_system.listeners.motion_sampler import MotionSampler, MotionSamplerOptions
+from autotool_system.listeners.mouse_listener import MouseListener
 
 
 def test_event_create() -> None:
@@ -24,3 +33,193 @@ def test_dispatcher_filters_and_handlers() -> None:
     dispatcher.dispatch(Event.create("mouse", "move", {"x": 1, "y": 2}))
 
     assert len(seen) == 1
+
+
+def test_capture_ring_counts_overflow() -> None:
+    ring = CaptureRing("test", lambda record: None, 4)
+    assert all(ring.push(1, idx, idx) for idx in range(4))
+    assert ring.push(1, 9, 9) is False
+    assert ring.dropped == 1
+    assert [record[2] for record in ring.drain(10)] == [0, 1, 2, 3]
+    assert ring.push(1, 5, 5) is True
+    assert ring.high_water == 4
+
+
+def test_capture_buffer_materializes_events_in_order() -> None:
+    seen: list[Event] = []
+    buffer = CaptureBuffer(seen.append)
+    mouse = MouseListener(buffer=buffer)
+    keyboard = KeyboardListener(buffer=buffer)
+
+    mouse._on_move(1, 2)
+    keyboard._on_press("a")
+    mouse._on_click(3, 4, "left", True)
+    mouse._on_scroll(3, 4, 0, -1)
+    buffer.start()
+    buffer.stop()
+
+    assert [(event.type, event.action) for event in seen] == [
+        ("mouse", "move"),
+        ("keyboard", "press"),
+        ("mouse", "click"),
+        ("mouse", "scroll"),
+    ]
+    assert seen[2].payload == {"x": 3, "y": 4, "button": "left", "pressed": True}
+    assert seen[3].payload["dy"] == -1
+    assert seen[0].ts <= seen[3].ts
+    assert buffer.stats()["delivered"] == 4
+
+
+def test_event_ids_are_sequential_and_lazy() -> None:
+    session = EventSession("rec")
+    first = Event.create("mouse", "move", PointerPayload(1, 2), session=session)
+    second = Event.create("keyboard", "press", KeyPayload("a"), session=session)
+
+    assert first._id is None
+    assert (first.id, second.id) == ("rec-1", "rec-2")
+    assert second.ns >= first.ns
+    assert second.ts - first.ts == pytest.approx((second.ns - first.ns) / 1_000_000_000, abs=1e-6)
+    assert first.to_dict()["payload"] == {"x": 1, "y": 2}
+    assert second.to_dict()["payload"] == {"key": "a"}
+    assert type(first.to_dict()["payload"]) is dict
+
+
+def test_event_keeps_explicit_id_and_ts() -> None:
+    event = Event(id="e1", ts=12.5, type="mouse", action="click", payload={"x": 1})
+    assert event.to_dict() == {"id": "e1", "ts": 12.5, "type": "mouse", "action": "click", "payload": {"x": 1}}
+    assert event == Event(id="e1", ts=12.5, type="mouse", action="click", payload={"x": 1})
+
+
+def test_motion_sampler_keeps_distance_time_and_turns() -> None:
+    sampler = MotionSampler(MotionSamplerOptions(min_distance=10, min_interval=0.01, angle_threshold=45))
+    ms = 1_000_000
+
+    assert sampler.accept(0, 0, 0) is True
+    assert sampler.accept(5, 0, 20 * ms) is False
+    assert sampler.accept(12, 0, 25 * ms) is True
+    assert sampler.accept(30, 0, 30 * ms) is False
+    assert sampler.accept(30, 0, 50 * ms) is True
+    assert sampler.accept(30, 6, 51 * ms) is True
+
+    report = sampler.report()
+    assert report["retained"] == 4
+    assert report["dropped_threshold"] == 2
+    assert report["turns"] == 1
+
+
+def test_motion_sampler_enforces_rate_budget() -> None:
+    sampler = MotionSampler(MotionSamplerOptions(max_rate=100))
+    kept = sum(sampler.accept(idx * 3, 0, idx * 1_000_000) for idx in range(1000))
+
+    assert 95 <= kept <= 115
+    assert sampler.report()["dropped_budget"] == 1000 - kept
+
+
+def test_mouse_listener_drops_samples_before_capture() -> None:
+    seen: list[Event] = []
+    buffer = CaptureBuffer(seen.append)
+    mouse = MouseListener(buffer=buffer, sampler=MotionSampler(MotionSamplerOptions(min_distance=50)))
+
+    for x in range(0, 40, 2):
+        mouse._on_move(x, 0)
+    mouse._on_click(38, 0, "left", True)
+    buffer.drain()
+
+    assert [(event.action, event.payload["x"]) for event in seen] == [("move", 0), ("move", 38), ("click", 38)]
+    assert buffer.stats()["rings"]["mouse"]["high_water"] == 3
+    assert mouse.sampler.report()["flushed"] == 1
+
+
+def test_hotkey_index_matches_shared_modifier_state() -> None:
+    fired: list[str] = []
+    index = HotkeyIndex(dispatch=lambda callback: callback())
+    assert index.register("Ctrl+Shift+Esc", lambda: fired.append("stop")) == "<ctrl>+<shift>+<esc>"
+    index.register("ctrl+s", lambda: fired.append("save"))
+    with pytest.raises(ValueError):
+        index.register("<ctrl>+<shift>+<escape>", lambda: None)
+
+    for key in ["ctrl_l", "shift_r", "esc", "esc"]:
+        index.press(key)
+    index.release("esc")
+    index.release("shift_r")
+    index.press("s")
+    index.press("ctrl_r")
+    index.release("ctrl_l")
+    index.release("s")
+    index.press("s")
+
+    assert fired == ["stop", "save", "save"]
+    assert index.unregister("ctrl+s") is True
+    assert len(index) == 1
+
+
+def test_keyboard_listener_fires_hotkeys_off_hook_thread() -> None:
+    threads: list[str] = []
+    listener = KeyboardListener()
+    listener.register_hotkey("alt+f4", lambda: threads.append(threading.current_thread().name))
+
+    listener._on_press("alt")
+    listener._on_press("f4")
+    listener.hotkeys.flush()
+    listener.hotkeys.close()
+
+    assert threads == ["autotool-hotkeys"]
+
+
+def test_keyboard_listener_keeps_shared_empty_index() -> None:
+    fired: list[str] = []
+    index = HotkeyIndex()
+    listener = KeyboardListener(hotkeys=index)
+    assert listener.hotkeys is index
+    index.register("ctrl+s", lambda: fired.append("save"))
+
+    listener._on_press("ctrl")
+    listener._on_press("s")
+    index.flush()
+    listener.stop()
+
+    assert fired == ["save"]
+    assert index._worker is None
+
+
+def test_dispatcher_routes_subscriptions_by_topic() -> None:
+    dispatcher = EventDispatcher()
+    clicks: list[str] = []
+    keys: list[str] = []
+    everything: list[str] = []
+    dispatcher.subscribe(lambda evt: clicks.append(evt.id), event_type="mouse", action="click")
+    dispatcher.subscribe(lambda evt: keys.append(evt.id), event_type="keyboard")
+    dispatcher.subscribe(lambda evt: everything.append(evt.id))
+
+    dispatcher.dispatch(Event(id="m1", ts=1.0, type="mouse", action="move", payload={}))
+    dispatcher.dispatch(Event(id="c1", ts=1.1, type="mouse", action="click", payload={}))
+    dispatcher.dispatch(Event(id="k1", ts=1.2, type="keyboard", action="press", payload={}))
+    dispatcher.join()
+
+    assert clicks == ["c1"]
+    assert keys == ["k1"]
+    assert everything == ["m1", "c1", "k1"]
+    assert sum(item["delivered"] for item in dispatcher.stats()) == 5
+    dispatcher.close()
+    assert dispatcher.subscriptions() == []
+
+
+def test_dispatcher_drops_for_slow_subscriber_without_blocking() -> None:
+    dispatcher = EventDispatcher()
+    gate = threading.Event()
+    slow = dispatcher.subscribe(lambda evt: gate.wait(1.0), queue_size=2, name="slow")
+    fast: list[str] = []
+    dispatcher.subscribe(lambda evt: fast.append(evt.id), queue_size=100, name="fast")
+
+    for idx in range(10):
+        dispatcher.dispatch(Event(id=f"e{idx}", ts=float(idx), type="mouse", action="move", payload={}))
+    gate.set()
+    dispatcher.join()
+
+    stats = {item["name"]: item for item in dispatcher.stats()}
+    assert len(fast) == 10
+    assert stats["slow"]["dropped"] >= 7
+    assert stats["slow"]["delivered"] + stats["slow"]["dropped"] == 10
+    assert stats["slow"]["max_handler_ms"] > 0
+    assert dispatcher.unsubscribe(slow) is True
+    dispatcher.close()
@@ -46,3 +46,15 @@ def test_recorder_export_json_and_yaml(tmp_path) -> None:
     yaml_path = recorder.export(tmp_path / "recording.yaml")
     data = yaml.safe_load(yaml_path.read_text(encoding="utf-8"))
     assert data["events"][0]["payload"]["key"] == "a"
+
+
+def test_recorder_export_json_lines(tmp_path) -> None:
+    recorder = Recorder()
+    recorder.start()
+    recorder.record_event(Event(id="e1", ts=1.0, type="keyboard", action="press", payload={"key": "a"}))
+    recorder.record_event(Event(id="e2", ts=1.5, type="keyboard", action="release", payload={"key": "a"}))
+
+    path = recorder.export(tmp_path / "recording.jsonl")
+    lines = path.read_text(encoding="utf-8").splitlines()
+
+    assert [json.loads(line)["id"] for line in lines] == ["e1", "e2"]
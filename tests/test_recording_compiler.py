@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import pytest
+
+from autotool_system.core.recording_compiler import (
+    CompileOptions,
+    CompileReport,
+    RecordingCompileError,
+    compile_recording,
+)
+from autotool_system.core.workflow_builder import WorkflowBuilder
+
+
+def _key(action: str, key: str, char: str | None = None, delta: float = 0.05) -> dict[str, object]:
+    payload: dict[str, object] = {"key": key}
+    if char is not None:
+        payload["char"] = char
+    return {"type": "keyboard", "action": action, "payload": payload, "delta": delta}
+
+
+def _mouse(action: str, x: int, y: int, delta: float = 0.01, **extra: object) -> dict[str, object]:
+    return {"type": "mouse", "action": action, "payload": {"x": x, "y": y, **extra}, "delta": delta}
+
+
+def _recording() -> list[dict[str, object]]:
+    events = [_mouse("move", x, x, 0.01) for x in range(0, 60, 5)]
+    events += [
+        _mouse("click", 300, 300, 0.2, button="left", pressed=True),
+        _mouse("click", 300, 300, 0.08, button="left", pressed=False),
+        _mouse("click", 301, 300, 0.1, button="left", pressed=True),
+        _mouse("click", 301, 300, 0.08, button="left", pressed=False),
+    ]
+    for char in "Hi":
+        events += [_key("press", char, char, 0.12), _key("release", char, char, 0.04)]
+    events += [
+        _key("press", "ctrl_l", delta=0.3),
+        _key("press", "\x13", "\x13"),
+        _key("release", "\x13", "\x13"),
+        _key("release", "ctrl_l"),
+        _mouse("click", 10, 10, 1.0, button="left", pressed=True),
+        _mouse("move", 80, 90, 0.2),
+        _mouse("click", 80, 90, 0.3, button="left", pressed=False),
+    ]
+    return events
+
+
+def test_compile_recording_folds_primitives() -> None:
+    report = CompileReport()
+    workflow = compile_recording(_recording(), workflow_id="wf-1", name="Demo", report=report)
+    steps = [(step["type"], step["params"]) for step in workflow["steps"] if step["type"] != "wait"]
+
+    assert steps[0] == ("move", {"x": 55, "y": 55, "duration": 0.0})
+    assert steps[1] == ("click", {"x": 300, "y": 300, "button": "left", "clicks": 2, "interval": 0.1})
+    assert steps[2] == ("type", {"text": "Hi", "interval": 0.0})
+    assert steps[3] == ("hotkey", {"keys": ["ctrl", "s"]})
+    assert [kind for kind, _ in steps[4:]] == ["mouse_down", "move", "mouse_up"]
+    assert steps[5][1]["duration"] == pytest.approx(0.5)
+    assert WorkflowBuilder().validate(workflow) == []
+    assert report.primitives == len(_recording())
+    assert report.steps == len(workflow["steps"])
+    assert report.step_reduction > 0.5
+    assert 0 < report.projected_seconds < report.recorded_seconds
+
+
+def test_compile_recording_emits_editable_graph() -> None:
+    options = CompileOptions(output="graph", min_wait=10.0)
+    workflow = compile_recording(_recording(), workflow_id="wf-2", name="Graph", options=options)
+
+    nodes = workflow["graph"]["nodes"]
+    assert nodes[0]["type"] == "trigger.manual"
+    assert nodes[1]["type"] == "action.move"
+    assert len(workflow["graph"]["edges"]) == len(nodes) - 1
+    actions = WorkflowBuilder().compile(workflow)
+    assert [action.type for action in actions][:3] == ["move", "click", "type"]
+
+
+def test_compile_recording_rejects_empty_input() -> None:
+    with pytest.raises(RecordingCompileError):
+        compile_recording([_key("release", "a", "a")], workflow_id="wf", name="Empty")
+    with pytest.raises(ValueError):
+        CompileOptions.from_obj({"moves": "some"})
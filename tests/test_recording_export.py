@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import gzip
+import json
+
+import pytest
+import yaml
+
+from autotool_system.core.recorder import Recorder, RecorderError
+from autotool_system.core.recording_export import RecordingExportError, export_events, resolve_format
+from autotool_system.core.replay_source import ReplaySource
+from autotool_system.listeners.event import PointerPayload
+
+
+def _events(count: int) -> list[dict[str, object]]:
+    return [
+        {"id": f"e{idx}", "ts": float(idx), "type": "mouse", "action": "move", "payload": {"x": idx, "y": -idx}, "delta": 0.01}
+        for idx in range(count)
+    ]
+
+
+def test_resolve_format_detects_compressed_suffixes() -> None:
+    assert resolve_format("a.jsonl.gz") == ("jsonl", "gzip")
+    assert resolve_format("a.ndjson.zst") == ("jsonl", "zstd")
+    assert resolve_format("a.out", "jsonl.gz") == ("jsonl", "gzip")
+    assert resolve_format("a.yml") == ("yaml", None)
+    with pytest.raises(RecordingExportError):
+        resolve_format("a.yaml", compression="gzip")
+
+
+@pytest.mark.parametrize("name", ["recording.json", "recording.yaml"])
+def test_streamed_documents_match_full_payload(tmp_path, name) -> None:
+    events = _events(2500)
+    path = tmp_path / name
+
+    report = export_events(events, path, recorded_at=3.5, batch_size=1000)
+
+    loader = json.loads if name.endswith(".json") else yaml.safe_load
+    assert loader(path.read_text(encoding="utf-8")) == {"version": 1, "recorded_at": 3.5, "events": events}
+    assert report.events == 2500
+    assert report.bytes == path.stat().st_size
+
+
+@pytest.mark.parametrize("name", ["recording.json", "recording.yaml"])
+def test_streamed_documents_handle_empty_input(tmp_path, name) -> None:
+    path = tmp_path / name
+    export_events([], path, recorded_at=1.0)
+    loader = json.loads if name.endswith(".json") else yaml.safe_load
+    assert loader(path.read_text(encoding="utf-8"))["events"] == []
+
+
+def test_gzip_json_lines_round_trip_through_replay_source(tmp_path) -> None:
+    events = _events(50)
+    path = tmp_path / "recording.jsonl.gz"
+
+    report = export_events(events, path)
+
+    assert report.compression == "gzip"
+    assert report.bytes < report.raw_bytes
+    with gzip.open(path, "rt", encoding="utf-8") as handle:
+        assert json.loads(handle.readline()) == events[0]
+    assert list(ReplaySource(path)) == events
+
+
+def test_recorder_export_reports_throughput(tmp_path) -> None:
+    recorder = Recorder()
+    recorder.start()
+    recorder.record_event({"id": "m1", "ts": 1.0, "type": "mouse", "action": "move", "payload": PointerPayload(1, 2)})
+
+    recorder.export(tmp_path / "recording.jsonl.gz")
+    report = recorder.last_export_report
+
+    assert report is not None and report.events == 1
+    assert report.to_dict()["events_per_second"] > 0
+    with pytest.raises(RecorderError):
+        recorder.export(tmp_path / "recording.csv")
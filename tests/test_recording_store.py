@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import json
+
+from autotool_system.api.server import _sse_events
+from autotool_system.core.recorder import Recorder
+from autotool_system.core.recording_store import RecordingStore
+from autotool_system.core.replay_source import ReplaySource
+
+
+def _event(idx: int) -> dict[str, object]:
+    return {"id": f"e{idx}", "ts": float(idx), "type": "mouse", "action": "move", "payload": {"x": idx, "y": idx}}
+
+
+def test_writer_rolls_segments_and_reads_back(tmp_path) -> None:
+    store = RecordingStore(tmp_path, segment_events=3, fsync_interval=0.0)
+    writer = store.create("rec1")
+    for idx in range(7):
+        writer.append(_event(idx))
+    assert len(writer) == 7
+    assert [event["id"] for event in writer] == [f"e{idx}" for idx in range(7)]
+
+    handle = writer.close()
+    assert handle.status == "complete"
+    assert [segment["count"] for segment in handle.segments] == [3, 3, 1]
+    assert [event["id"] for event in handle.iter_events(start=4)] == ["e4", "e5", "e6"]
+
+    reopened = store.open("rec1")
+    assert reopened.count == 7
+    assert [item["id"] for item in reopened] == [f"e{idx}" for idx in range(7)]
+    assert [entry.id for entry in store.list()] == ["rec1"]
+
+
+def test_recover_truncates_partial_line(tmp_path) -> None:
+    store = RecordingStore(tmp_path, segment_events=100, fsync_interval=60.0)
+    writer = store.create("crashed")
+    for idx in range(4):
+        writer.append(_event(idx))
+    writer.flush()
+    segment = tmp_path / "crashed" / "seg-000001.jsonl"
+    with segment.open("a", encoding="utf-8") as handle:
+        handle.write(json.dumps(_event(4)) + "\n")
+        handle.write('{"id": "e5", "ts"')
+
+    recovered = RecordingStore(tmp_path).recover()
+
+    assert [handle.id for handle in recovered] == ["crashed"]
+    assert recovered[0].status == "recovered"
+    assert recovered[0].count == 5
+    assert segment.read_text(encoding="utf-8").endswith("\n")
+    assert RecordingStore(tmp_path).recover() == []
+
+
+def test_recorder_spills_to_store(tmp_path) -> None:
+    store = RecordingStore(tmp_path, segment_events=2)
+    recorder = Recorder(store=store)
+    recorder.start()
+    for idx in range(5):
+        recorder.record_event(_event(idx))
+    recording_id = recorder.recording_id
+    assert recorder.count == 5
+
+    handle = recorder.finish()
+
+    assert handle is not None and handle.id == recording_id
+    assert handle.count == 5
+    assert len(handle.segments) == 3
+    assert [event["id"] for event in ReplaySource(handle.path)] == [f"e{idx}" for idx in range(5)]
+
+
+def test_handle_pages_with_cursor(tmp_path) -> None:
+    writer = RecordingStore(tmp_path, segment_events=4).create("paged")
+    for idx in range(10):
+        writer.append(_event(idx))
+    handle = writer.close()
+
+    first, cursor = handle.page(0, 6)
+    second, done = handle.page(cursor, 6)
+
+    assert [event["id"] for event in first + second] == [f"e{idx}" for idx in range(10)]
+    assert cursor == 6 and done is None
+    assert [json.loads(line)["id"] for line in handle.iter_lines(8)] == ["e8", "e9"]
+
+
+def test_live_events_follow_active_recording(tmp_path) -> None:
+    recorder = Recorder(store=RecordingStore(tmp_path, fsync_interval=60.0))
+    recorder.start()
+    recorder.record_event(_event(0))
+    recorder.record_event(_event(1))
+
+    assert [event["id"] for event in recorder.events_since(1)] == ["e1"]
+    recorder.record_event(_event(2))
+    assert [event["id"] for event in recorder.events_since(1)] == ["e1", "e2"]
+    recorder.finish()
+
+
+def test_sse_stream_formats_batches() -> None:
+    chunks = list(_sse_events(iter([(0, [{"id": "a"}]), (1, []), (1, [{"id": "b"}])]), recording_id="r1"))
+
+    assert chunks[0] == 'id: 1\ndata: {"id":"a"}\n\n'
+    assert chunks[1] == 'id: 2\ndata: {"id":"b"}\n\n'
+    assert chunks[-1].startswith("event: end\n") and '"count": 2' in chunks[-1]
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import json
+import os
+
+from autotool_system.automation import AutomationEngine, RecordingBackend
+from autotool_system.core.recording_store import RecordingStore
+from autotool_system.core.replay_plan import ReplayPlan, ReplayPlanCache, compile_items
+from autotool_system.core.replayer import Replayer
+
+
+def _events() -> list[dict[str, object]]:
+    return [
+        {"id": "e1", "type": "mouse", "action": "move", "payload": {"x": 1, "y": 2}, "delta": 0.0},
+        {"type": "keyboard", "action": "press", "payload": {"key": "a"}, "delta": 0.0},
+        {"type": "click", "params": {"x": 3, "y": 4}},
+        {"type": "mouse", "action": "click", "payload": {"x": 1, "y": 1}},
+    ]
+
+
+def test_compile_items_assigns_stable_ids() -> None:
+    plan = compile_items(_events())
+    assert [step.step_id for step in plan] == ["e1", "step-1", "step-2", "step-3"]
+    assert plan[0].action is not None and plan[0].action.type == "move"
+    assert plan[1].action is not None and plan[1].action.type == "key_down"
+    assert plan[3].action is None and plan[3].error == "Unsupported event"
+
+    again = compile_items(_events())
+    assert [step.action.id for step in again if step.action] == [step.action.id for step in plan if step.action]
+
+
+def test_plan_round_trips_through_dict() -> None:
+    plan = compile_items(_events(), digest="abc")
+    restored = ReplayPlan.from_dict(json.loads(json.dumps(plan.to_dict())))
+    assert restored.digest == "abc"
+    assert [step.to_row() for step in restored] == [step.to_row() for step in plan]
+
+
+def test_replayer_caches_plan_and_invalidates_on_change(tmp_path) -> None:
+    path = tmp_path / "events.jsonl"
+    path.write_text("\n".join(json.dumps(item) for item in _events()[:3]), encoding="utf-8")
+    cache = ReplayPlanCache(tmp_path / "cache")
+    backend = RecordingBackend()
+    replayer = Replayer(AutomationEngine(input_backend=backend), plan_cache=cache)
+
+    replayer.play(replayer.compile(path))
+    assert cache.stats()["misses"] == 1
+    assert len(list((tmp_path / "cache").glob("*.plan.json"))) == 1
+
+    plan = replayer.compile(path)
+    assert isinstance(plan, ReplayPlan)
+    replayer.play(plan)
+    assert cache.stats()["hits"] == 1
+    assert backend.kinds() == ["move", "key_down", "click", "move", "key_down", "click"]
+
+    fresh = ReplayPlanCache(tmp_path / "cache")
+    assert isinstance(Replayer(AutomationEngine(input_backend=backend), plan_cache=fresh).compile(path), ReplayPlan)
+    assert fresh.stats()["disk_hits"] == 1
+
+    path.write_text(json.dumps(_events()[0]), encoding="utf-8")
+    os.utime(path, ns=(0, 1))
+    assert not isinstance(replayer.compile(path), ReplayPlan)
+
+
+def test_replayer_caches_recording_directories(tmp_path) -> None:
+    store = RecordingStore(tmp_path / "recordings", segment_events=2, fsync_interval=0.0)
+    writer = store.create("rec1")
+    for idx in range(3):
+        writer.append({"id": f"e{idx}", "ts": float(idx), "type": "mouse", "action": "move", "payload": {"x": idx, "y": idx}})
+    directory = writer.close().path
+    cache = ReplayPlanCache(tmp_path / "cache")
+    backend = RecordingBackend()
+    replayer = Replayer(AutomationEngine(input_backend=backend), plan_cache=cache)
+
+    replayer.play(replayer.compile(directory))
+    plan = replayer.compile(directory)
+    assert isinstance(plan, ReplayPlan) and len(plan) == 3
+    assert cache.digest(directory) == cache.digest(directory / "index.json")
+    assert backend.kinds() == ["move", "move", "move"]
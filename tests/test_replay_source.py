@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import io
+import json
+
+import pytest
+
+from autotool_system.core.replay_source import ReplaySource, ReplaySourceError, _ChunkReader, _iter_array
+
+
+def _events(count: int) -> list[dict[str, object]]:
+    return [
+        {"id": f"e{idx}", "type": "mouse", "action": "move", "payload": {"x": idx, "y": idx * 2}, "delta": 0.01}
+        for idx in range(count)
+    ]
+
+
+def test_streams_events_from_wrapped_json(tmp_path) -> None:
+    path = tmp_path / "recording.json"
+    events = _events(300)
+    path.write_text(
+        json.dumps({"version": 1, "recorded_at": 12.5, "events": events, "tail": {"k": [1, 2]}}, indent=2),
+        encoding="utf-8",
+    )
+
+    streamed = list(ReplaySource(path, chunk_size=1024))
+
+    assert streamed == events
+
+
+def test_streams_top_level_list_and_json_lines(tmp_path) -> None:
+    events = _events(5)
+    list_path = tmp_path / "items.json"
+    list_path.write_text(json.dumps(events), encoding="utf-8")
+    lines_path = tmp_path / "items.jsonl"
+    lines_path.write_text("\n".join(json.dumps(event) for event in events) + "\n\n", encoding="utf-8")
+
+    assert list(ReplaySource(list_path)) == events
+    assert list(ReplaySource(lines_path)) == events
+
+
+def test_streaming_yields_before_reading_whole_file(tmp_path) -> None:
+    path = tmp_path / "broken.json"
+    path.write_text('{"events": [{"id": "e1", "type": "mouse"}, {"id": ', encoding="utf-8")
+
+    iterator = iter(ReplaySource(path))
+    assert next(iterator)["id"] == "e1"
+    with pytest.raises(ReplaySourceError):
+        next(iterator)
+
+
+def test_rejects_payload_without_events(tmp_path) -> None:
+    path = tmp_path / "bad.json"
+    path.write_text('{"version": 1}', encoding="utf-8")
+
+    with pytest.raises(ReplaySourceError):
+        list(ReplaySource(path))
+
+
+def test_malformed_value_fails_without_reading_to_eof() -> None:
+    text = '[{"id": "e1", "x": }, ' + ", ".join(json.dumps(event) for event in _events(20000)) + "]"
+    handle = io.StringIO(text)
+    reader = _ChunkReader(handle, 1024)
+    reader.advance()
+
+    with pytest.raises(ReplaySourceError):
+        next(_iter_array(reader))
+    assert handle.tell() <= 2048
+
+
+def test_oversized_value_is_rejected(tmp_path) -> None:
+    path = tmp_path / "huge.json"
+    path.write_text('{"events": [{"id": "' + "a" * 200_000, encoding="utf-8")
+
+    with pytest.raises(ReplaySourceError, match="exceeds"):
+        list(ReplaySource(path, chunk_size=1024, max_value_size=8192))
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import math
+
+import pytest
+
+import autotool_system.core.replayer as replayer_module
+from autotool_system.automation import AutomationEngine, RecordingBackend
+from autotool_system.core.replay_plan import compile_items
+from autotool_system.core.replay_timing import ReplayTiming, project
+from autotool_system.core.replayer import Replayer
+
+
+def _events() -> list[dict[str, object]]:
+    return [
+        {"type": "mouse", "action": "move", "payload": {"x": 1, "y": 1}, "delta": 0.5},
+        {"type": "wait", "params": {"seconds": 2.0}, "delta": 30.0},
+        {"type": "keyboard", "action": "press", "payload": {"key": "a"}, "delta": 0.2},
+        {"type": "keyboard", "action": "release", "payload": {"key": "a"}, "delta": 0.2},
+        {"type": "mouse", "action": "move", "payload": {"x": 5, "y": 5}, "delta": 4.0},
+    ]
+
+
+def test_timing_from_obj_validates() -> None:
+    timing = ReplayTiming.from_obj({"max_gap": 1, "typing_speed": 2, "fast_segments": [[3, 5], {"start": 0, "end": 1}]})
+    assert timing is not None
+    assert timing.fast_segments == ((0, 1), (3, 5))
+    assert timing.is_fast(4) and not timing.is_fast(2)
+    with pytest.raises(ValueError):
+        ReplayTiming.from_obj({"move_speed": 0})
+    with pytest.raises(ValueError):
+        ReplayTiming.from_obj({"fast_segments": [[4, 1]]})
+
+
+def test_project_caps_gaps_and_scales_categories() -> None:
+    timing = ReplayTiming(max_gap=1.0, typing_speed=2.0, wait_speed=4.0, fast_segments=((4, 5),))
+    report = project(compile_items(_events()), timing)
+
+    assert report.recorded == pytest.approx(36.9)
+    assert report.baseline == pytest.approx(36.9)
+    assert report.projected == pytest.approx(0.5 + 0.25 + 0.5 + 0.1 + 0.1)
+    assert report.gaps_capped == 1
+    assert report.fast_steps == 1
+    assert report.projected_savings == pytest.approx(36.9 - 1.45)
+
+
+def test_replayer_applies_timing_policy(monkeypatch) -> None:
+    sleeps: list[float] = []
+    monkeypatch.setattr(replayer_module.time, "sleep", sleeps.append)
+    backend = RecordingBackend()
+    engine = AutomationEngine(input_backend=backend)
+    speeds: list[float] = []
+    original = engine.execute
+
+    def _execute(action, *, speed=1.0):
+        speeds.append(speed)
+        return original(action, speed=speed)
+
+    monkeypatch.setattr(engine, "execute", _execute)
+    replayer = Replayer(engine)
+    timing = ReplayTiming(max_gap=1.0, typing_speed=2.0, wait_speed=1000.0, fast_segments=((4, 5),))
+    events = _events()
+    events[1] = {"type": "wait", "params": {"seconds": 0.0}, "delta": 30.0}
+
+    replayer.play(events, speed=1.0, timing=timing)
+
+    assert sleeps == pytest.approx([0.5, 0.001, 0.0, 0.1, 0.1])
+    assert speeds == [1.0, 1000.0, 2.0, 2.0, math.inf]
+    report = replayer.last_timing_report
+    assert report is not None and report.steps == 5
+    assert report.actual >= 0
+    assert report.to_dict()["actual_savings"] > 0
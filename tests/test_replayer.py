@@ -1,10 +1,17 @@
 from __future__ import annotations
 
+import json
 import time
 
+import pytest
+
+import autotool_system.api.state as state_module
 import autotool_system.core.replayer as replayer_module
+from autotool_system.api.state import ApiError
 from autotool_system.automation import AutomationEngine
 from autotool_system.core.replayer import Replayer
+from autotool_system.core.trajectory import SimplifyOptions
+from autotool_system.utils.database import Database
 
 
 class BackendStub:
@@ -60,6 +67,15 @@ def test_replayer_plays_actions() -> None:
     assert backend.calls[1] == ("hotkey", ["ctrl", "shift", "s"])
 
 
+def test_replayer_keeps_bounded_result_tail() -> None:
+    replayer = Replayer(AutomationEngine(backend=BackendStub(), pause=0))
+
+    results = replayer.play([{"id": f"c{idx}", "type": "click", "params": {"x": idx, "y": 0}} for idx in range(5)], max_results=2)
+
+    assert [result.action_id for result in results] == ["c3", "c4"]
+    assert replayer.last_summary["total"] == 5
+
+
 def test_replayer_event_mapping_and_delta(monkeypatch) -> None:
     backend = BackendStub()
     engine = AutomationEngine(backend=backend, pause=0)
@@ -88,3 +104,129 @@ def test_replayer_event_mapping_and_delta(monkeypatch) -> None:
     assert backend.calls[2][0] == "mouseUp"
     assert backend.calls[3] == ("keyDown", "enter")
     assert backend.calls[4] == ("keyUp", "enter")
+
+
+def test_replayer_streams_json_lines_file(tmp_path) -> None:
+    backend = BackendStub()
+    engine = AutomationEngine(backend=backend, pause=0)
+    replayer = Replayer(engine)
+    path = tmp_path / "replay.jsonl"
+    path.write_text(
+        '{"type": "click", "params": {"x": 1, "y": 2}}\n{"type": "hotkey", "params": {"combo": "ctrl+a"}}\n',
+        encoding="utf-8",
+    )
+
+    source = replayer.open(path)
+    results = replayer.play(source, collect_results=False)
+
+    assert results == []
+    assert replayer.last_summary == {"total": 2, "succeeded": 2, "failed": 0}
+    assert backend.calls[1] == ("hotkey", ["ctrl", "a"])
+
+
+def _drag_events() -> list[dict[str, object]]:
+    return [
+        {"type": "mouse", "action": "move", "payload": {"x": 1, "y": 1}, "delta": 1.0},
+        {"type": "keyboard", "action": "press", "payload": {"key": "shift"}, "delta": 1.0},
+        {"type": "mouse", "action": "click", "payload": {"x": 2, "y": 2, "button": "left", "pressed": True}, "delta": 1.0},
+        {"type": "mouse", "action": "move", "payload": {"x": 8, "y": 9}, "delta": 1.0},
+        {"type": "mouse", "action": "click", "payload": {"x": 8, "y": 9, "button": "left", "pressed": False}, "delta": 1.0},
+    ]
+
+
+def test_replayer_seeks_by_index_and_timestamp(monkeypatch) -> None:
+    monkeypatch.setattr(replayer_module.time, "sleep", lambda value: None)
+    backend = BackendStub()
+    replayer = Replayer(AutomationEngine(backend=backend, pause=0))
+
+    replayer.play(_drag_events(), start_index=3)
+    assert [call[0] for call in backend.calls] == ["moveTo", "mouseUp"]
+    assert replayer.last_checkpoint is not None
+    assert replayer.last_checkpoint.index == 5
+    assert replayer.last_checkpoint.ts == 5.0
+
+    backend.calls.clear()
+    replayer.play(_drag_events(), start_ts=2.5)
+    assert [call[0] for call in backend.calls] == ["mouseDown", "moveTo", "mouseUp"]
+
+
+def test_replayer_checkpoints_and_resumes_input_state(monkeypatch) -> None:
+    monkeypatch.setattr(replayer_module.time, "sleep", lambda value: None)
+    checkpoints = []
+    backend = BackendStub()
+    engine = AutomationEngine(backend=backend, pause=0)
+    replayer = Replayer(engine, on_checkpoint=checkpoints.append)
+    events = _drag_events()
+    events[3] = {"type": "mouse", "action": "move", "payload": {}, "delta": 1.0}
+
+    replayer.play(events, stop_on_error=True, checkpoint_every=1)
+    failed = checkpoints[-1]
+    assert failed.index == 3
+    assert failed.ts == 3.0
+    assert failed.state.held_keys == ["shift"]
+    assert failed.state.held_buttons == ["left"]
+    assert failed.state.pointer == (2, 2)
+
+    backend.calls.clear()
+    replayer.play(_drag_events(), resume_from=failed)
+    assert backend.calls[0] == ("moveTo", {"x": 2, "y": 2, "duration": 0.0})
+    assert backend.calls[1] == ("keyDown", "shift")
+    assert backend.calls[2][0] == "mouseDown"
+    assert [call[0] for call in backend.calls[3:]] == ["moveTo", "mouseUp"]
+    assert replayer.last_checkpoint.state.held_buttons == []
+
+
+def test_replay_session_resumes_simplified_runs(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(replayer_module.time, "sleep", lambda value: None)
+    backend = BackendStub()
+    monkeypatch.setattr(state_module, "AutomationEngine", lambda **_: AutomationEngine(backend=backend, pause=0))
+    db = Database()
+    db.connect(str(tmp_path / "automation.db"))
+    db.migrate()
+    events = [{"type": "mouse", "action": "move", "payload": {"x": x, "y": x}, "delta": 0.01} for x in range(20)]
+    events.append({"type": "mouse", "action": "move", "payload": {}, "delta": 0.01})
+    events += [
+        {"type": "mouse", "action": "click", "payload": {"x": 50, "y": 60, "button": "left", "pressed": pressed}, "delta": 0.01}
+        for pressed in (True, False)
+    ]
+    path = tmp_path / "replay.jsonl"
+    path.write_text("\n".join(json.dumps(event) for event in events), encoding="utf-8")
+
+    session = state_module.ReplaySession(db=db, checkpoint_every=1)
+    run_id = session.start_path(path, stop_on_error=True, simplify=SimplifyOptions(tolerance=1.0))
+    session._thread.join()
+    record = db.get_run(run_id)
+    assert record["simplify"]["tolerance"] == 1.0
+    assert record["checkpoint"]["index"] == 2
+
+    backend.calls.clear()
+    session.resume(run_id)
+    session._thread.join()
+    assert backend.calls[0] == ("moveTo", {"x": 19, "y": 19, "duration": 0.0})
+    assert [call[0] for call in backend.calls[1:]] == ["mouseDown", "mouseUp"]
+
+
+def test_replay_session_refuses_resume_after_source_changes(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(replayer_module.time, "sleep", lambda value: None)
+    backend = BackendStub()
+    monkeypatch.setattr(state_module, "AutomationEngine", lambda **_: AutomationEngine(backend=backend, pause=0))
+    db = Database()
+    db.connect(str(tmp_path / "automation.db"))
+    db.migrate()
+    events = [
+        {"type": "mouse", "action": "move", "payload": {"x": 1, "y": 1}, "delta": 0.01},
+        {"type": "mouse", "action": "move", "payload": {}, "delta": 0.01},
+    ]
+    path = tmp_path / "replay.jsonl"
+    path.write_text("\n".join(json.dumps(event) for event in events), encoding="utf-8")
+
+    session = state_module.ReplaySession(db=db, checkpoint_every=1)
+    run_id = session.start_path(path, stop_on_error=True)
+    session._thread.join()
+    assert db.get_run(run_id)["digest"]
+
+    events.insert(0, {"type": "mouse", "action": "move", "payload": {"x": 0, "y": 0}, "delta": 0.01})
+    path.write_text("\n".join(json.dumps(event) for event in events), encoding="utf-8")
+    with pytest.raises(ApiError) as excinfo:
+        session.resume(run_id)
+    assert excinfo.value.status_code == 409
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from autotool_system.core.rule_batch import _try_numpy, columns_from_records, evaluate_batch
+from autotool_system.core.rule_engine import RuleEngine
+
+BACKENDS = ["python"] + (["numpy"] if _try_numpy() is not None else [])
+
+
+def _engine() -> RuleEngine:
+    engine = RuleEngine()
+    engine.add_rule({"id": "status", "condition": {"status": "failed", "workflow": "wf-1"}, "priority": 3})
+    engine.add_rule({"id": "slow", "condition": {"key": "duration", "op": "gte", "value": 10}})
+    engine.add_rule({"id": "steps", "condition": {"key": "steps", "op": "in", "value": [1, 2]}})
+    engine.add_rule({"id": "not-steps", "condition": {"key": "steps", "op": "not_in", "value": (3, 4)}})
+    engine.add_rule({"id": "message", "condition": {"key": "message", "op": "contains", "value": "timeout"}})
+    engine.add_rule({"id": "either", "condition": {"any": [{"key": "status", "op": "ne", "value": "success"}, {"key": "duration", "op": "lt", "value": 1}]}})
+    engine.add_rule({"id": "missing", "condition": {"key": "absent", "op": "eq", "value": None}})
+    engine.add_rule({"id": "callable", "condition": lambda context: context.get("steps") == 2})
+    engine.add_rule({"id": "disabled", "condition": {"key": "steps", "op": "gte", "value": 0}, "enabled": False})
+    return engine
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_evaluate_batch_matches_per_context_loop(backend: str) -> None:
+    rng = random.Random(5)
+    records = [
+        {
+            "status": rng.choice(["success", "failed", None]),
+            "workflow": rng.choice(["wf-1", "wf-2"]),
+            "duration": rng.choice([0.5, 3, 12.5]),
+            "steps": rng.choice([1, 2, 3, 5]),
+            "message": rng.choice(["ok", "timeout at step", "network timeout"]),
+        }
+        for _ in range(200)
+    ]
+    engine = _engine()
+    result = evaluate_batch(engine, columns_from_records(records), backend=backend)
+    assert result.backend == backend
+    assert result.size == 200
+    assert result.rule_ids[0] == "status"
+    for index, record in enumerate(records):
+        assert result.matches(index) == [match.id for match in engine.evaluate(record)]
+    assert result.counts()["disabled"] == 0
+    assert result.counts()["missing"] == 200
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_evaluate_batch_keeps_mixed_columns_exact(backend: str) -> None:
+    engine = RuleEngine()
+    engine.add_rule({"id": "v-text", "condition": {"key": "v", "op": "eq", "value": "1"}})
+    engine.add_rule({"id": "v-in", "condition": {"key": "v", "op": "in", "value": ["1"]}})
+    engine.add_rule({"id": "f-text", "condition": {"key": "f", "op": "eq", "value": "True"}})
+    engine.add_rule({"id": "n-one", "condition": {"key": "n", "op": "eq", "value": 1}})
+    engine.add_rule({"id": "title", "condition": {"key": "title", "op": "in", "value": "Untitled - Notepad"}})
+    records = [{"v": 1, "f": True, "n": 1}, {"v": "1", "f": "True", "n": "1"}, {"v": "a", "f": False, "n": 1.0}]
+
+    result = evaluate_batch(engine, columns_from_records(records), backend=backend)
+    for index, record in enumerate(records):
+        assert result.matches(index) == [match.id for match in engine.evaluate(record)]
+    assert result.matches(0) == ["n-one"]
+
+
+def test_evaluate_batch_validates_input() -> None:
+    engine = _engine()
+    with pytest.raises(ValueError):
+        evaluate_batch(engine, {"status": ["a"], "steps": [1, 2]})
+    with pytest.raises(ValueError):
+        evaluate_batch(engine, {}, backend="gpu")
+    result = evaluate_batch([{"id": "r1", "condition": {"a": 1}}], {"a": [1, 2]}, backend="python")
+    assert result.to_dict() == {"rules": ["r1"], "size": 2, "backend": "python", "matrix": [[True, False]]}
@@ -30,3 +30,93 @@ def test_rule_engine_remove() -> None:
     assert rule.id == "r1"
     engine.remove_rule("r1")
     assert engine.evaluate({"a": 1}) == []
+
+
+def test_rule_engine_indexes_by_context_keys() -> None:
+    engine = RuleEngine()
+    engine.add_rule({"id": "chrome", "condition": {"window": "chrome", "event": "click"}})
+    engine.add_rule({"id": "notepad", "condition": {"window": "notepad"}})
+    engine.add_rule({"id": "title", "condition": {"key": "title", "op": "contains", "value": "doc"}})
+    engine.add_rule({"id": "not-busy", "condition": {"key": "state", "op": "ne", "value": "busy"}})
+
+    candidates = {rule.id for rule in engine.candidates({"window": "chrome", "event": "click"})}
+    assert candidates == {"chrome", "not-busy"}
+    matches = engine.evaluate({"window": "chrome", "event": "click"})
+    assert [match.id for match in matches] == ["chrome", "not-busy"]
+    assert [match["id"] for match in engine.evaluate({"title": "doc-1", "state": "busy"})] == ["title"]
+    assert engine.evaluate({"window": ["unhashable"], "state": "busy"}) == []
+
+
+def test_rule_engine_accepts_string_membership() -> None:
+    engine = RuleEngine()
+    engine.add_rule({"id": "in-title", "condition": {"key": "title", "op": "in", "value": "Untitled - Notepad"}})
+    engine.add_rule({"id": "not-in-title", "condition": {"key": "title", "op": "not_in", "value": "Untitled - Notepad"}})
+
+    assert [match.id for match in engine.evaluate({"title": "Notepad"})] == ["in-title"]
+    assert [match.id for match in engine.evaluate({"title": "Chrome"})] == ["not-in-title"]
+    assert engine.evaluate({"other": 1}) == []
+
+
+def test_rule_engine_keeps_priority_order_on_replace() -> None:
+    engine = RuleEngine()
+    engine.add_rule({"id": "a", "condition": {"key": "x", "op": "gte", "value": 1}, "priority": 1})
+    engine.add_rule({"id": "b", "condition": {"key": "x", "op": "in", "value": [1, 2]}, "priority": 2})
+    engine.add_rule({"id": "c", "condition": lambda context: context.get("x") == 1, "priority": 1})
+    assert [rule["id"] for rule in engine.rules] == ["b", "a", "c"]
+
+    engine.add_rule({"id": "a", "condition": {"key": "x", "op": "eq", "value": 1}, "priority": 3})
+    assert len(engine) == 3
+    assert [match.id for match in engine.evaluate({"x": 1})] == ["a", "b", "c"]
+    engine.remove_rule("b")
+    assert [match.id for match in engine.evaluate({"x": 1})] == ["a", "c"]
+
+
+def test_rule_match_is_a_read_only_view() -> None:
+    engine = RuleEngine()
+    engine.add_rule({"id": "r1", "condition": {"key": "a", "op": "eq", "value": 1}, "meta": {"tag": "x"}})
+    (match,) = engine.evaluate({"a": 1})
+    assert dict(match)["strategy"] == "all"
+    assert match["meta"] == {"tag": "x"}
+    match["meta"]["tag"] = "y"
+    assert match.to_dict()["meta"] == {"tag": "x"}
+
+
+def test_rule_session_emits_transitions_for_patches() -> None:
+    engine = RuleEngine()
+    engine.add_rule({"id": "save", "condition": {"all": [{"key": "window", "op": "eq", "value": "editor"}, {"key": "dirty", "op": "eq", "value": True}]}, "priority": 2})
+    engine.add_rule({"id": "late", "condition": {"key": "hour", "op": "gte", "value": 18}})
+    engine.add_rule({"id": "idle", "condition": lambda context: context.get("busy") is not True})
+    session = engine.session({"window": "editor", "hour": 9})
+    assert [match.id for match in session.matches()] == ["idle"]
+
+    transitions = session.apply({"dirty": True, "hour": 19})
+    assert [(item.id, item.matched) for item in transitions] == [("save", True), ("late", True)]
+    assert session.apply({"hour": 20}) == []
+    assert [item.to_dict() for item in session.apply({"busy": True}, removed=["dirty"])] == [
+        {"id": "save", "matched": False, "priority": 2},
+        {"id": "idle", "matched": False, "priority": 0},
+    ]
+    assert session.apply({"busy": True}) == []
+
+    engine.remove_rule("late")
+    assert [(item.id, item.matched) for item in session.apply()] == [("late", False)]
+    assert session.matches() == []
+
+
+def test_rule_session_agrees_with_full_evaluation() -> None:
+    import random
+
+    rng = random.Random(3)
+    engine = RuleEngine()
+    for idx in range(60):
+        engine.add_rule({"id": f"g{idx}", "condition": {"w": idx % 5, "e": idx % 3}})
+        engine.add_rule({"id": f"r{idx}", "condition": {"all": [{"key": "w", "op": "eq", "value": idx % 5}, {"key": "n", "op": "gt", "value": idx % 7}]}})
+        engine.add_rule({"id": f"a{idx}", "condition": {"any": [{"key": "n", "op": "lt", "value": idx % 4}, {"key": "f", "op": "ne", "value": idx % 2}]}})
+    session = engine.session()
+    for _ in range(300):
+        key = rng.choice(["w", "e", "n", "f"])
+        if rng.random() < 0.2:
+            session.apply(removed=[key])
+        else:
+            session.apply({key: rng.randrange(8)})
+        assert [match.id for match in session.matches()] == [match.id for match in engine.evaluate(session.context)]
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import pytest
+
+from autotool_system.core.stream_triggers import StreamTriggerEngine, TriggerSpec
+from autotool_system.listeners import EventDispatcher
+from autotool_system.listeners.event import ClickPayload, Event, KeyPayload
+
+SECOND = 1_000_000_000
+
+
+def _click(ns: int, pressed: bool = True) -> Event:
+    return Event.create("mouse", "click", ClickPayload(1, 1, "left", pressed), ns=ns)
+
+
+def _key(key: str, ns: int) -> Event:
+    return Event.create("keyboard", "press", KeyPayload(key), ns=ns)
+
+
+def test_count_trigger_sliding_window() -> None:
+    engine = StreamTriggerEngine()
+    engine.add({"id": "triple", "match": {"type": "mouse", "action": "click", "pressed": True}, "count": 3, "window": 1.0, "workflow_id": "wf"})
+    times = [0, 0.4, 1.5, 1.6, 1.7, 1.8]
+    fired = [bool(engine.feed(_click(int(t * SECOND)))) for t in times]
+    assert fired == [False, False, False, False, True, False]
+    assert engine.feed(_click(int(1.9 * SECOND), pressed=False)) == []
+    assert engine.feed(_key("a", int(2.0 * SECOND))) == []
+    assert engine.stats()["triggers"] == [{"id": "triple", "fired": 1}]
+
+
+def test_count_trigger_tumbling_window_fires_once_per_window() -> None:
+    engine = StreamTriggerEngine()
+    engine.add({"id": "pair", "match": {"type": "mouse"}, "count": 2, "window": 1.0, "mode": "tumbling"})
+    times = [0, 0.5, 0.6, 0.9, 1.1, 1.95, 2.05]
+    fired = [bool(engine.feed(_click(int(t * SECOND)))) for t in times]
+    assert fired == [False, True, False, False, False, True, False]
+
+
+def test_sequence_trigger_keeps_latest_start() -> None:
+    fires = []
+    engine = StreamTriggerEngine(on_fire=fires.append)
+    engine.add(
+        {
+            "id": "save",
+            "steps": [{"type": "keyboard", "key": "ctrl"}, {"type": "keyboard", "key": "s"}, {"type": "mouse", "action": "click"}],
+            "window": 1.0,
+            "workflow_id": "wf-save",
+        }
+    )
+    engine.feed(_key("ctrl", 0))
+    engine.feed(_key("s", int(1.2 * SECOND)))
+    engine.feed(_key("ctrl", int(2.0 * SECOND)))
+    engine.feed(_key("x", int(2.1 * SECOND)))
+    engine.feed(_key("s", int(2.2 * SECOND)))
+    assert fires == []
+    engine.feed(_click(int(2.5 * SECOND)))
+    assert [(fire.trigger_id, fire.workflow_id) for fire in fires] == [("save", "wf-save")]
+    engine.feed(_click(int(2.6 * SECOND)))
+    assert len(fires) == 1
+
+
+def test_trigger_patterns_match_event_fields() -> None:
+    fires = []
+    engine = StreamTriggerEngine(on_fire=fires.append)
+    engine.add({"id": "save", "steps": [{"type": "keyboard", "key": "ctrl"}, {"type": "keyboard", "key": "s"}, {"type": "mouse", "action": "click"}]})
+    engine.add({"id": "ctrl", "match": {"type": "keyboard", "key": "ctrl"}})
+    engine.add({"id": "far", "match": {"all": [{"key": "type", "value": "mouse"}, {"key": "x", "op": "gt", "value": 100}]}})
+
+    for idx in range(3):
+        engine.feed(_click(idx))
+    engine.feed(_key("a", 3))
+    assert fires == []
+
+    engine.feed(_key("ctrl", 4))
+    engine.feed(Event.create("mouse", "click", ClickPayload(150, 1, "left", True), ns=5))
+    assert [fire.trigger_id for fire in fires] == ["ctrl", "far"]
+
+
+def test_trigger_spec_validation_and_dispatcher() -> None:
+    with pytest.raises(ValueError):
+        TriggerSpec.from_obj({"id": "x", "count": 2})
+    with pytest.raises(ValueError):
+        TriggerSpec.from_obj({"id": "x", "match": {"type": "mouse"}, "mode": "hopping"})
+    spec = TriggerSpec.from_obj({"id": "seq", "steps": [{"type": "mouse"}]})
+    assert spec.to_dict()["kind"] == "sequence"
+
+    fires = []
+    engine = StreamTriggerEngine(on_fire=fires.append)
+    engine.add({"id": "once", "match": {"type": "mouse"}})
+    dispatcher = EventDispatcher()
+    engine.attach(dispatcher)
+    dispatcher.dispatch(_click(0))
+    dispatcher.join()
+    engine.detach(dispatcher)
+    dispatcher.dispatch(_click(1))
+    assert [fire.trigger_id for fire in fires] == ["once"]
+    assert engine.remove("once") and not engine.remove("once")
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import math
+
+import pytest
+
+from autotool_system.core.trajectory import (
+    SimplifyOptions,
+    SimplifyReport,
+    rdp_indices,
+    resample_indices,
+    simplify_events,
+)
+
+
+def _move(idx: int, x: float, y: float, delta: float = 0.01) -> dict[str, object]:
+    return {"id": f"m{idx}", "type": "mouse", "action": "move", "payload": {"x": x, "y": y}, "delta": delta}
+
+
+def test_rdp_keeps_corners_of_straight_segments() -> None:
+    xs = [float(x) for x in range(11)] + [10.0] * 10
+    ys = [0.0] * 11 + [float(y) for y in range(1, 11)]
+
+    kept = rdp_indices(xs, ys, 0.5)
+
+    assert kept == [0, 10, 20]
+
+
+def test_simplify_preserves_timing_and_click_targets() -> None:
+    events = [_move(idx, idx, idx * 2) for idx in range(100)]
+    events.append(
+        {"id": "c1", "type": "mouse", "action": "click", "payload": {"x": 99, "y": 198, "pressed": True}, "delta": 0.2}
+    )
+    report = SimplifyReport()
+
+    result = list(simplify_events(events, SimplifyOptions(tolerance=1.0), report=report))
+
+    assert [item["id"] for item in result] == ["m0", "m99", "c1"]
+    assert math.isclose(sum(item["delta"] for item in result), sum(item["delta"] for item in events))
+    assert result[-1] is events[-1]
+    assert report.original == 101
+    assert report.retained == 3
+    assert report.reduction == pytest.approx(1 - 3 / 101)
+
+
+def test_simplify_max_interval_keeps_slow_segments() -> None:
+    events = [_move(idx, idx, 0, delta=0.5) for idx in range(10)]
+
+    result = list(simplify_events(events, SimplifyOptions(tolerance=5.0, max_interval=1.0)))
+
+    assert len(result) > 2
+    assert all(item["delta"] <= 1.0 for item in result[1:])
+
+
+def test_resample_keeps_speed_changes() -> None:
+    xs = [0.0, 10.0, 20.0, 30.0, 31.0, 32.0, 33.0]
+    ys = [0.0] * 7
+    ts = [0.0, 0.01, 0.02, 0.03, 0.13, 0.23, 0.33]
+
+    kept = resample_indices(xs, ys, ts, tolerance=15.0)
+
+    assert kept == [0, 2, 4, 6]
@@ -59,3 +59,46 @@ def test_workflow_detects_cycles() -> None:
     }
     with pytest.raises(WorkflowError):
         builder.compile(workflow)
+
+
+def test_workflow_cycle_error_names_members() -> None:
+    builder = WorkflowBuilder()
+    nodes = [{"id": node_id, "type": "action", "data": {"type": "wait", "params": {"seconds": 0}}} for node_id in "abcde"]
+    edges = [
+        {"source": "a", "target": "b"},
+        {"source": "b", "target": "c"},
+        {"source": "c", "target": "d"},
+        {"source": "d", "target": "b"},
+        {"source": "d", "target": "e"},
+    ]
+    errors = builder.validate({"id": "wf", "name": "Cycle", "graph": {"nodes": nodes, "edges": edges}})
+    assert errors == ["workflow.graph contains cycles: b -> c -> d -> b"]
+
+
+def test_workflow_graph_order_is_deterministic() -> None:
+    builder = WorkflowBuilder()
+    nodes = [{"id": node_id, "data": {"type": "wait", "params": {"seconds": 0}}} for node_id in ["z", "m", "a", "b"]]
+    nodes.append({"id": "start", "type": "start"})
+    edges = [{"from": "start", "to": "z"}, {"from": "start", "to": "m"}, {"from": "m", "to": "b"}]
+    workflow = {"id": "wf", "name": "Order", "graph": {"nodes": nodes, "edges": edges}}
+    assert [action.id for action in builder.compile(workflow)] == ["a", "m", "b", "z"]
+    reordered = {**workflow, "graph": {"nodes": list(reversed(nodes)), "edges": list(reversed(edges))}}
+    assert [action.id for action in builder.compile(reordered)] == ["a", "m", "b", "z"]
+
+
+def test_workflow_graph_reports_edge_and_action_errors() -> None:
+    builder = WorkflowBuilder()
+    workflow = {
+        "id": "wf",
+        "name": "Broken",
+        "graph": {
+            "nodes": [{"id": "a", "data": {"action": {"params": {}}}}, {"id": "a"}],
+            "edges": [{"from": "a", "to": "missing"}, "bad"],
+        },
+    }
+    assert builder.validate(workflow) == [
+        "workflow.graph.nodes ids must be unique",
+        "edge references missing node: a -> missing",
+        "workflow.graph.edges entries must be mappings",
+        "node a invalid action: Action type is required",
+    ]
@@ -0,0 +1,213 @@
+from __future__ import annotations
+
+import pytest
+
+from autotool_system.automation.action import ExecutionResult
+from autotool_system.core.compile_cache import CompileCache
+from autotool_system.core.workflow_builder import WorkflowBuilder, WorkflowError
+from autotool_system.core.workflow_vm import WorkflowVM, compile_program, has_control_nodes, parse_condition
+
+
+def _act(node_id: str) -> dict:
+    return {"id": node_id, "type": "action", "data": {"type": "wait", "params": {"seconds": 0}}}
+
+
+def _loop_workflow() -> dict:
+    return {
+        "id": "wf-loop",
+        "name": "Loop",
+        "graph": {
+            "nodes": [
+                {"id": "start", "type": "start"},
+                {"id": "loop", "type": "control.loop", "data": {"times": 3}},
+                _act("a"),
+                {"id": "cond", "type": "control.condition", "data": {"expression": "iteration >= 1"}},
+                _act("b"),
+                _act("c"),
+                _act("d"),
+            ],
+            "edges": [
+                {"from": "start", "to": "loop"},
+                {"from": "loop", "to": "a"},
+                {"from": "a", "to": "cond"},
+                {"from": "cond", "to": "b", "sourcePortID": "true"},
+                {"from": "cond", "to": "c", "sourcePortID": "false"},
+                {"from": "b", "to": "c"},
+                {"from": "c", "to": "loop"},
+                {"from": "loop", "to": "d"},
+            ],
+        },
+    }
+
+
+def _retry_workflow(times: int = 2) -> dict:
+    return {
+        "id": "wf-retry",
+        "name": "Retry",
+        "graph": {
+            "nodes": [{"id": "retry", "type": "control.retry", "data": {"times": times}}, _act("a"), _act("b"), _act("z")],
+            "edges": [
+                {"from": "retry", "to": "a"},
+                {"from": "a", "to": "b"},
+                {"from": "b", "to": "retry"},
+                {"from": "retry", "to": "z"},
+            ],
+        },
+    }
+
+
+def _flaky(failures: dict[str, int]):
+    def execute(action):
+        if failures.get(action.id, 0) > 0:
+            failures[action.id] -= 1
+            return ExecutionResult(action.id, False)
+        return ExecutionResult(action.id, True)
+
+    return execute
+
+
+def test_loop_with_condition_runs_without_unrolling() -> None:
+    workflow = _loop_workflow()
+    assert has_control_nodes(workflow)
+    assert WorkflowBuilder().validate(workflow) == []
+
+    program = compile_program(workflow)
+    assert len(program.actions) == 4
+    result = WorkflowVM(program).run(_flaky({}))
+    assert result.status == "success"
+    assert [item.action_id for item in result.results] == ["a", "c", "a", "b", "c", "a", "b", "c", "d"]
+    assert result.counts["a"] == 3 and result.counts["b"] == 2 and result.counts["d"] == 1
+
+
+def test_retry_recovers_and_exhausts() -> None:
+    program = compile_program(_retry_workflow())
+
+    recovered = WorkflowVM(program).run(_flaky({"b": 2}))
+    assert recovered.status == "success"
+    assert [(item.action_id, item.success) for item in recovered.results][-2:] == [("b", True), ("z", True)]
+    assert recovered.counts["b"] == 3
+
+    exhausted = WorkflowVM(program).run(_flaky({"b": 5}))
+    assert exhausted.status == "failed"
+    assert exhausted.counts["b"] == 3 and exhausted.counts["z"] == 1
+
+    halted = WorkflowVM(program).run(_flaky({"b": 5}), stop_on_error=True)
+    assert halted.status == "failed"
+    assert "z" not in halted.counts
+
+
+def _edge(source: str, target: str, port: str | None = None) -> dict:
+    edge = {"sourceNodeID": source, "targetNodeID": target}
+    if port is not None:
+        edge["sourcePortID"] = port
+    return edge
+
+
+def test_nested_flowgram_loops_keep_iteration_per_loop() -> None:
+    workflow = {
+        "id": "wf-nested",
+        "name": "Nested",
+        "graph": {
+            "nodes": [
+                {"id": "start", "type": "start"},
+                {"id": "outer", "type": "control.loop", "data": {"times": 2}},
+                {"id": "inner", "type": "control.loop", "data": {"times": 3}},
+                _act("x"),
+                {"id": "cond", "type": "control.condition", "data": {"expression": "iteration >= 1"}},
+                _act("y"),
+                _act("done"),
+            ],
+            "edges": [
+                _edge("start", "outer", "out"),
+                _edge("outer", "inner", "out"),
+                _edge("inner", "x", "out"),
+                _edge("x", "inner", "out"),
+                _edge("inner", "cond", "out"),
+                _edge("cond", "y", "true"),
+                _edge("cond", "outer", "false"),
+                _edge("y", "outer", "out"),
+                _edge("outer", "done", "out"),
+            ],
+        },
+    }
+    result = WorkflowVM(compile_program(workflow), max_steps=200).run(_flaky({}))
+    assert result.status == "success"
+    assert result.counts == {"outer": 1, "inner": 2, "x": 6, "cond": 2, "y": 1, "done": 1}
+    assert [item.action_id for item in result.results] == ["x", "x", "x", "x", "x", "x", "y", "done"]
+    assert "iteration" not in result.variables
+    assert result.variables["loops.outer"] == 1 and result.variables["loops.inner"] == 2
+
+
+def test_merged_entries_terminate() -> None:
+    workflow = {
+        "id": "wf-merge",
+        "name": "Merge",
+        "graph": {
+            "nodes": [_act("a"), _act("b"), _act("c"), {"id": "cond", "type": "control.condition", "data": {"expression": "last_success == true"}}, _act("d")],
+            "edges": [_edge("a", "c"), _edge("b", "c"), _edge("c", "cond"), _edge("cond", "d", "true")],
+        },
+    }
+    program = compile_program(workflow)
+    assert [action.id for action in program.actions] == ["a", "c", "d", "b"]
+
+    result = WorkflowVM(program, max_steps=200).run(_flaky({}))
+    assert result.status == "success"
+    assert result.counts == {"a": 1, "b": 1, "c": 2, "cond": 2, "d": 2}
+
+
+def test_vm_keeps_counters_and_bounded_results() -> None:
+    workflow = _loop_workflow()
+    workflow["graph"]["nodes"][1]["data"] = {"times": 10000}
+    result = WorkflowVM(compile_program(workflow)).run(_flaky({}), max_results=5)
+    assert result.total == result.succeeded == 10000 * 2 + 9999 + 1
+    assert len(result.results) == 5
+    assert result.results[-1].action_id == "d"
+
+    aborted = WorkflowVM(compile_program(workflow), max_steps=50).run(_flaky({}))
+    assert aborted.status == "aborted"
+    assert aborted.error is not None
+
+
+def test_vm_stops_on_request() -> None:
+    result = WorkflowVM(compile_program(_loop_workflow())).run(_flaky({}), should_stop=lambda: True)
+    assert result.status == "stopped"
+    assert result.results == []
+
+
+def test_condition_errors_fail_the_run() -> None:
+    workflow = _loop_workflow()
+    workflow["graph"]["nodes"][3]["data"] = {"expression": "count > 3"}
+    result = WorkflowVM(compile_program(workflow)).run(_flaky({}), variables={"count": "5"})
+    assert result.status == "failed"
+    assert result.error is not None and "cond" in result.error
+    assert [item.action_id for item in result.results] == ["a"]
+
+
+def test_parse_condition_forms() -> None:
+    assert parse_condition({"expression": "count > 2"}) == {"key": "count", "op": "gt", "value": 2}
+    assert parse_condition({"expression": "mode == 'fast'"}) == {"key": "mode", "op": "eq", "value": "fast"}
+    assert parse_condition({"expression": '{"key": "x", "value": 1}'}) == {"key": "x", "value": 1}
+    assert parse_condition({"condition": {"ready": True}}) == {"ready": True}
+    with pytest.raises(WorkflowError):
+        parse_condition({"expression": "not an expression"})
+
+
+def test_cycles_outside_loops_are_rejected() -> None:
+    workflow = {
+        "id": "wf-cycle",
+        "name": "Cycle",
+        "graph": {
+            "nodes": [{"id": "loop", "type": "control.loop", "data": {"times": 2}}, _act("a"), _act("b")],
+            "edges": [{"from": "loop", "to": "a"}, {"from": "a", "to": "b"}, {"from": "b", "to": "a"}],
+        },
+    }
+    with pytest.raises(WorkflowError, match="cycles"):
+        compile_program(workflow)
+
+
+def test_compile_cache_builds_programs() -> None:
+    cache = CompileCache(WorkflowBuilder())
+    plan = cache.compile(_loop_workflow())
+    assert plan.program is not None
+    assert [action["id"] for action in plan.action_dicts()] == ["a", "b", "c", "d"]
+    assert cache.compile({"id": "flat", "name": "n", "steps": [{"type": "wait", "params": {"seconds": 1}}]}).program is None